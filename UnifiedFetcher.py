@@ -1,39 +1,210 @@
 """
 统一论文抓取器 — 合并 arXiv + 期刊 RSS 两个数据源，去重
+
+抓取分两步: fetch_sources() 按数据源下载、过滤（可只抓取一个分片的数据源），combine() 跨源合并、去重、排序。
+分片运行（见 sharding.py）与一次抓取全部数据源走同一个 combine()，结果相同。
+日常运行与守护模式按 feed_schedule 跳过不可能有新内容的数据源（arXiv 周末 / 假日、期刊声明的更新频率）。
+超时（运行时间预算到期，见 fetch_engine.run_deadline）或获取失败的数据源记录在 failed 中，由摘要列出。
 """
-from arxiv_fetcher import ArxivFetcher
+import arxiv_api
+from arxiv_fetcher import API_SOURCE, ArxivFetcher
 from journal_rss import JournalRSSFetcher, JOURNAL_RSS_FEEDS
 from config import Config
+from dedup import deduplicate
+from feed_schedule import feed_schedule
+from fetch_engine import run_deadline
+from metrics import metrics
+from relevance import rank_papers
+from seen_store import seen_store
+from sharding import all_sources
+from concurrent.futures import ThreadPoolExecutor
+import time
 import logging
 
 logger = logging.getLogger(__name__)
 
 
 class UnifiedPaperFetcher:
-    def __init__(self):
-        self.arxiv = ArxivFetcher()
-        self.journals = JournalRSSFetcher(Config.SEARCH_KEYWORDS)
+    def __init__(self, keywords=None):
+        """keywords: 抓取时使用的关键词，默认为 SEARCH_KEYWORDS（多订阅者时为全部关键词的并集）"""
+        keywords = Config.SEARCH_KEYWORDS if keywords is None else keywords
+        self.arxiv = ArxivFetcher(keywords)
+        self.journals = JournalRSSFetcher(keywords)
+        self.due = []         # 最近一次 fetch_sources() 实际抓取（未被跳过）的数据源键
+        self.skipped = {}     # 最近一次 fetch_sources() 跳过的数据源键 → 原因
+        self.failed = {}      # 最近一次 fetch_sources() 超时或获取失败的数据源键 → 原因
+        self._fetched = {}    # 最近一次 fetch_sources() 成功抓取的数据源键 → 抓取时刻，待 commit_schedule() 记录
 
     def fetch_all(self, days_back=1):
-        """从所有数据源获取论文并去重"""
+        """从所有数据源获取论文并去重（跳过不可能有新内容的数据源）"""
         logger.info(f"数据源: arXiv分类RSS + {len(JOURNAL_RSS_FEEDS)} 个期刊RSS")
+        return self.combine(self.fetch_sources(all_sources(), days_back, skip_idle=True), days_back)
+
+    def fetch_sources(self, sources, days_back=1, skip_idle=False):
+        """
+        抓取给定的数据源（键见 sharding.all_sources），返回 数据源键 → 过滤后的论文（获取失败的源为 None）
+
+        skip_idle 时按 feed_schedule 跳过自上次成功抓取以来不可能有新内容的源（结果为空列表，原因见 self.skipped），
+        其余源的时间窗口放宽到覆盖上次成功抓取以来的全部时间
+        """
+        started = time.time()
+        windows = {'arxiv': days_back, 'journal': days_back}
+        self.due = list(sources)
+        self.skipped = {}
+        self.failed = {}
+        if skip_idle and Config.SKIP_IDLE_FETCHES:
+            plan = feed_schedule.plan(sources, days_back, started)
+            sources, self.skipped, windows = plan.due, plan.skipped, plan.days_back
+            for key in self.skipped:
+                metrics.inc('schedule_skips', feed=key)
+            if self.skipped:
+                reasons = sorted(set(self.skipped.values()))
+                logger.info(f"跳过 {len(self.skipped)} 个不可能有新内容的数据源: {'; '.join(reasons[:3])}")
+            for group, days in windows.items():
+                if days > days_back:
+                    logger.info(f"{group}: 距上次成功抓取超过 {days_back} 天，时间窗口放宽到 {days} 天")
+
+        self.due = list(sources)
+        wanted = set(sources)
+        categories = [key.split(':', 1)[1] for key in sources if key.startswith('arxiv:')]
+        feeds = [(name, url) for name, url in JOURNAL_RSS_FEEDS if f"journal:{name}" in wanted]
+
+        # 两类数据源同时抓取，总耗时约等于最慢的单个主机
+        results = {key: [] for key in self.skipped}
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            if categories == [API_SOURCE]:
+                arxiv_future = pool.submit(self.arxiv.fetch_query, windows['arxiv'])
+            elif categories:
+                arxiv_future = pool.submit(self.arxiv.fetch_categories, categories, windows['arxiv'])
+            else:
+                arxiv_future = None
+            journal_future = pool.submit(self.journals.fetch_feeds, feeds, windows['journal']) if feeds else None
+            for prefix, future in (('arxiv', arxiv_future), ('journal', journal_future)):
+                if future is None:
+                    continue
+                # 一类数据源出错不影响另一类，出错的一类结果为 None（获取失败）
+                try:
+                    results.update((f"{prefix}:{name}", papers) for name, papers in future.result().items())
+                except Exception as e:
+                    logger.exception(f"{prefix} 数据源抓取出错: {e}")
+        for key in sources:
+            results.setdefault(key, None)
+        self.record_failures(results)
+        self._fetched = {key: started for key in sources if results[key] is not None}
+        return results
 
-        arxiv_papers = self.arxiv.fetch_recent_papers(days_back)
-        journal_papers = self.journals.fetch_all(days_back)
+    def record_failures(self, results):
+        """记录结果中获取失败（None）的数据源及原因: 因运行时间预算到期而取消的为超时（分片合并时无从区分，均为获取失败）"""
+        cancelled = run_deadline.cancelled
+        self.failed = {}
+        for key, papers in results.items():
+            if papers is None:
+                timed_out = self._feed_name(key) in cancelled
+                self.failed[key] = '超时（超出本次运行的时间预算）' if timed_out else '获取失败'
+                metrics.inc('source_failures', source=key, reason='deadline' if timed_out else 'error')
+        if self.failed:
+            logger.warning(f"{len(self.failed)} 个数据源超时或获取失败，摘要中将列出: {', '.join(self.failed)}")
 
-        all_papers = arxiv_papers + journal_papers
+    @staticmethod
+    def _feed_name(key):
+        """数据源键在 http_client（熔断、健康记录、run_deadline.cancelled）中使用的订阅源名称"""
+        group, name = key.split(':', 1)
+        if group == 'arxiv' and name == API_SOURCE:
+            return arxiv_api.API_FEED
+        return name
 
-        # 基于 title 去重（arXiv 预印本 ≈ 期刊发表版）
-        seen = set()
-        unique = []
-        for p in all_papers:
-            t = p['title'].lower().strip()
-            if t not in seen:
-                seen.add(t)
-                unique.append(p)
+    def incomplete_sources(self):
+        """最近一次抓取中超时或获取失败的数据源: (摘要中显示的名称, 原因) 列表"""
+        labels = []
+        for key, reason in self.failed.items():
+            group, name = key.split(':', 1)
+            if group == 'arxiv':
+                name = 'arXiv API 检索' if name == API_SOURCE else f"arXiv {name}"
+            labels.append((name, reason))
+        return labels
 
-        logger.info(f"总计: arXiv {len(arxiv_papers)}篇 + 期刊 {len(journal_papers)}篇 → 去重后 {len(unique)}篇")
+    def abandon(self, reason):
+        """抓取中途出错、结果作废: 本次需要抓取的数据源都记为未完成，不记入抓取日程"""
+        self.failed = {key: reason for key in self.due}
+        self._fetched = {}
+
+    def commit_schedule(self):
+        """摘要发送成功后记录本次成功抓取的数据源，之后的运行据此跳过没有新内容的源、放宽时间窗口"""
+        feed_schedule.record(self._fetched)
+        self._fetched = {}
+
+    def combine(self, results, days_back=1):
+        """跨源合并 fetch_sources() 的结果（可来自多个分片）: 各类数据源内部合并后去重、过滤已投递、排序"""
+        arxiv_papers = self.arxiv.combine(
+            {key[len('arxiv:'):]: papers for key, papers in results.items() if key.startswith('arxiv:')}, days_back)
+        journal_papers = self.journals.combine(
+            {key[len('journal:'):]: papers for key, papers in results.items() if key.startswith('journal:')})
+
+        metrics.set('papers', len(arxiv_papers), source='arxiv')
+        metrics.set('papers', len(journal_papers), source='journals')
+        unique = self._finish(arxiv_papers + journal_papers)
+        logger.info(f"总计: arXiv {len(arxiv_papers)}篇 + 期刊 {len(journal_papers)}篇 → 去重且未投递 {len(unique)}篇")
         return unique
 
+    def fetch_source(self, source, days_back=1):
+        """
+        只抓取一类数据源（守护模式下 arXiv 与期刊按各自的周期运行）: source 为 'arxiv' 或 'journals'
+
+        与 fetch_all() 一样跳过不可能有新内容的数据源
+        """
+        if source == 'arxiv':
+            results = self.fetch_sources([key for key in all_sources() if key.startswith('arxiv:')], days_back,
+                                         skip_idle=True)
+            papers = self.arxiv.combine({key[len('arxiv:'):]: p for key, p in results.items()}, days_back)
+        elif source == 'journals':
+            results = self.fetch_sources([key for key in all_sources() if key.startswith('journal:')], days_back,
+                                         skip_idle=True)
+            papers = self.journals.combine({key[len('journal:'):]: p for key, p in results.items()})
+        else:
+            raise ValueError(f"未知数据源: {source}")
+        metrics.set('papers', len(papers), source=source)
+        return self._finish(papers)
+
+    def _finish(self, papers):
+        """跨源去重（DOI / arXiv ID / 归一化标题 + MinHash 近似重复，合并预印本与期刊版本），
+        只保留从未投递过的论文，按相关度排序"""
+        with metrics.timer('dedup'):
+            unique = deduplicate(papers)
+        with metrics.timer('seen_filter'):
+            unique = seen_store.filter_new(unique)
+        metrics.set('papers', len(unique), source='unique_new')
+        return self.rank(unique)
+
+    def backfill(self, start, end, categories=None, resume=True, checkpoint=True):
+        """历史回填：arXiv OAI-PMH 收割 → 与日常抓取相同的去重 / 已投递过滤"""
+        papers = self.arxiv.backfill_papers(start, end, categories, resume, checkpoint)
+        with metrics.timer('dedup'):
+            papers = deduplicate(papers)
+        return self.rank(seen_store.filter_new(papers))
+
+    def finish_backfill(self, start, end, categories=None):
+        """回填投递成功后删除收割检查点"""
+        self.arxiv.finish_backfill(start, end, categories)
+
+    def rank(self, papers, limit=0):
+        """相关度排序（BM25F，标题权重高于摘要），limit > 0 时只保留前 limit 篇"""
+        with metrics.timer('rank'):
+            ranked = rank_papers(papers, limit)
+        if ranked:
+            logger.info(f"相关度排序: {len(papers)} 篇候选, 最高分 {ranked[0].score:.2f}")
+        return ranked
+
+    def filter_unsent(self, subscriber, papers):
+        """去掉该订阅者已收到的论文"""
+        return seen_store.filter_unsent(subscriber, papers)
+
+    def mark_sent(self, subscriber, papers):
+        """某位订阅者的邮件发送成功后记录其收到的论文"""
+        seen_store.mark_sent(subscriber, papers)
+
+    def mark_delivered(self, papers):
+        """分发到的每位订阅者都已收到后记录为已投递"""
+        seen_store.mark_delivered(papers)
+
     def generate_summary(self, paper):
         return self.arxiv.generate_summary(paper)
@@ -0,0 +1,105 @@
+"""
+arXiv API 关键词查询 — 关键词在服务器端检索，只下载命中的论文（ARXIV_MODE=api）
+
+RSS 模式下载各分类的全部条目再在本地过滤，兴趣面窄时绝大部分流量都被丢弃。API 模式:
+- SEARCH_KEYWORDS 转为短语查询（ti / abs 字段），以 OR 组合，按 ARXIV_API_QUERY_CHARS 分为若干查询
+- 每个查询附加 submittedDate 范围，按提交时间倒序，以 start / max_results 翻页
+- 请求经 http_client（Retry-After 重试、熔断），rate_limiter 按 arXiv 要求每 3 秒不超过 1 次，查询依次执行
+- 响应为 Atom，由 ArxivFetcher._parse_feed 解析，本地关键词匹配、已投递过滤、存档与 RSS 模式相同
+
+API 按提交时间检索，而论文在投稿截止后的下一次公告才出现，时间窗口的起点由 arxiv_calendar.submission_start()
+前移到上一次公告的截止时间（如周一晚的公告包含上周五 14:00 之后的投稿）。
+"""
+import logging
+import re
+from datetime import datetime
+from typing import Iterator, List, Optional, Sequence
+from urllib.parse import urlencode
+
+from config import Config
+from http_client import http_client
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+API_FEED = 'arxiv-api'   # 日志、指标与熔断记录中的源名称
+
+_TOTAL_RE = re.compile(rb'<opensearch:totalResults[^>]*>\s*(\d+)\s*<')
+_ERROR_RE = re.compile(rb'<id>\s*https?://arxiv\.org/api/errors[^<]*</id>.*?<summary>(.*?)</summary>', re.S)
+
+
+class ArxivAPIError(Exception):
+    """arXiv API 返回的查询错误（以 Atom 条目的形式返回，HTTP 状态码仍为 200）"""
+
+
+def keyword_term(keyword: str) -> str:
+    """关键词 → 标题或摘要中的短语查询"""
+    phrase = ' '.join(keyword.replace('"', ' ').split())
+    if ' ' in phrase:
+        phrase = f'"{phrase}"'
+    return f"ti:{phrase} OR abs:{phrase}"
+
+
+def build_queries(keywords: Sequence[str], start: datetime, end: datetime, max_chars: int) -> List[str]:
+    """关键词按顺序分组为若干 search_query，每个不超过 max_chars（单个关键词超过时独占一个查询）"""
+    dates = f"submittedDate:[{start:%Y%m%d%H%M} TO {end:%Y%m%d%H%M}]"
+    overhead = len(dates) + len("() AND ")
+    queries: List[str] = []
+    terms: List[str] = []
+    chars = overhead
+    for keyword in keywords:
+        if not keyword.strip():
+            continue
+        term = keyword_term(keyword)
+        if terms and chars + len(term) + len(" OR ") > max_chars:
+            queries.append(f"({' OR '.join(terms)}) AND {dates}")
+            terms, chars = [], overhead
+        chars += len(term) + (len(" OR ") if terms else 0)
+        terms.append(term)
+    if terms:
+        queries.append(f"({' OR '.join(terms)}) AND {dates}")
+    return queries
+
+
+def total_results(content: bytes) -> Optional[int]:
+    match = _TOTAL_RE.search(content)
+    return int(match.group(1)) if match else None
+
+
+def query_url(query: str, start: int, max_results: int) -> str:
+    params = {'search_query': query, 'start': start, 'max_results': max_results,
+              'sortBy': 'submittedDate', 'sortOrder': 'descending'}
+    return f"{Config.ARXIV_API_URL}?{urlencode(params)}"
+
+
+def iter_pages(query: str, page_size: Optional[int] = None, max_results: Optional[int] = None) -> Iterator[bytes]:
+    """
+    按 start / max_results 翻页，逐页产出响应内容；某页条目不足一页或达到 totalResults / max_results 时停止
+
+    Raises:
+        requests.RequestException: 请求失败（已按 http_client 的策略重试）
+        ArxivAPIError: 查询被 API 拒绝
+    """
+    page_size = page_size or Config.ARXIV_API_PAGE_SIZE
+    max_results = Config.ARXIV_API_MAX_RESULTS if max_results is None else max_results
+    start = 0
+    while start < max_results:
+        size = min(page_size, max_results - start)
+        with metrics.timer('feed_fetch', feed=API_FEED):
+            resp = http_client.get(query_url(query, start, size), headers={'User-Agent': 'ArxivDailyDigest/1.0'},
+                                   feed=API_FEED)
+        metrics.inc('feed_requests', feed=API_FEED, status=resp.status_code)
+        metrics.inc('feed_bytes', len(resp.content), feed=API_FEED)
+        resp.raise_for_status()
+        content = resp.content
+        error = _ERROR_RE.search(content)
+        if error:
+            raise ArxivAPIError(error.group(1).decode('utf-8', 'replace').strip())
+        yield content
+
+        total = total_results(content)
+        entries = content.count(b'<entry>') + content.count(b'<entry ')
+        start += size
+        if entries < size or (total is not None and start >= total):
+            return
+    logger.warning(f"arXiv API 查询结果超过 ARXIV_API_MAX_RESULTS={max_results}，其余未获取: {query[:80]}")
@@ -0,0 +1,116 @@
+"""
+arXiv 公告日历 — 何时会有新论文可抓取
+
+- 投稿截止: 周一至周五 14:00（美东时间）
+- 公告: 周日至周四 20:00（美东时间），包含上一次公告的截止时间之后、本次截止时间之前的投稿；周五、周六不公告
+- RSS（rss.arxiv.org）在公告后的午夜（美东时间 00:00，即 UTC 04:00 / 05:00）更新，只包含最近一次公告；
+  API（export.arxiv.org）公告后即可检索
+- 假日不公告，由 ARXIV_HOLIDAYS 配置（美东日期，即当晚本应公告的日期，见 arXiv 网站公布的假日安排）；
+  未配置的假日只会多抓取一次，不会漏掉论文
+
+美东时间按美国夏令时规则（三月第二个周日至十一月第一个周日）换算，不依赖系统时区数据。
+"""
+from datetime import date, datetime, timedelta, timezone
+from typing import FrozenSet, Optional
+import logging
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+CUTOFF_HOUR = 14      # 投稿截止（美东时间）
+ANNOUNCE_HOUR = 20    # 公告（美东时间）
+CUTOFF_WEEKDAYS = (0, 1, 2, 3, 4)      # 周一至周五
+ANNOUNCE_WEEKDAYS = (6, 0, 1, 2, 3)    # 周日至周四
+
+_SEARCH_DAYS = 30     # 向前 / 向后查找公告的最大天数（覆盖最长的假日）
+
+
+def holidays() -> FrozenSet[date]:
+    """ARXIV_HOLIDAYS 中的日期，格式错误的项记录警告后忽略"""
+    days = set()
+    for value in Config.ARXIV_HOLIDAYS:
+        value = value.strip()
+        if not value:
+            continue
+        try:
+            days.add(datetime.strptime(value, '%Y-%m-%d').date())
+        except ValueError:
+            logger.warning(f"ARXIV_HOLIDAYS 中的日期格式应为 YYYY-MM-DD: {value}")
+    return frozenset(days)
+
+
+def _nth_sunday(year: int, month: int, n: int) -> date:
+    first = date(year, month, 1)
+    return first + timedelta(days=(6 - first.weekday()) % 7 + 7 * (n - 1))
+
+
+def eastern_offset(day: date) -> timedelta:
+    """美东时间相对 UTC 的偏移（夏令时 -4 小时，否则 -5 小时）"""
+    if _nth_sunday(day.year, 3, 2) <= day < _nth_sunday(day.year, 11, 1):
+        return timedelta(hours=-4)
+    return timedelta(hours=-5)
+
+
+def eastern(day: date, hour: int) -> datetime:
+    """美东日期 day 的 hour 点，转换为 UTC"""
+    return datetime(day.year, day.month, day.day, hour, tzinfo=timezone.utc) - eastern_offset(day)
+
+
+def eastern_date(moment: datetime) -> date:
+    """UTC 时刻对应的美东日期"""
+    guess = moment.astimezone(timezone.utc) + timedelta(hours=-5)
+    return (moment.astimezone(timezone.utc) + eastern_offset(guess.date())).date()
+
+
+def is_announcement_day(day: date, skip: Optional[FrozenSet[date]] = None) -> bool:
+    """day（美东日期）当晚是否公告"""
+    return day.weekday() in ANNOUNCE_WEEKDAYS and day not in (holidays() if skip is None else skip)
+
+
+def release_time(day: date, mode: str = 'rss') -> datetime:
+    """day（美东日期）的公告在 RSS / API 上可见的时刻（UTC）"""
+    if mode == 'api':
+        return eastern(day, ANNOUNCE_HOUR)
+    return eastern(day + timedelta(days=1), 0)
+
+
+def last_release(now: datetime, mode: str = 'rss') -> Optional[datetime]:
+    """now 之前（含）最近一次公告可见的时刻，_SEARCH_DAYS 天内没有公告时返回 None"""
+    skip = holidays()
+    day = eastern_date(now)
+    for _ in range(_SEARCH_DAYS + 2):
+        if is_announcement_day(day, skip):
+            released = release_time(day, mode)
+            if released <= now:
+                return released
+        day -= timedelta(days=1)
+    return None
+
+
+def next_release(now: datetime, mode: str = 'rss') -> Optional[datetime]:
+    """now 之后下一次公告可见的时刻"""
+    skip = holidays()
+    day = eastern_date(now) - timedelta(days=1)
+    for _ in range(_SEARCH_DAYS + 2):
+        if is_announcement_day(day, skip):
+            released = release_time(day, mode)
+            if released > now:
+                return released
+        day += timedelta(days=1)
+    return None
+
+
+def submission_start(since: datetime) -> datetime:
+    """
+    since 之后公告的论文最早的投稿时间: since 之前最近一次公告所用的截止时间
+
+    如周一 UTC 02:00 之后的公告（周一晚）包含上周五 14:00 之后的投稿，而不是 since 前 24 小时
+    """
+    announced = last_release(since, 'api')
+    if announced is None:
+        return since
+    day = eastern_date(announced)
+    while day.weekday() not in CUTOFF_WEEKDAYS:
+        day -= timedelta(days=1)
+    return min(since, eastern(day, CUTOFF_HOUR))
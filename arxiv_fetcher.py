@@ -2,13 +2,28 @@
 ArXiv 论文抓取器 — 使用 RSS 分类源 + 关键词过滤
 RSS 源不受 API 限速影响，更稳定可靠
 """
+import re
+import time
 import requests
-import feedparser
-from datetime import datetime, timedelta, timezone
-from typing import List, Dict
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence
 import logging
-import time
+import arxiv_api
+import arxiv_calendar
+import arxiv_taxonomy
 from config import Config
+from digest_render import paper_summary
+from feed_stream import FeedEntry, filter_fingerprint, stream_entries
+from fetch_engine import fetch_concurrently, mirror_url, run_deadline
+from http_cache import http_cache
+from http_client import http_client
+from keyword_matcher import get_matcher
+from metrics import CallTimer, metrics
+from oai_harvester import OAIHarvester
+from paper import Paper
+from paper_archive import paper_archive
+from pdf_fulltext import FullTextMatcher
+from seen_store import arxiv_key, seen_store
 
 logger = logging.getLogger(__name__)
 
@@ -21,201 +36,386 @@ ARXIV_CATEGORIES = [
 ]
 
 
+# ARXIV_MODE=api 时 arXiv 部分只有这一个数据源（分片运行中为 arxiv:api）
+API_SOURCE = 'api'
+
+# API 返回的链接带版本号（/abs/2610.11001v2），ID 统一去掉版本号
+_VERSION_RE = re.compile(r'v\d+$')
+
+
+def configured_categories() -> List[str]:
+    """要抓取的分类: Config.ARXIV_CATEGORIES（学科名 / all 展开为子分类），未设置时为 ARXIV_CATEGORIES"""
+    names = [n.strip() for n in Config.ARXIV_CATEGORIES if n.strip()]
+    return arxiv_taxonomy.expand(names) if names else list(ARXIV_CATEGORIES)
+
+
+def arxiv_sources() -> List[str]:
+    """arXiv 部分的数据源: RSS 模式为各分类，API 模式为 API_SOURCE"""
+    return [API_SOURCE] if Config.ARXIV_MODE == 'api' else configured_categories()
+
+
 class ArxivFetcher:
-    def __init__(self):
-        self.keywords = Config.SEARCH_KEYWORDS
-        self.max_results = Config.MAX_RESULTS
+    def __init__(self, keywords: Optional[List[str]] = None):
+        self.keywords = Config.SEARCH_KEYWORDS if keywords is None else keywords
+        self.matcher = get_matcher(self.keywords)
+        # 可选的第二级过滤: 标题 / 摘要未命中的候选下载 PDF 全文再匹配
+        self.fulltext = FullTextMatcher(self.keywords) if Config.PDF_FULLTEXT else None
+
+    def _fetch_category_rss(self, batch: Sequence[str], cutoff: Optional[datetime] = None) -> Optional[List[Paper]]:
+        """
+        用一次合并请求获取一组分类的最新 RSS 条目（cutoff 之前的条目和未命中关键词的条目在解析时即被丢弃），失败时返回 None
+
+        日志与指标中以 batch_label() 标识这组分类
+        """
+        category = arxiv_taxonomy.batch_label(batch)
+        url = mirror_url(arxiv_taxonomy.RSS_URL + '+'.join(batch))
+        # 缓存的解析结果依赖于关键词和时间窗口长度，二者变化时需从缓存的原始内容重新解析
+        variant = filter_fingerprint(cutoff, self.keywords)
+        if self.fulltext is not None:
+            variant += f"|near{self.fulltext.ratio:g}"
+        cached = http_cache.lookup(url)
+        headers = {'User-Agent': 'ArxivDailyDigest/1.0'}
+        headers.update(http_cache.validators(cached))
 
-    def _fetch_category_rss(self, category: str) -> List[Dict]:
-        """获取某个分类的最新 RSS 条目"""
-        url = f"https://rss.arxiv.org/rss/{category}"
         try:
-            resp = requests.get(
-                url,
-                timeout=30,
-                headers={'User-Agent': 'ArxivDailyDigest/1.0'}
-            )
+            with metrics.timer('feed_fetch', feed=category):
+                resp = http_client.get(url, headers=headers, feed=category)
+            metrics.inc('feed_requests', feed=category, status=resp.status_code)
+            metrics.inc('feed_bytes', len(resp.content), feed=category)
+            if resp.status_code == 304 and cached is not None:
+                http_cache.touch(url)
+                if cached.papers is not None and cached.variant == variant:
+                    logger.info(f"  {category}: RSS 未更新 (304)，复用缓存 {len(cached.papers)} 篇")
+                    return cached.papers
+                # 解析参数变化（关键词、时间窗口）: 从缓存的响应体重新解析，并按新参数更新缓存的解析结果
+                body = http_cache.load_body(url)
+                papers = self._parse_feed(body or b'', category, cutoff)
+                if body is not None:
+                    http_cache.update_papers(cached, papers, variant)
+                return papers
             resp.raise_for_status()
         except requests.RequestException as e:
+            metrics.inc('feed_errors', feed=category)
             logger.warning(f"获取 {category} RSS 失败: {e}")
-            return []
+            return None
 
-        feed = feedparser.parse(resp.content)
-        papers = []
+        papers = self._parse_feed(resp.content, category, cutoff)
+        http_cache.store(url, resp, papers, variant)
+        return papers
+
+    def _prefilter(self, entry: FeedEntry) -> bool:
+        """
+        解析时的关键词预过滤，命中的关键词及其在标题 / 摘要中的词频记录在条目上（供相关度排序）
 
-        for entry in feed.entries:
+        启用全文匹配时，未命中但接近的条目同样保留（matched_keywords 为空），由 fetch_recent_papers 下载全文再判断
+        """
+        entry.field_lengths, entry.keyword_tf = self.matcher.count_fields(entry.title, entry.summary)
+        entry.matched_keywords = [kw for kw, _, _ in entry.keyword_tf]
+        if entry.keyword_tf:
+            return True
+        return self.fulltext is not None and self.fulltext.is_candidate(entry.title, entry.summary)
+
+    def _parse_feed(self, content: bytes, category: str, cutoff: Optional[datetime] = None) -> List[Paper]:
+        """
+        流式解析分类 RSS 内容为论文列表（启用档案时所有条目都写入档案，只返回命中关键词的）
+
+        合并订阅源中交叉列出的论文按 arXiv ID 只保留第一次出现的条目
+        """
+        start = time.perf_counter()
+        prefilter = CallTimer(self._prefilter)
+        papers = []
+        seen_ids = set()
+        fallback = category.split('+')[0]   # 条目没有分类时使用
+        # 所有条目（不论是否命中）按批写入档案，内存中最多保留一批
+        archive = paper_archive.buffer()
+        archiving = paper_archive.enabled
+        # arXiv RSS 中所有条目为同一次公告，连续出现旧条目即可停止
+        entries = stream_entries(content, cutoff=cutoff, accept=None if archiving else prefilter,
+                                 stop_after_old=5, name=category)
+
+        for entry in entries:
             try:
-                title = entry.get('title', '')
-                summary = entry.get('description', '')
-                link = entry.get('link', '')
+                matched = prefilter(entry) if archiving else True
+                link = entry.link
 
                 # 从 arXiv URL 提取 ID (如 https://arxiv.org/abs/2607.06789)
                 arxiv_id = ''
                 if '/abs/' in link:
-                    arxiv_id = link.split('/abs/')[-1]
-
-                # 提取作者 — feedparser 将 dc:creator 映射为 author
-                authors = []
-                creator = entry.get('author', '')
-                if creator:
-                    authors = [a.strip() for a in creator.split(',')]
-
-                # 提取分类标签
-                categories = []
-                if hasattr(entry, 'tags'):
-                    for tag in entry.tags:
-                        cat = tag.get('term', '')
-                        if cat:
-                            categories.append(cat)
-
-                # 解析发布日期 — feedparser 将 RSS <pubDate> 映射为 published_parsed
-                pub_parsed = entry.get('published_parsed')
-                if pub_parsed:
-                    pub_date = datetime(*pub_parsed[:6], tzinfo=timezone.utc)
-                else:
+                    arxiv_id = _VERSION_RE.sub('', link.split('/abs/')[-1])
+                    if arxiv_id in seen_ids:
+                        continue
+                    seen_ids.add(arxiv_id)
+
+                # 已投递过的论文无需继续解析（仍需存档的除外）
+                delivered = matched and arxiv_id and seen_store.is_delivered([arxiv_key(arxiv_id)])
+                if not archiving and delivered:
+                    continue
+
+                # 提取作者 — dc:creator 为逗号分隔的作者列表
+                authors = [a.strip() for creator in entry.authors for a in creator.split(',') if a.strip()]
+                categories = entry.categories
+
+                # 发布日期 — RSS <pubDate>
+                pub_date = entry.published
+                if pub_date is None:
                     continue
 
                 # 构造 PDF URL
                 pdf_url = ''
                 if arxiv_id:
-                    pdf_url = link.replace('/abs/', '/pdf/') + '.pdf' if '/abs/' in link else f'https://arxiv.org/pdf/{arxiv_id}.pdf'
-
-                paper = {
-                    'id': arxiv_id,
-                    'title': title.strip(),
-                    'authors': authors,
-                    'abstract': summary.strip(),
-                    'pdf_url': pdf_url,
-                    'published': pub_date.strftime('%Y-%m-%d %H:%M'),
-                    'primary_category': categories[0] if categories else category,
-                    'categories': categories if categories else [category],
-                    'arxiv_url': link,
-                }
-                papers.append(paper)
+                    pdf_url = link.replace('/abs/', '/pdf/') + '.pdf'
+
+                paper = Paper.create(
+                    id=arxiv_id,
+                    title=entry.title,
+                    authors=authors,
+                    abstract=entry.summary,
+                    pdf_url=pdf_url,
+                    published=pub_date,
+                    primary_category=categories[0] if categories else fallback,
+                    categories=categories if categories else [fallback],
+                    arxiv_url=link,
+                    matched_keywords=entry.matched_keywords,
+                    field_lengths=entry.field_lengths,
+                    keyword_tf=entry.keyword_tf,
+                )
+                if archiving:
+                    archive.append(paper)
+                if matched and not delivered:
+                    papers.append(paper)
 
             except Exception as e:
                 logger.warning(f"解析 RSS 条目失败: {e}")
                 continue
 
-        logger.info(f"  {category}: 从 RSS 共获取 {len(papers)} 篇论文")
+        # 解析耗时包含关键词预过滤，预过滤另行单独记录
+        metrics.observe('feed_parse', time.perf_counter() - start, feed=category)
+        metrics.observe('keyword_filter', prefilter.elapsed, feed=category)
+        metrics.inc('feed_entries', prefilter.calls, feed=category)
+        metrics.inc('feed_candidates', len(papers), feed=category)
+        archive.flush()
+        logger.info(f"  {category}: 共获取 {len(papers)} 篇候选论文")
         return papers
 
-    def _matches_keywords(self, paper: Dict) -> bool:
-        """检查论文是否匹配任一关键词"""
-        text = f"{paper['title']} {paper['abstract']}".lower()
-        for kw in self.keywords:
-            # 每个关键词的词都必须出现（支持多词短语如 "Rydberg atom"）
-            kw_parts = kw.strip().lower().split()
-            if all(part in text for part in kw_parts):
-                return True
-        return False
-
-    def fetch_recent_papers(self, days_back: int = 1) -> List[Dict]:
+    def fetch_categories(self, categories: Sequence[str], days_back: int = 1) -> Dict[str, Optional[List[Paper]]]:
         """
-        获取最近几天的论文
+        下载并解析给定分类，按分类返回通过日期与关键词过滤的论文（所在请求失败的分类为 None）
 
-        Args:
-            days_back: 回溯天数，默认为1（获取最近24小时的）
+        启用全文匹配时结果中还包括未命中的候选（matched_keywords 为空），由 combine() 做全文匹配。
+        分片运行时每个分片只抓取部分分类，combine() 在合并阶段处理全部分类的结果。
         """
-        try:
-            end_date = datetime.now(timezone.utc)
-            start_date = end_date - timedelta(days=days_back)
-
-            logger.info(f"搜索关键词: {self.keywords}")
-            logger.info(f"日期范围: {start_date.strftime('%Y-%m-%d')} 到 {end_date.strftime('%Y-%m-%d')}")
-            logger.info(f"搜索分类: {ARXIV_CATEGORIES}")
-
-            all_papers = []
-            seen_ids = set()
-
-            for category in ARXIV_CATEGORIES:
-                logger.info(f"获取 {category} RSS 源...")
-                papers = self._fetch_category_rss(category)
+        end_date = datetime.now(timezone.utc)
+        start_date = end_date - timedelta(days=days_back)
+        if seen_store.enabled:
+            # 已投递论文由 seen_store 过滤，窗口多留 1 天缓冲，避免边缘论文被遗漏
+            start_date -= timedelta(days=1)
+
+        logger.info(f"搜索关键词: {self.keywords}")
+        logger.info(f"日期范围: {start_date.strftime('%Y-%m-%d')} 到 {end_date.strftime('%Y-%m-%d')}")
+        logger.info(f"搜索分类: {list(categories)}")
+
+        start_ts, end_ts = int(start_date.timestamp()), int(end_date.timestamp())
+
+        # 分类按 URL 长度与预计条目数合并为少量请求，并行下载，限速由 rate_limiter 按主机控制
+        batches = arxiv_taxonomy.category_batches(categories, Config.ARXIV_BATCH_URL_CHARS,
+                                                  Config.ARXIV_BATCH_MAX_ENTRIES)
+        logger.info(f"并行获取 {len(categories)} 个分类 RSS 源（{len(batches)} 次请求）...")
+        results = fetch_concurrently(batches, lambda b: self._fetch_category_rss(b, start_date))
+
+        # 合并请求的结果按论文自身的分类列表，归入其中第一个属于本组的分类（都不属于时归入本组第一个分类）
+        by_category: Dict[str, List[Paper]] = {c: [] for c in categories}
+        failed = set()
+        cancelled = run_deadline.cancelled
+        for batch, papers in zip(batches, results):
+            if papers is None:
+                failed.update(batch)
+                if arxiv_taxonomy.batch_label(batch) in cancelled:
+                    run_deadline.cancel(*batch)   # 按分类记录因时间预算到期而未完成
+                continue
+            members = set(batch)
+            for paper in papers:
+                home = next((c for c in paper.categories if c in members), batch[0])
+                by_category[home].append(paper)
+
+        filtered: Dict[str, Optional[List[Paper]]] = {}
+        for category, papers in by_category.items():
+            if category in failed:
+                filtered[category] = None
+                continue
+            kept = []
+            matched = 0
+            for paper in papers:
+                # 日期过滤
+                if paper.published_ts < start_ts or paper.published_ts > end_ts:
+                    continue
 
-                # 过滤：关键词 + 日期
-                matched = 0
-                for paper in papers:
-                    pid = paper['id']
-                    if pid in seen_ids:
+                # 关键词过滤（解析时已预过滤，此处兼容旧缓存）；未命中的为全文匹配候选
+                if not paper.matched_keywords:
+                    hits = self.matcher.match_paper(paper)
+                    if not hits:
+                        if self.fulltext is not None:
+                            kept.append(paper)
                         continue
+                    paper = paper.evolve(matched_keywords=tuple(hits))
 
-                    # 解析日期
-                    pub_str = paper['published']
-                    try:
-                        pub_dt = datetime.strptime(pub_str, '%Y-%m-%d %H:%M')
-                        pub_dt = pub_dt.replace(tzinfo=timezone.utc)
-                    except ValueError:
-                        continue
+                kept.append(paper)
+                matched += 1
 
-                    # 日期过滤
-                    if pub_dt < start_date or pub_dt > end_date:
-                        continue
+            logger.info(f"{category}: 共获取 {len(papers)} 篇, 关键词匹配 {matched} 篇")
+            filtered[category] = kept
+        return filtered
 
-                    # 关键词过滤
-                    if not self._matches_keywords(paper):
-                        continue
+    def fetch_query(self, days_back: int = 1) -> Dict[str, List[Paper]]:
+        """
+        ARXIV_MODE=api: 关键词在 arXiv API 服务器端检索，只下载命中的论文（见 arxiv_api.py）
 
-                    seen_ids.add(pid)
-                    all_papers.append(paper)
-                    matched += 1
+        返回 {API_SOURCE: 论文}，与 fetch_categories() 的结果一样由 combine() 合并；任一查询失败时为 None
+        （已获取的页一并丢弃，API 可随时检索，下次运行的时间窗口从上次成功抓取算起，不会遗漏）
+        """
+        end_date = datetime.now(timezone.utc)
+        # 论文在投稿截止后的下一次公告才可检索到: 窗口内公告的论文从上一次公告的截止时间起算
+        start_date = arxiv_calendar.submission_start(end_date - timedelta(days=days_back))
+        if seen_store.enabled:
+            # 已投递论文由 seen_store 过滤，窗口多留 1 天缓冲（未配置的假日、暂缓公告的论文）
+            start_date -= timedelta(days=1)
+        queries = arxiv_api.build_queries(self.keywords, start_date, end_date, Config.ARXIV_API_QUERY_CHARS)
+        logger.info(f"搜索关键词: {self.keywords}")
+        logger.info(f"arXiv API: {len(queries)} 个查询，提交时间 {start_date:%Y-%m-%d %H:%M} 到 "
+                    f"{end_date:%Y-%m-%d %H:%M} UTC")
 
-                logger.info(f"{category}: 共获取 {len(papers)} 篇, 关键词匹配 {matched} 篇")
+        papers = []
+        pages = 0
+        try:
+            # 依次查询、翻页（arXiv API 要求单连接、每 3 秒不超过 1 次请求）
+            for query in queries:
+                for content in arxiv_api.iter_pages(query):
+                    pages += 1
+                    papers.extend(self._parse_feed(content, arxiv_api.API_FEED, start_date))
+        except (requests.RequestException, arxiv_api.ArxivAPIError) as e:
+            metrics.inc('feed_errors', feed=arxiv_api.API_FEED)
+            logger.warning(f"arXiv API 查询失败（第 {pages + 1} 页），本次不使用 API 结果: {e}")
+            return {API_SOURCE: None}
+        logger.info(f"arXiv API: 共 {pages} 页，关键词匹配 {len(papers)} 篇")
+        return {API_SOURCE: papers}
+
+    def combine(self, results: Dict[str, Optional[List[Paper]]], days_back: int = 1) -> List[Paper]:
+        """
+        合并各分类的结果（获取失败的为 None）: 按 configured_categories() 的顺序遍历，交叉列出的论文按 arXiv ID 只保留一份，
+        对全文匹配候选做全文匹配，按日期排序。结果只取决于各分类的内容，与分类如何分片、合并请求无关
+        """
+        configured = configured_categories()
+        order = [c for c in configured if c in results] + sorted(set(results) - set(configured))
+        all_papers = []
+        near_misses = []
+        seen_ids = set()
+        for category in order:
+            for paper in results[category] or []:
+                if paper.id in seen_ids:
+                    continue
+                seen_ids.add(paper.id)
+                (all_papers if paper.matched_keywords else near_misses).append(paper)
 
-                # 类别间延迟（礼貌爬取）
-                time.sleep(2)
+        if near_misses and self.fulltext is not None:
+            try:
+                all_papers.extend(self.fulltext.match(near_misses))
+            except Exception as e:
+                logger.warning(f"PDF 全文匹配失败，仅使用标题 / 摘要匹配结果: {e}")
 
-            # 按日期排序（最新的在前）
-            all_papers.sort(key=lambda p: p['published'], reverse=True)
+        # 按日期排序（最新的在前）；数量上限在相关度排序后按每份摘要截取
+        all_papers.sort(key=lambda p: p.published_ts, reverse=True)
 
-            # 限制结果数
-            all_papers = all_papers[:self.max_results]
+        for p in all_papers:
+            logger.info(f"✅ 找到论文: [{p.primary_category}] {p.title[:80]}... ({p.published[:10]})")
 
-            for p in all_papers:
-                pcat = p.get('primary_category', '?')
-                logger.info(f"✅ 找到论文: [{pcat}] {p['title'][:80]}... ({p['published'][:10]})")
+        logger.info(f"共找到 {len(all_papers)} 篇相关论文 (过去{days_back}天内)")
 
-            logger.info(f"共找到 {len(all_papers)} 篇相关论文 (过去{days_back}天内)")
+        if len(all_papers) == 0:
+            logger.info("提示: 今日可能确实无新论文，或者论文分布在其他分类中")
+            logger.info(f"当前搜索分类: {configured}")
+            logger.info("如需扩展分类，可在 .env 中设置 ARXIV_CATEGORIES（如 cond-mat,physics，或 all 为全部分类）")
 
-            if len(all_papers) == 0:
-                logger.info("提示: 今日可能确实无新论文，或者论文分布在其他分类中")
-                logger.info(f"当前搜索分类: {ARXIV_CATEGORIES}")
-                logger.info("如需扩展分类，可修改 ARXIV_CATEGORIES 列表")
+        return all_papers
 
-            return all_papers
+    def fetch_recent_papers(self, days_back: int = 1) -> List[Paper]:
+        """
+        获取最近几天的论文
 
+        Args:
+            days_back: 回溯天数，默认为1（获取最近24小时的）
+        """
+        try:
+            if Config.ARXIV_MODE == 'api':
+                results = self.fetch_query(days_back)
+            else:
+                results = self.fetch_categories(configured_categories(), days_back)
+            return self.combine(results, days_back)
         except Exception as e:
             logger.error(f"获取论文失败: {e}")
             import traceback
             logger.error(traceback.format_exc())
             return []
 
-    def generate_summary(self, paper: Dict) -> str:
-        """生成论文的中文摘要"""
-        title = paper['title']
-        abstract = paper['abstract']
-
-        summary_lines = [
-            "=" * 60,
-            f"📄 标题: {title}",
-            "",
-            f"👥 作者: {', '.join(paper['authors'][:3])}{'等' if len(paper['authors']) > 3 else ''}",
-            f"📅 发布时间: {paper['published']}",
-            f"📚 分类: {paper['primary_category']}",
-            "",
-            "📝 摘要:",
-            self._truncate_text(abstract, 800) + ("..." if len(abstract) > 800 else ""),
-            "",
-            "🔗 链接:",
-            f"PDF: {paper['pdf_url']}",
-            f"Arxiv: {paper['arxiv_url']}",
-            "=" * 60,
-            ""
-        ]
-
-        return "\n".join(summary_lines)
-
-    def _truncate_text(self, text: str, max_length: int) -> str:
-        """截断文本"""
-        if len(text) <= max_length:
-            return text
-        return text[:max_length].rsplit(' ', 1)[0]
+    def _backfill_harvester(self, checkpoint: bool = True) -> OAIHarvester:
+        return OAIHarvester() if checkpoint else OAIHarvester(checkpoint_dir='')
+
+    def _backfill_variant(self) -> str:
+        """回填检查点的过滤条件标识: 关键词变化后暂存的匹配结果不再可用"""
+        return filter_fingerprint(None, self.keywords)
+
+    def backfill_papers(self, start: date, end: date, categories: Optional[Iterable[str]] = None,
+                        resume: bool = True, checkpoint: bool = True) -> List[Paper]:
+        """
+        通过 OAI-PMH 回填 [start, end] 期间首次提交的论文（RSS 只包含最近一次公告）
+
+        收割按 OAI datestamp（最近修改日期）自 start 起进行，期间之外提交、只是期间内或之后更新过版本的论文按提交日期剔除。
+        命中关键词的论文逐页暂存在检查点中，中断或投递失败后重新运行时一并返回；投递成功后调用 finish_backfill()。
+        checkpoint=False（--dry-run）时不读写检查点。
+        """
+        categories = list(categories or configured_categories())
+        wanted = set(categories)
+        start_ts = int(datetime(start.year, start.month, start.day, tzinfo=timezone.utc).timestamp())
+        end_ts = int(datetime(end.year, end.month, end.day, tzinfo=timezone.utc).timestamp()) + 86400
+
+        logger.info(f"回填 {start} ~ {end}，分类: {categories}，关键词: {self.keywords}")
+        scanned = 0
+        archive = paper_archive.buffer()
+        count_fields = CallTimer(self.matcher.count_fields)
+
+        def select(paper: Paper) -> Optional[Paper]:
+            nonlocal scanned
+            if wanted.isdisjoint(paper.categories):
+                return None
+            scanned += 1
+            if paper_archive.enabled:
+                archive.append(paper)
+            if paper.published_ts < start_ts or paper.published_ts >= end_ts:
+                return None
+            lengths, keyword_tf = count_fields(paper.title, paper.abstract)
+            if not keyword_tf:
+                return None
+            return paper.evolve(matched_keywords=tuple(kw for kw, _, _ in keyword_tf),
+                                field_lengths=lengths, keyword_tf=keyword_tf)
+
+        papers = []
+        harvester = self._backfill_harvester(checkpoint)
+        for paper in harvester.harvest(categories, start, end, resume=resume, select=select,
+                                       variant=self._backfill_variant()):
+            if not seen_store.is_delivered([arxiv_key(paper.id)]):
+                papers.append(paper)
+        archive.flush()
+        metrics.observe('keyword_filter', count_fields.elapsed, feed='oai')
+        metrics.inc('feed_entries', scanned, feed='oai')
+        metrics.inc('feed_candidates', len(papers), feed='oai')
+
+        papers.sort(key=lambda p: p.published_ts, reverse=True)
+        logger.info(f"回填: 扫描 {scanned} 篇（不含检查点中暂存的）, 未投递的关键词匹配 {len(papers)} 篇")
+        return papers
+
+    def finish_backfill(self, start: date, end: date, categories: Optional[Iterable[str]] = None):
+        """回填的论文投递成功后删除检查点与暂存的论文"""
+        categories = list(categories or configured_categories())
+        self._backfill_harvester().clear(categories, start, end, self._backfill_variant())
+
+    def generate_summary(self, paper: Paper) -> str:
+        """生成论文的中文摘要（纯文本片段与邮件正文共用同一渲染缓存）"""
+        return paper_summary(paper)
@@ -0,0 +1,108 @@
+"""
+arXiv 分类表与合并请求分组
+
+rss.arxiv.org 接受 cat1+cat2+... 形式的合并订阅源，一次请求返回多个分类的当日公告（交叉列出的论文只出现一次）。
+category_batches() 按顺序把分类分组，使每组的 URL 长度与预计条目数（决定响应大小）都不超过上限，
+监控全部约 150 个分类也只需几次请求。
+"""
+from typing import Dict, Iterable, List, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+RSS_URL = "https://rss.arxiv.org/rss/"
+
+# 学科 → (子分类, 每个子分类每次公告的大致条目数，含交叉列出)
+# 条目数只用于估计合并订阅源的响应大小，不必精确
+ARCHIVES: Dict[str, Tuple[Tuple[str, ...], int]] = {
+    'astro-ph': (('astro-ph.CO', 'astro-ph.EP', 'astro-ph.GA', 'astro-ph.HE', 'astro-ph.IM', 'astro-ph.SR'), 50),
+    'cond-mat': (('cond-mat.dis-nn', 'cond-mat.mes-hall', 'cond-mat.mtrl-sci', 'cond-mat.other',
+                  'cond-mat.quant-gas', 'cond-mat.soft', 'cond-mat.stat-mech', 'cond-mat.str-el',
+                  'cond-mat.supr-con'), 45),
+    'gr-qc': (('gr-qc',), 60),
+    'hep-ex': (('hep-ex',), 30),
+    'hep-lat': (('hep-lat',), 15),
+    'hep-ph': (('hep-ph',), 90),
+    'hep-th': (('hep-th',), 90),
+    'math-ph': (('math-ph',), 50),
+    'nlin': (('nlin.AO', 'nlin.CD', 'nlin.CG', 'nlin.PS', 'nlin.SI'), 12),
+    'nucl-ex': (('nucl-ex',), 12),
+    'nucl-th': (('nucl-th',), 30),
+    'physics': (tuple(f"physics.{c}" for c in (
+        'acc-ph', 'ao-ph', 'app-ph', 'atm-clus', 'atom-ph', 'bio-ph', 'chem-ph', 'class-ph', 'comp-ph',
+        'data-an', 'ed-ph', 'flu-dyn', 'gen-ph', 'geo-ph', 'hist-ph', 'ins-det', 'med-ph', 'optics',
+        'plasm-ph', 'pop-ph', 'soc-ph', 'space-ph')), 15),
+    'quant-ph': (('quant-ph',), 200),
+    'math': (tuple(f"math.{c}" for c in (
+        'AC', 'AG', 'AP', 'AT', 'CA', 'CO', 'CT', 'CV', 'DG', 'DS', 'FA', 'GM', 'GN', 'GR', 'GT', 'HO',
+        'IT', 'KT', 'LO', 'MG', 'MP', 'NA', 'NT', 'OA', 'OC', 'PR', 'QA', 'RA', 'RT', 'SG', 'SP', 'ST')), 35),
+    'cs': (tuple(f"cs.{c}" for c in (
+        'AI', 'AR', 'CC', 'CE', 'CG', 'CL', 'CR', 'CV', 'CY', 'DB', 'DC', 'DL', 'DM', 'DS', 'ET', 'FL',
+        'GL', 'GR', 'GT', 'HC', 'IR', 'IT', 'LG', 'LO', 'MA', 'MM', 'MS', 'NA', 'NE', 'NI', 'OH', 'OS',
+        'PF', 'PL', 'RO', 'SC', 'SD', 'SE', 'SI', 'SY')), 70),
+    'econ': (('econ.EM', 'econ.GN', 'econ.TH'), 15),
+    'eess': (('eess.AS', 'eess.IV', 'eess.SP', 'eess.SY'), 60),
+    'q-bio': (tuple(f"q-bio.{c}" for c in ('BM', 'CB', 'GN', 'MN', 'NC', 'OT', 'PE', 'QM', 'SC', 'TO')), 12),
+    'q-fin': (tuple(f"q-fin.{c}" for c in ('CP', 'EC', 'GN', 'MF', 'PM', 'PR', 'RM', 'ST', 'TR')), 10),
+    'stat': (('stat.AP', 'stat.CO', 'stat.ME', 'stat.ML', 'stat.OT', 'stat.TH'), 45),
+}
+
+ALL_CATEGORIES: List[str] = [c for subcats, _ in ARCHIVES.values() for c in subcats]
+_ENTRIES: Dict[str, int] = {c: n for subcats, n in ARCHIVES.values() for c in subcats}
+
+# 不在分类表中的分类按此估计
+DEFAULT_ENTRIES = 50
+
+
+def expand(names: Iterable[str]) -> List[str]:
+    """
+    展开分类设置: all 为全部分类，学科名（如 cs、cond-mat）为该学科的全部子分类；保持顺序、去掉重复
+    """
+    categories: List[str] = []
+    for name in names:
+        if name.lower() == 'all':
+            categories.extend(ALL_CATEGORIES)
+        elif name in ARCHIVES:
+            categories.extend(ARCHIVES[name][0])
+        else:
+            if name not in _ENTRIES:
+                logger.warning(f"未知的 arXiv 分类 {name}，仍按原样请求")
+            categories.append(name)
+    return list(dict.fromkeys(categories))
+
+
+def estimated_entries(category: str) -> int:
+    return _ENTRIES.get(category, DEFAULT_ENTRIES)
+
+
+def batch_label(batch: Sequence[str]) -> str:
+    """一组分类在日志与指标中的名称，如 physics.atom-ph+3"""
+    return batch[0] if len(batch) == 1 else f"{batch[0]}+{len(batch) - 1}"
+
+
+def category_batches(categories: Sequence[str], max_url_chars: int, max_entries: int) -> List[List[str]]:
+    """
+    按顺序把分类分为合并请求
+
+    每组的 URL（RSS_URL + 以 + 连接的分类）不超过 max_url_chars，预计条目数之和不超过 max_entries；
+    单个分类超过上限时独占一组。max_entries 为 0 时每个分类单独请求。
+    """
+    if max_entries <= 0:
+        return [[c] for c in categories]
+    batches: List[List[str]] = []
+    batch: List[str] = []
+    url_chars = entries = 0
+    for category in categories:
+        n = estimated_entries(category)
+        chars = len(category) + 1   # 含分隔的 +
+        if batch and (url_chars + chars > max_url_chars or entries + n > max_entries):
+            batches.append(batch)
+            batch = []
+        if not batch:
+            url_chars, entries = len(RSS_URL) - 1, 0
+        batch.append(category)
+        url_chars += chars
+        entries += n
+    if batch:
+        batches.append(batch)
+    return batches
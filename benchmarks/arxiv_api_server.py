@@ -0,0 +1,158 @@
+"""
+本地 arXiv API 服务器 — 替代 export.arxiv.org/api/query，供 ARXIV_MODE=api 的离线测试与基准使用
+
+以录制的查询响应（fixtures/arxiv_api_query.xml）为框架，对给定的 Atom <entry> 集合执行检索:
+- search_query 中的 ti: / abs: / all: 词项（引号内为短语）任一命中即可，不区分大小写；submittedDate:[from TO to] 限定提交时间
+- 结果按提交时间倒序，按 start / max_results 分页，附 opensearch:totalResults
+- 无法解析的查询返回 API 形式的错误条目（HTTP 200），与真实接口一致
+"""
+import os
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List, NamedTuple, Optional, Sequence
+from urllib.parse import parse_qs, urlparse
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'arxiv_api_query.xml')
+
+_ENTRY_RE = re.compile(rb'  <entry>.*?</entry>\s*', re.S)
+_TERM_RE = re.compile(r'\b(ti|abs|all):(?:"([^"]+)"|([^\s()"]+))')
+_DATES_RE = re.compile(r'submittedDate:\[(\d{12}) TO (\d{12})\]')
+_OPENSEARCH_RE = re.compile(rb'(<opensearch:(totalResults|startIndex|itemsPerPage)[^>]*>)\d+(<)')
+
+_ERROR_ENTRY = """  <entry>
+    <id>http://arxiv.org/api/errors#incorrect_search_query</id>
+    <title>Error</title>
+    <summary>{message}</summary>
+    <updated>2026-10-16T00:00:00-04:00</updated>
+    <link href="http://arxiv.org/api/errors#incorrect_search_query" rel="alternate" type="text/html"/>
+    <author>
+      <name>arXiv api core</name>
+    </author>
+  </entry>
+"""
+
+
+def sample_entries(content: bytes) -> List[bytes]:
+    """从录制的 API 响应中取出全部 <entry> 元素"""
+    return _ENTRY_RE.findall(content)
+
+
+def _field(entry: bytes, tag: str) -> str:
+    match = re.search(rb'<%s>(.*?)</%s>' % (tag.encode(), tag.encode()), entry, re.S)
+    return ' '.join(match.group(1).decode('utf-8').split()) if match else ''
+
+
+class _Indexed(NamedTuple):
+    body: bytes
+    submitted: str   # YYYYMMDDHHMM (UTC)
+    title: str
+    abstract: str
+
+
+class ArxivAPIServer:
+    """
+    Args:
+        entries: Atom <entry> 元素（sample_entries() 的结果或按同一格式生成）
+        latency: 每个请求的固定延迟（秒）
+    """
+
+    def __init__(self, entries: Sequence[bytes], latency: float = 0.0):
+        with open(FIXTURE, 'rb') as f:
+            fixture = f.read()
+        first = _ENTRY_RE.search(fixture)
+        self._head = fixture[:first.start()]
+        self._tail = b'</feed>\n'
+        self.entries = []
+        for body in entries:
+            published = datetime.fromisoformat(_field(body, 'published').replace('Z', '+00:00'))
+            self.entries.append(_Indexed(body, published.astimezone(timezone.utc).strftime('%Y%m%d%H%M'),
+                                         _field(body, 'title').lower(), _field(body, 'summary').lower()))
+        self.entries.sort(key=lambda e: e.submitted, reverse=True)
+        self.latency = latency
+        self.stats = {'requests': 0, 'bytes_sent': 0, 'errors': 0}
+        self.queries: List[str] = []
+        self._lock = threading.Lock()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/api/query"
+
+    def search(self, query: str) -> Optional[List[_Indexed]]:
+        """执行检索，查询无法解析时返回 None"""
+        terms = [(field, ' '.join((phrase or word).lower().split())) for field, phrase, word in _TERM_RE.findall(query)]
+        if not terms:
+            return None
+        dates = _DATES_RE.search(query)
+        low, high = dates.groups() if dates else ('', '999999999999')
+        hits = []
+        for entry in self.entries:
+            if not low <= entry.submitted <= high:
+                continue
+            for field, text in terms:
+                if ((field in ('ti', 'all') and text in entry.title)
+                        or (field in ('abs', 'all') and text in entry.abstract)):
+                    hits.append(entry)
+                    break
+        return hits
+
+    def render(self, hits: Optional[List[_Indexed]], start: int, max_results: int) -> bytes:
+        if hits is None:
+            return self._head + _ERROR_ENTRY.format(message='incorrect search_query').encode() + self._tail
+        page = hits[start:start + max_results]
+        values = {b'totalResults': len(hits), b'startIndex': start, b'itemsPerPage': len(page)}
+        head = _OPENSEARCH_RE.sub(lambda m: m.group(1) + str(values[m.group(2)]).encode() + m.group(3), self._head)
+        return head + b''.join(e.body for e in page) + self._tail
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                if server.latency:
+                    time.sleep(server.latency)
+                params = parse_qs(urlparse(self.path).query)
+                query = params.get('search_query', [''])[0]
+                start = int(params.get('start', ['0'])[0])
+                max_results = int(params.get('max_results', ['10'])[0])
+                hits = server.search(query)
+                body = server.render(hits, start, max_results)
+                with server._lock:
+                    server.stats['requests'] += 1
+                    server.stats['bytes_sent'] += len(body)
+                    server.stats['errors'] += hits is None
+                    server.queries.append(query)
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/atom+xml; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'ArxivAPIServer':
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._httpd.daemon_threads = True
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> 'ArxivAPIServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,101 @@
+"""
+arXiv 合成样本 — 按分类生成论文（部分交叉列出到其他分类），渲染为各分类的 RSS 源与 arXiv API 的 Atom 条目
+
+同一批论文既可由回放服务器按分类提供（RSS 模式），也可由 arxiv_api_server 按关键词检索（API 模式），
+两种抓取方式应找到相同的论文。
+"""
+import random
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from html import escape
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import arxiv_taxonomy
+from replay_server import route_for
+
+KEYWORD = 'Rydberg atom'
+
+
+class SamplePaper(NamedTuple):
+    id: str
+    title: str
+    abstract: str
+    categories: Tuple[str, ...]
+    published: datetime
+    hit: bool   # 摘要中含 KEYWORD
+
+
+def build_corpus(categories: Sequence[str], n_entries: int, cross_rate: float = 0.3, hit_every: int = 10,
+                 seed: int = 0, now: Optional[datetime] = None) -> List[SamplePaper]:
+    """每个分类 n_entries 篇主分类论文，按 cross_rate 交叉列出到 1–2 个其他分类，每 hit_every 篇一篇命中关键词"""
+    rng = random.Random(seed)
+    published = (now or datetime.now(timezone.utc)).replace(microsecond=0) - timedelta(hours=1)
+    corpus = []
+    number = 0
+    for primary in categories:
+        others = [c for c in categories if c != primary]
+        for _ in range(n_entries):
+            number += 1
+            cats = [primary]
+            if others and rng.random() < cross_rate:
+                cats += rng.sample(others, min(len(others), rng.randint(1, 2)))
+            hit = number % hit_every == 0
+            abstract = (f"We study {KEYWORD.lower()} arrays in optical tweezers and characterize the blockade."
+                        if hit else "We study transport and thermalization in a driven many-body system.")
+            corpus.append(SamplePaper(f"2610.{number:05d}", f"Paper {number} on {primary}", abstract,
+                                      tuple(cats), published, hit))
+    return corpus
+
+
+def _rss_item(paper: SamplePaper) -> str:
+    categories = ''.join(f"      <category>{c}</category>\n" for c in paper.categories)
+    return f"""    <item>
+      <title>{escape(paper.title)}</title>
+      <link>https://arxiv.org/abs/{paper.id}</link>
+      <description>arXiv:{paper.id}v1 Announce Type: new
+Abstract: {escape(paper.abstract)}</description>
+{categories}      <pubDate>{format_datetime(paper.published)}</pubDate>
+      <dc:creator>Author {paper.id}</dc:creator>
+    </item>
+"""
+
+
+def rss_routes(corpus: Sequence[SamplePaper]) -> Dict[str, bytes]:
+    """各分类的 RSS 源（回放服务器路由）；交叉列出的论文出现在其每个分类的源中"""
+    items: Dict[str, List[str]] = {}
+    for paper in corpus:
+        item = _rss_item(paper)
+        for category in paper.categories:
+            items.setdefault(category, []).append(item)
+    routes = {}
+    for category, entries in items.items():
+        routes[route_for(arxiv_taxonomy.RSS_URL + category)] = f"""<?xml version='1.0' encoding='UTF-8'?>
+<rss xmlns:dc="http://purl.org/dc/elements/1.1/" version="2.0">
+  <channel>
+    <title>{category} updates on arXiv.org</title>
+{''.join(entries)}  </channel>
+</rss>
+""".encode('utf-8')
+    return routes
+
+
+def atom_entry(paper: SamplePaper) -> bytes:
+    """arXiv API 响应中的一个 <entry>（格式同 fixtures/arxiv_api_query.xml）"""
+    stamp = paper.published.strftime('%Y-%m-%dT%H:%M:%SZ')
+    categories = ''.join(f'    <category term="{c}" scheme="http://arxiv.org/schemas/atom"/>\n'
+                         for c in paper.categories)
+    return f"""  <entry>
+    <id>http://arxiv.org/abs/{paper.id}v1</id>
+    <updated>{stamp}</updated>
+    <published>{stamp}</published>
+    <title>{escape(paper.title)}</title>
+    <summary>  {escape(paper.abstract)}
+</summary>
+    <author>
+      <name>Author {paper.id}</name>
+    </author>
+    <link href="http://arxiv.org/abs/{paper.id}v1" rel="alternate" type="text/html"/>
+    <link title="pdf" href="http://arxiv.org/pdf/{paper.id}v1" rel="related" type="application/pdf"/>
+    <arxiv:primary_category xmlns:arxiv="http://arxiv.org/schemas/atom" term="{paper.categories[0]}" scheme="http://arxiv.org/schemas/atom"/>
+{categories}  </entry>
+""".encode('utf-8')
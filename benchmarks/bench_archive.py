@@ -0,0 +1,160 @@
+"""
+论文档案基准 — 批量写入吞吐与 BM25 检索延迟
+
+以 Zipf 分布的词表随机组合出 N 篇论文（订阅源样本中的词分布在词表各个频段，
+其余为合成词），日期分布在最近一年、分类 / 来源随机分配，写入临时档案后测量:
+- 整批事务写入的吞吐（篇/秒）与数据库大小
+- 若干典型查询（含日期、分类、来源过滤）的延迟 p50 / p95
+- 按 --max-papers 删除最旧论文（close() 时的保留上限）的耗时与之后的数据库大小
+用法: python benchmarks/bench_archive.py [--papers 200000] [--batch 1000] [--repeat 20] [--max-papers 50000]
+"""
+import argparse
+import math
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from feed_fixtures import FIXTURES, load_fixture  # noqa: E402
+from feed_stream import stream_entries  # noqa: E402
+from paper import Paper  # noqa: E402
+from paper_archive import PaperArchive  # noqa: E402
+
+CATEGORIES = ['physics.atom-ph', 'quant-ph', 'cond-mat.quant-gas', 'physics.optics']
+JOURNALS = ['PRL', 'PRA', 'Nature Physics', 'Science']
+
+QUERIES = [
+    ('Rydberg blockade', {}),
+    ('Rydberg-blockade', {'days': 90}),
+    ('"optical tweezer" AND atom*', {}),
+    ('quantum entanglement', {'categories': ['quant-ph'], 'days': 180}),
+    ('superconducting qubit', {'sources': ['PRL', 'Nature Physics']}),
+    ('tweezer OR lattice', {'categories': ['physics'], 'days': 30}),
+    ('quantum', {}),
+]
+
+_WORD_RE = re.compile(r"[A-Za-z][A-Za-z\-]+")
+
+
+def vocabulary(size: int = 30000, seed: int = 0):
+    """Zipf 词表: (词, 累积权重)；样本中的词按对数均匀分布放在第 5 ~ 20000 位，常见词与专业词都有"""
+    rng = random.Random(seed)
+    words = set()
+    for name in FIXTURES:
+        for entry in stream_entries(load_fixture(name), name=name):
+            words.update(w.lower() for w in _WORD_RE.findall(f"{entry.title} {entry.summary}"))
+    words = sorted(words)
+    vocab = [f"term{i}" for i in range(size - len(words))]
+    for word in words:
+        vocab.insert(int(math.exp(rng.uniform(math.log(5), math.log(20000)))), word)
+    cum_weights, total = [], 0.0
+    for rank in range(len(vocab)):
+        total += 1 / (rank + 1)
+        cum_weights.append(total)
+    return vocab, cum_weights
+
+
+def make_papers(n: int, seed: int = 0):
+    rng = random.Random(seed)
+    vocab, cum_weights = vocabulary(seed=seed)
+
+    def text(k: int) -> str:
+        return ' '.join(rng.choices(vocab, cum_weights=cum_weights, k=k))
+
+    now = datetime.now(timezone.utc)
+    papers = []
+    for i in range(n):
+        published = now - timedelta(seconds=rng.randrange(365 * 86400))
+        authors = [f"Author {rng.randrange(5000)}" for _ in range(rng.randint(1, 6))]
+        if i % 5:
+            category = rng.choice(CATEGORIES)
+            papers.append(Paper.create(
+                id=f"26{i // 100000 % 100:02d}.{i % 100000:05d}",
+                title=text(rng.randint(6, 14)),
+                authors=authors,
+                abstract=text(rng.randint(80, 200)),
+                pdf_url=f"https://arxiv.org/pdf/26{i:07d}",
+                published=published,
+                primary_category=category,
+                categories=[category],
+                arxiv_url=f"https://arxiv.org/abs/26{i:07d}",
+            ))
+        else:
+            journal = rng.choice(JOURNALS)
+            papers.append(Paper.create(
+                id=f"https://journals.example.org/{i}",
+                title=text(rng.randint(6, 14)),
+                authors=authors,
+                abstract=text(rng.randint(60, 150)),
+                pdf_url=f"https://journals.example.org/{i}",
+                published=published,
+                primary_category=journal,
+                categories=[journal],
+                arxiv_url=f"https://journals.example.org/{i}",
+                source=journal,
+                doi=f"10.1000/bench.{i}",
+            ))
+    return papers
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--papers', type=int, default=200_000)
+    parser.add_argument('--batch', type=int, default=1000, help='每次 add() 的论文数（一个订阅源一批）')
+    parser.add_argument('--repeat', type=int, default=20, help='每个查询重复次数')
+    parser.add_argument('--max-papers', type=int, default=50_000, help='最后测量的保留上限')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    papers = make_papers(args.papers)
+    print(f"生成 {len(papers)} 篇论文: {time.perf_counter() - start:.1f}s")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'archive.sqlite3')
+        archive = PaperArchive(path, max_papers=0)   # 写入与检索在不限数量的档案上测量
+        start = time.perf_counter()
+        for i in range(0, len(papers), args.batch):
+            archive.add(papers[i:i + args.batch])
+        elapsed = time.perf_counter() - start
+        archive.close()
+        print(f"写入: {elapsed:.1f}s, {len(papers) / elapsed:,.0f} 篇/秒, "
+              f"数据库 {os.path.getsize(path) / 1e6:.0f} MB")
+
+        # 重复写入（已存档论文的更新路径）
+        start = time.perf_counter()
+        archive.add(papers[:args.batch * 10])
+        print(f"重复写入 {args.batch * 10} 篇: {(time.perf_counter() - start) * 1000:.0f}ms, "
+              f"档案共 {archive.count()} 篇")
+
+        today = date.today()
+        print(f"\n{'查询':<52}{'结果':>6}{'p50':>10}{'p95':>10}")
+        for query, options in QUERIES:
+            kwargs = {k: v for k, v in options.items() if k != 'days'}
+            if 'days' in options:
+                kwargs['since'] = today - timedelta(days=options['days'] - 1)
+            timings = []
+            for _ in range(args.repeat):
+                t = time.perf_counter()
+                hits = archive.search(query, limit=20, **kwargs)
+                timings.append((time.perf_counter() - t) * 1000)
+            timings.sort()
+            label = query + ''.join(f" {k}={v}" for k, v in options.items())
+            print(f"{label:<52}{len(hits):>6}{statistics.median(timings):>8.1f}ms"
+                  f"{timings[int(len(timings) * 0.95) - 1]:>8.1f}ms")
+
+        archive.max_papers = args.max_papers
+        start = time.perf_counter()
+        deleted = archive.prune()
+        archive.close()
+        print(f"\n保留上限 {args.max_papers}: 删除 {deleted} 篇 {(time.perf_counter() - start) * 1000:.0f}ms, "
+              f"数据库 {os.path.getsize(path) / 1e6:.0f} MB（删除的页留待复用，文件不再增长）")
+
+
+if __name__ == '__main__':
+    main()
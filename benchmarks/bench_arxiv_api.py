@@ -0,0 +1,101 @@
+"""
+arXiv API 查询模式基准 — ARXIV_MODE=api（服务器端关键词检索）与 RSS 模式（下载各分类全部条目）的对比
+
+同一批合成论文（见 arxiv_fixtures.py，每 --hit-every 篇一篇命中关键词）分别由本地回放服务器按分类提供 RSS，
+由 arxiv_api_server 按关键词检索。两种模式各运行一次 fetch_recent_papers，比较请求数、下载字节与耗时，
+"按真实站点限速" 一列按 fetch_engine.HOST_RATE_LIMITS 估算（rss.arxiv.org 与 export.arxiv.org）。
+两种模式找到的论文（ID、命中关键词、分类）不一致或有命中论文遗漏时以非零状态退出。
+
+用法: python benchmarks/bench_arxiv_api.py [--entries 20] [--hit-every 100] [--page-size 50] [--latency-ms 50]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ['SEEN_DB_PATH'] = ''   # 每次运行都从空状态开始
+os.environ['HTTP_CACHE_DIR'] = ''
+os.environ['ARCHIVE_DB_PATH'] = ''
+
+import arxiv_fetcher  # noqa: E402
+import arxiv_taxonomy  # noqa: E402
+import fetch_engine  # noqa: E402
+from arxiv_api_server import ArxivAPIServer  # noqa: E402
+from arxiv_fixtures import KEYWORD, atom_entry, build_corpus, rss_routes  # noqa: E402
+from config import Config  # noqa: E402
+from http_client import FeedHealth, http_client  # noqa: E402
+from replay_server import ReplayServer  # noqa: E402
+
+
+def run(mode: str, stats: dict, host: str):
+    Config.ARXIV_MODE = mode
+    requests_before, bytes_before = stats['requests'], stats['bytes_sent']
+    start = time.perf_counter()
+    papers = arxiv_fetcher.ArxivFetcher().fetch_recent_papers(days_back=1)
+    wall = time.perf_counter() - start
+    requests = stats['requests'] - requests_before
+    rate, burst = fetch_engine.HOST_RATE_LIMITS[host]
+    return papers, {'requests': requests, 'bytes': stats['bytes_sent'] - bytes_before, 'wall': wall,
+                    'paced': max(0, requests - burst) / rate}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=20, help='每个分类的主分类论文数')
+    parser.add_argument('--hit-every', type=int, default=100, help='每多少篇论文一篇命中关键词')
+    parser.add_argument('--cross-rate', type=float, default=0.3, help='交叉列出的论文比例')
+    parser.add_argument('--page-size', type=int, default=Config.ARXIV_API_PAGE_SIZE, help='API 每页条目数')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='每个 HTTP 请求的固定延迟')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    corpus = build_corpus(arxiv_taxonomy.ALL_CATEGORIES, args.entries, args.cross_rate, args.hit_every, args.seed)
+    expected = {p.id for p in corpus if p.hit}
+    latency = args.latency_ms / 1000
+
+    with ReplayServer(rss_routes(corpus), latency=latency) as replay, \
+            ArxivAPIServer([atom_entry(p) for p in corpus], latency=latency) as api, \
+            tempfile.TemporaryDirectory() as tmp:
+        Config.SEARCH_KEYWORDS = [KEYWORD]
+        Config.ARXIV_CATEGORIES = ['all']
+        Config.FEED_MIRROR_URL = replay.url
+        Config.ARXIV_API_URL = api.url
+        Config.ARXIV_API_PAGE_SIZE = args.page_size
+        # 本地回放不需要礼貌限速
+        fetch_engine.rate_limiter.limits = {'127.0.0.1': (1e9, 10 ** 6)}
+        http_client.health = FeedHealth(os.path.join(tmp, 'feed_health.json'))
+
+        rss_papers, rss = run('rss', replay.stats, 'rss.arxiv.org')
+        api_papers, query = run('api', api.stats, 'export.arxiv.org')
+
+    print(f"论文: {len(corpus)}（{len(arxiv_taxonomy.ALL_CATEGORIES)} 个分类），命中关键词 {len(expected)} 篇，"
+          f"API 每页 {args.page_size} 条")
+    print(f"{'':<10}{'请求数':>8}{'下载':>12}{'耗时':>10}{'按真实站点限速':>18}")
+    for name, r in (('RSS', rss), ('API 查询', query)):
+        print(f"{name:<10}{r['requests']:>8}{r['bytes'] / 1024:>10.0f}KB{r['wall'] * 1000:>8.0f}ms{r['paced']:>16.0f}s")
+    if query['bytes']:
+        print(f"API 查询的下载量为 RSS 模式的 1/{rss['bytes'] / query['bytes']:.0f}")
+
+    def signature(papers):
+        return sorted((p.id, p.matched_keywords, p.categories) for p in papers)
+
+    failed = False
+    if signature(api_papers) != signature(rss_papers):
+        failed = True
+        print(f"✗ API 查询找到 {len(api_papers)} 篇，与 RSS 模式的 {len(rss_papers)} 篇不一致")
+    missing = expected - {p.id for p in api_papers}
+    if missing:
+        failed = True
+        print(f"✗ API 查询遗漏 {len(missing)} 篇: {sorted(missing)[:10]}")
+    if failed:
+        sys.exit(1)
+    print(f"两种模式均找到 {len(expected)} 篇，结果一致")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,146 @@
+"""
+历史回填基准 — 本地 OAI-PMH 服务器回放录制的 ListRecords 页面，测量收割吞吐并验证断点续传
+
+1. 吞吐: 完整收割 N 页，统计记录/秒；再经 ArxivFetcher.backfill_papers 走完日期过滤与关键词匹配
+2. 流控: 指定页先返回 503 + Retry-After，收割器应等待后重试同一页
+3. 断点续传（经 ArxivFetcher.backfill_papers）: 中途某页持续返回 500（重试后仍失败）使回填中断，
+   重新运行应从检查点所在页继续、不再请求已完成的页，返回的论文与一次不中断的回填完全相同；
+   收割完成但尚未投递（发送失败）时再次运行不发请求、返回同样的论文；--dry-run（checkpoint=False）不写检查点，
+   之后的正式回填仍返回全部论文；finish_backfill() 之后检查点被删除
+
+用法: python benchmarks/bench_backfill.py [--pages 20] [--page-size 500] [--retry-after 1]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ['SEEN_DB_PATH'] = ''   # 每次运行都从空状态开始
+
+import requests  # noqa: E402
+
+import fetch_engine  # noqa: E402
+from arxiv_fetcher import ArxivFetcher  # noqa: E402
+from config import Config  # noqa: E402
+from http_client import FeedHealth, http_client  # noqa: E402
+from oai_harvester import OAIHarvester  # noqa: E402
+from oai_server import OAIServer, sample_records  # noqa: E402
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'oai_listrecords_physics.xml')
+START, END = date(2026, 8, 1), date(2026, 9, 30)
+KEYWORDS = ['Rydberg', 'trapped ion', 'quantum imaging']
+
+
+def harvest_count(server: OAIServer, checkpoint_dir: str = '', resume: bool = True) -> int:
+    harvester = OAIHarvester(base_url=server.url, checkpoint_dir=checkpoint_dir)
+    return sum(1 for _ in harvester.harvest_set('physics:quant-ph', START, END, resume=resume))
+
+
+def backfill_ids(fetcher: ArxivFetcher, **kwargs):
+    return {p.id for p in fetcher.backfill_papers(START, END, ['quant-ph'], **kwargs)}
+
+
+def bench_throughput(records, args):
+    with OAIServer(records, pages=args.pages, page_size=args.page_size) as server:
+        start = time.perf_counter()
+        papers = harvest_count(server)
+        elapsed = time.perf_counter() - start
+        print(f"收割: {args.pages} 页 / {server.total_records} 条记录 → {papers} 篇论文, "
+              f"{elapsed * 1000:.0f}ms, {server.total_records / elapsed:,.0f} 条/秒, "
+              f"{server.stats['bytes_sent'] / elapsed / 1e6:.1f} MB/秒")
+
+        # 完整回填路径：收割 + 按提交日期过滤 + 关键词匹配
+        Config.OAI_BASE_URL = server.url
+        Config.OAI_CHECKPOINT_DIR = ''
+        start = time.perf_counter()
+        matched = ArxivFetcher(KEYWORDS).backfill_papers(START, END, ['quant-ph'])
+        elapsed = time.perf_counter() - start
+        print(f"回填: {len(matched)} 篇匹配关键词, {elapsed * 1000:.0f}ms, "
+              f"{server.total_records / elapsed:,.0f} 条/秒")
+
+
+def check_throttle(records, args) -> bool:
+    throttled = {2, args.pages}
+    with OAIServer(records, pages=args.pages, page_size=args.page_size, throttle_pages=throttled,
+                   retry_after=args.retry_after) as server:
+        start = time.perf_counter()
+        papers = harvest_count(server)
+        elapsed = time.perf_counter() - start
+    expected = len(throttled) * args.retry_after
+    ok = server.stats['throttled'] == len(throttled) and elapsed >= expected
+    print(f"流控: {server.stats['throttled']} 次 503, 耗时 {elapsed:.1f}s（Retry-After 合计 {expected}s）, "
+          f"{papers} 篇论文 — {'通过' if ok else '失败'}")
+    return ok
+
+
+def check_resume(records, args) -> bool:
+    fail_page = args.pages // 2 + 1
+    fetcher = ArxivFetcher(KEYWORDS)
+    with OAIServer(records, pages=args.pages, page_size=args.page_size) as server, \
+            tempfile.TemporaryDirectory() as cache_dir:
+        Config.OAI_BASE_URL = server.url
+        Config.OAI_CHECKPOINT_DIR = cache_dir
+        full = backfill_ids(fetcher, checkpoint=False)   # 对照: 不中断、不使用检查点
+
+        # dry-run 不写检查点，之后的正式回填仍返回全部论文
+        dry = backfill_ids(fetcher, checkpoint=False)
+        ok = not os.listdir(cache_dir) and dry == full
+
+        server.fail_pages = {fail_page}
+        server.page_requests.clear()
+        try:
+            backfill_ids(fetcher)
+            ok = False
+            print(f"✗ 断点续传: 第 {fail_page} 页失败，回填未中断")
+        except requests.HTTPError as e:
+            print(f"断点续传: 第 {fail_page} 页失败，回填中断（{e.response.status_code}）")
+        server.fail_pages.clear()
+
+        server.page_requests.clear()
+        resumed = backfill_ids(fetcher)
+        resumed_from = server.page_requests[0] if server.page_requests else None
+
+        # 收割完成、投递失败（未调用 finish_backfill）: 再次运行不发请求，返回同样的论文
+        server.page_requests.clear()
+        again = backfill_ids(fetcher)
+        again_requests = len(server.page_requests)
+
+        fetcher.finish_backfill(START, END, ['quant-ph'])
+        cleared = not os.listdir(cache_dir)
+
+    ok = (ok and resumed == full and resumed_from == fail_page
+          and again == full and again_requests == 0 and cleared)
+    print(f"断点续传: 续传从第 {resumed_from} 页开始, 返回 {len(resumed)} 篇（不中断的回填 {len(full)} 篇，"
+          f"{'相同' if resumed == full else '不同'}）; dry-run 后 {len(dry)} 篇; "
+          f"收割完成后再次运行 {len(again)} 篇 / {again_requests} 次请求; "
+          f"投递后检查点{'已' if cleared else '未'}删除 — {'通过' if ok else '失败'}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--pages', type=int, default=20)
+    parser.add_argument('--page-size', type=int, default=500, help='每页记录数（arXiv 实际为 1000 左右）')
+    parser.add_argument('--retry-after', type=int, default=1, help='流控测试中 503 响应的 Retry-After 秒数')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING)
+    # 本地服务器不需要请求限速
+    fetch_engine.rate_limiter.limits = {'127.0.0.1': (1e9, 10 ** 6)}
+    http_client.health = FeedHealth('')   # 模拟的失败不写入订阅源健康记录
+    with open(FIXTURE, 'rb') as f:
+        records = sample_records(f.read())
+
+    bench_throughput(records, args)
+    ok = check_throttle(records, args)
+    ok = check_resume(records, args) and ok
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == '__main__':
+    main()
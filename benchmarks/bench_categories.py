@@ -0,0 +1,92 @@
+"""
+全分类监控基准 — 合并请求（cat1+cat2+...）与逐分类请求的请求数、字节数与耗时对比
+
+为全部约 150 个 arXiv 分类各生成一个 RSS 源（部分论文交叉列出到其他分类，出现在多个源中），
+由本地回放服务器提供；合并请求由回放服务器按分类即时合成。设置 ARXIV_CATEGORIES=all，
+分别以默认的合并请求与 ARXIV_BATCH_MAX_ENTRIES=0（每个分类单独请求）运行 fetch_recent_papers，
+比较找到的论文（ID、命中关键词、分类）。两者不一致或有论文遗漏时以非零状态退出。
+"按 rss.arxiv.org 限速" 一列按 fetch_engine.HOST_RATE_LIMITS 估算真实站点上的最短耗时。
+
+用法: python benchmarks/bench_categories.py [--entries 20] [--cross-rate 0.3] [--latency-ms 50]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ['SEEN_DB_PATH'] = ''   # 每次运行都从空状态开始
+os.environ['HTTP_CACHE_DIR'] = ''
+os.environ['ARCHIVE_DB_PATH'] = ''
+
+import arxiv_fetcher  # noqa: E402
+import arxiv_taxonomy  # noqa: E402
+import fetch_engine  # noqa: E402
+from arxiv_fixtures import KEYWORD, build_corpus, rss_routes  # noqa: E402
+from config import Config  # noqa: E402
+from http_client import FeedHealth, http_client  # noqa: E402
+from replay_server import ReplayServer  # noqa: E402
+
+
+def run(server: ReplayServer, max_entries: int):
+    Config.ARXIV_BATCH_MAX_ENTRIES = max_entries
+    requests_before, bytes_before = server.stats['requests'], server.stats['bytes_sent']
+    start = time.perf_counter()
+    papers = arxiv_fetcher.ArxivFetcher().fetch_recent_papers(days_back=1)
+    wall = time.perf_counter() - start
+    requests = server.stats['requests'] - requests_before
+    rate, burst = fetch_engine.HOST_RATE_LIMITS['rss.arxiv.org']
+    return papers, {'requests': requests, 'bytes': server.stats['bytes_sent'] - bytes_before, 'wall': wall,
+                    'paced': max(0, requests - burst) / rate}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=20, help='每个分类的主分类论文数')
+    parser.add_argument('--cross-rate', type=float, default=0.3, help='交叉列出的论文比例')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='每个 HTTP 请求的固定延迟')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    corpus = build_corpus(arxiv_taxonomy.ALL_CATEGORIES, args.entries, args.cross_rate, seed=args.seed)
+    routes = rss_routes(corpus)
+    expected = {p.id for p in corpus if p.hit}
+
+    with ReplayServer(routes, latency=args.latency_ms / 1000) as server, tempfile.TemporaryDirectory() as tmp:
+        Config.SEARCH_KEYWORDS = [KEYWORD]
+        Config.ARXIV_CATEGORIES = ['all']
+        Config.FEED_MIRROR_URL = server.url
+        # 本地回放不需要礼貌限速
+        fetch_engine.rate_limiter.limits = {'127.0.0.1': (1e9, 10 ** 6)}
+        http_client.health = FeedHealth(os.path.join(tmp, 'feed_health.json'))
+
+        batched_papers, batched = run(server, Config.ARXIV_BATCH_MAX_ENTRIES)
+        single_papers, single = run(server, 0)
+
+    print(f"分类: {len(arxiv_taxonomy.ALL_CATEGORIES)}, 每分类 {args.entries} 篇, 交叉列出比例 {args.cross_rate:g}")
+    print(f"{'':<12}{'请求数':>8}{'下载':>12}{'耗时':>10}{'按 rss.arxiv.org 限速':>24}")
+    for name, r in (('合并请求', batched), ('逐分类请求', single)):
+        print(f"{name:<12}{r['requests']:>8}{r['bytes'] / 1024:>10.0f}KB{r['wall'] * 1000:>8.0f}ms{r['paced']:>22.0f}s")
+
+    def signature(papers):
+        return sorted((p.id, p.matched_keywords, p.categories) for p in papers)
+
+    failed = False
+    if signature(batched_papers) != signature(single_papers):
+        failed = True
+        print(f"✗ 合并请求找到 {len(batched_papers)} 篇，与逐分类请求的 {len(single_papers)} 篇不一致")
+    missing = expected - {p.id for p in batched_papers}
+    if missing:
+        failed = True
+        print(f"✗ 合并请求遗漏 {len(missing)} 篇: {sorted(missing)[:10]}")
+    if failed:
+        sys.exit(1)
+    print(f"两种方式均找到 {len(expected)} 篇，结果一致")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""
+运行时间预算基准 — 个别订阅源挂起、响应缓慢或出错时，一次运行仍在 RUN_DEADLINE_SECONDS 内结束抓取并发送摘要
+
+数据源由本地回放服务器提供（同 bench_pipeline.py），邮件发到本地 SMTP 接收端。依次运行:
+- 正常: 所有订阅源正常响应（参照）
+- 故障: 一个期刊源挂起（--stall 秒后才响应）、一个期刊源的响应体在 --drip 秒内逐块发送、一个期刊源返回 404
+- 出错: 抓取过程中抛出异常（模拟去重出错）
+检查: 故障运行的总耗时不超过时间预算 + --slack 秒，摘要照常发送、包含正常数据源的论文，并列出两个超时的源与获取失败的源；
+超时与失败的源不记入抓取日程（下次运行重新抓取），超时不计入订阅源健康记录；出错运行仍发送摘要并列出全部数据源。
+不满足时以非零状态退出。
+
+用法: python benchmarks/bench_deadline.py [--entries 300] [--deadline 5] [--stall 3600] [--drip 30]
+"""
+import argparse
+import email
+import email.policy
+import json
+import logging
+import os
+import re
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_pipeline import KEYWORDS, build_routes  # noqa: E402  (同时关闭 SEEN_DB / HTTP 缓存 / 抓取日程文件)
+import fetch_engine  # noqa: E402
+import paper_archive  # noqa: E402
+import smtp_client  # noqa: E402
+import UnifiedFetcher  # noqa: E402
+from config import Config  # noqa: E402
+from feed_schedule import FeedSchedule  # noqa: E402
+from http_client import FeedHealth, http_client  # noqa: E402
+from journal_rss import JOURNAL_RSS_FEEDS  # noqa: E402
+from replay_server import ReplayServer, route_for  # noqa: E402
+from sharding import all_sources  # noqa: E402
+from smtp_sink import SmtpSink  # noqa: E402
+
+_TOTAL_RE = re.compile(r'共发现 (\d+) 篇相关论文')
+
+
+def mail_texts(raw_messages):
+    """收到的邮件的纯文本正文"""
+    texts = []
+    for raw in raw_messages:
+        msg = email.message_from_bytes(raw, policy=email.policy.default)
+        texts.append(msg.get_body(('plain',)).get_content())
+    return texts
+
+
+def run_once(digest_main, sink):
+    """运行一次 ArxivDailyDigest.run()，返回 (耗时, 邮件正文, 抓取日程)"""
+    schedule = UnifiedFetcher.feed_schedule = FeedSchedule(path='')
+    before = len(sink.messages)
+    start = time.perf_counter()
+    digest_main.ArxivDailyDigest().run()
+    return time.perf_counter() - start, mail_texts(sink.messages[before:]), schedule
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=300, help='每个源的条目数')
+    parser.add_argument('--days', type=float, default=7.0, help='期刊条目日期分布的天数')
+    parser.add_argument('--deadline', type=float, default=5.0, help='运行时间预算（秒）')
+    parser.add_argument('--stall', type=float, default=3600.0, help='挂起的订阅源多久之后才响应（秒）')
+    parser.add_argument('--drip', type=float, default=30.0, help='缓慢的订阅源发送完响应体的总耗时（秒）')
+    parser.add_argument('--slack', type=float, default=3.0, help='允许超出时间预算的秒数（发送邮件、最后一次读取）')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    import main as digest_main  # 导入时会配置日志
+    logging.getLogger().setLevel(logging.WARNING)
+
+    routes = build_routes(args.entries, args.days)
+    (stalled, stalled_url), (dripping, dripping_url), (missing, missing_url) = JOURNAL_RSS_FEEDS[:3]
+    problems = []
+
+    with SmtpSink() as sink, tempfile.TemporaryDirectory() as tmp:
+        Config.SEARCH_KEYWORDS = KEYWORDS
+        Config.MAX_RESULTS = 200
+        Config.RUN_DEADLINE_SECONDS = args.deadline
+        Config.SMTP_HOST, Config.SMTP_PORT = sink.host, sink.port
+        Config.SMTP_TLS = 'none'  # 本地接收端不支持 TLS
+        Config.EMAIL_SENDER = Config.RECIPIENT_EMAIL = 'bench@localhost'
+        Config.EMAIL_PASSWORD = 'bench'
+        # 本地回放不需要礼貌限速
+        fetch_engine.rate_limiter.limits = {'127.0.0.1': (1e9, 10 ** 6)}
+        smtp_client.smtp_rate_limiter.limits = {'127.0.0.1': (1e9, 10 ** 6)}
+        paper_archive.paper_archive.path = ''
+        health_path = os.path.join(tmp, 'feed_health.json')
+        http_client.health = FeedHealth(health_path)
+
+        with ReplayServer(routes) as server:
+            Config.FEED_MIRROR_URL = server.url
+            base_wall, base_texts, _ = run_once(digest_main, sink)
+        base_total = sum(int(n) for text in base_texts for n in _TOTAL_RE.findall(text))
+
+        faulty = dict(routes)
+        del faulty[route_for(missing_url)]
+        with ReplayServer(faulty, stalls={route_for(stalled_url): args.stall},
+                          drips={route_for(dripping_url): args.drip}) as server:
+            Config.FEED_MIRROR_URL = server.url
+            wall, texts, schedule = run_once(digest_main, sink)
+
+            # 抓取中途出错: 仍发送摘要，全部数据源列为未完成
+            original = UnifiedFetcher.deduplicate
+            UnifiedFetcher.deduplicate = lambda papers: 1 / 0
+            try:
+                _, crash_texts, crash_schedule = run_once(digest_main, sink)
+            finally:
+                UnifiedFetcher.deduplicate = original
+
+        with open(health_path, 'r', encoding='utf-8') as f:
+            feeds = json.load(f)['feeds']
+
+    total = sum(int(n) for text in texts for n in _TOTAL_RE.findall(text))
+    body = '\n'.join(texts)
+    print(f"源数: {len(routes)}, 每源条目: {args.entries}, 时间预算: {args.deadline:g} 秒")
+    print(f"{'运行':<8}{'耗时':>10}{'邮件':>6}{'论文':>6}")
+    print(f"{'正常':<8}{base_wall:>9.2f}s{len(base_texts):>6}{base_total:>6}")
+    print(f"{'故障':<8}{wall:>9.2f}s{len(texts):>6}{total:>6}")
+    print(f"故障: {stalled} 挂起 {args.stall:g} 秒，{dripping} 响应体 {args.drip:g} 秒发完，{missing} 返回 404")
+
+    if wall > args.deadline + args.slack:
+        problems.append(f"故障运行耗时 {wall:.2f} 秒，超出时间预算 {args.deadline:g} + {args.slack:g} 秒")
+    if not texts:
+        problems.append("故障运行没有发送摘要")
+    elif not total:
+        problems.append("故障运行的摘要中没有正常数据源的论文")
+    for name, reason in ((stalled, '超时'), (dripping, '超时'), (missing, '获取失败')):
+        if not re.search(rf"- {re.escape(name)}: {reason}", body):
+            problems.append(f"摘要中没有将 {name} 列为{reason}")
+        if schedule.last_fetch(f"journal:{name}") is not None:
+            problems.append(f"未完成的 {name} 被记入抓取日程")
+    healthy = JOURNAL_RSS_FEEDS[3][0]
+    if schedule.last_fetch(f"journal:{healthy}") is None:
+        problems.append(f"正常的 {healthy} 没有记入抓取日程")
+    for name in (stalled, dripping):
+        if feeds.get(name, {}).get('failures'):
+            problems.append(f"因时间预算取消的 {name} 被计入订阅源健康记录的失败次数")
+
+    crash_body = '\n'.join(crash_texts)
+    listed = crash_body.count('抓取出错')
+    print(f"{'出错':<8}{'':>10}{len(crash_texts):>6}{'':>6}  摘要中列出 {listed} 个未完成的数据源")
+    if not crash_texts:
+        problems.append("抓取出错时没有发送摘要")
+    elif listed != len(all_sources()):
+        problems.append(f"抓取出错时摘要列出 {listed} 个未完成的数据源，应为 {len(all_sources())} 个")
+    if any(crash_schedule.last_fetch(f"journal:{name}") is not None for name, _ in JOURNAL_RSS_FEEDS):
+        problems.append("抓取出错的运行被记入抓取日程")
+
+    if problems:
+        for p in problems:
+            print(f"✗ {p}")
+        sys.exit(1)
+    print(f"\n故障运行在 {wall:.2f} 秒内发送了摘要（时间预算 {args.deadline:g} 秒），未完成的数据源均已列出")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,96 @@
+"""
+订阅源解析基准 — feedparser 全量解析 vs 流式解析（解析时做日期截止 + 关键词预过滤）
+
+对每个样本源分别扩展到指定规模，测量 CPU 时间和 tracemalloc 峰值内存。
+用法: python benchmarks/bench_feed_parser.py [--entries 10000] [--days 7]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ['SEEN_DB_PATH'] = ''   # 基准测试不读写已投递记录
+os.environ['HTTP_CACHE_DIR'] = ''
+
+import feedparser  # noqa: E402
+
+from arxiv_fetcher import ArxivFetcher  # noqa: E402
+from feed_fixtures import FIXTURES, scale_feed  # noqa: E402
+from journal_rss import JournalRSSFetcher  # noqa: E402
+from keyword_matcher import get_matcher  # noqa: E402
+
+KEYWORDS = ['Rydberg atom', 'quantum contextuality', 'quantum imaging', 'aperture synthesis']
+
+
+def legacy_parse(content: bytes, cutoff: datetime, matcher):
+    """旧路径: feedparser 构建全部条目 → 字典 → 格式化日期 → strptime 回解析 → 过滤"""
+    feed = feedparser.parse(content)
+    papers = []
+    for entry in feed.entries:
+        pub_parsed = entry.get('published_parsed') or entry.get('updated_parsed')
+        if not pub_parsed:
+            continue
+        pub_date = datetime(*pub_parsed[:6], tzinfo=timezone.utc)
+        papers.append({
+            'title': entry.get('title', '').strip(),
+            'abstract': (entry.get('summary', '') or entry.get('description', '')).strip(),
+            'link': entry.get('link', ''),
+            'published': pub_date.strftime('%Y-%m-%d %H:%M'),
+        })
+    kept = []
+    for paper in papers:
+        pub_dt = datetime.strptime(paper['published'], '%Y-%m-%d %H:%M').replace(tzinfo=timezone.utc)
+        if pub_dt < cutoff:
+            continue
+        if matcher.find(f"{paper['title']}\n{paper['abstract']}"):
+            kept.append(paper)
+    return kept
+
+
+def measure(fn):
+    start = time.process_time()
+    result = fn()
+    cpu = time.process_time() - start
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, cpu, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--entries', type=int, default=10000)
+    parser.add_argument('--days', type=float, default=7.0,
+                        help='期刊样本条目日期分布的天数（时间窗口为 1 天）')
+    args = parser.parse_args()
+
+    import config
+    config.Config.SEARCH_KEYWORDS = KEYWORDS
+    arxiv = ArxivFetcher()
+    journals = JournalRSSFetcher(KEYWORDS)
+    matcher = get_matcher(KEYWORDS)
+
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(days=1)
+
+    print(f"{'样本':<18}{'条目':>7} | {'feedparser CPU':>14} {'峰值内存':>10} | "
+          f"{'流式 CPU':>9} {'峰值内存':>10} | {'命中':>9}")
+    for name in FIXTURES:
+        content = scale_feed(name, args.entries, days=args.days, now=now)
+        if name.startswith('arxiv'):
+            stream = lambda: arxiv._parse_feed(content, 'quant-ph', cutoff)  # noqa: E731
+        else:
+            stream = lambda: journals._parse_feed(content, name, cutoff)  # noqa: E731
+
+        old, old_cpu, old_peak = measure(lambda: legacy_parse(content, cutoff, matcher))
+        new, new_cpu, new_peak = measure(stream)
+        print(f"{name:<18}{args.entries:>7} | {old_cpu * 1000:>11.0f} ms {old_peak / 2**20:>7.1f} MB | "
+              f"{new_cpu * 1000:>6.0f} ms {new_peak / 2**20:>7.1f} MB | {len(old):>4}/{len(new):<4}")
+
+
+if __name__ == '__main__':
+    main()
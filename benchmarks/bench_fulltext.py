@@ -0,0 +1,130 @@
+"""
+PDF 全文匹配基准 — 本地回放 arXiv RSS 与论文 PDF，测量下载、进程池提取与缓存命中
+
+样本见 pdf_fixtures.py：每四篇论文中一篇只在正文中出现关键词（应被找回），一篇只在参考文献中出现，
+一篇全文都没有，一篇与关键词无关（不应下载）。ArxivFetcher.fetch_recent_papers 运行两次:
+第一次下载并提取全部候选 PDF，第二次应全部命中文本缓存、不再请求 PDF；找回的论文按正文词频参与相关度排序，分数应大于 0。
+另在进程内串行提取同一批 PDF 作为对照，衡量进程池的加速比。找回的论文与预期不符时以非零状态退出。
+
+用法: python benchmarks/bench_fulltext.py [--papers 40] [--pages 12] [--latency-ms 50]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ['SEEN_DB_PATH'] = ''   # 每次运行都从空状态开始
+os.environ['HTTP_CACHE_DIR'] = ''
+os.environ['ARCHIVE_DB_PATH'] = ''
+
+import arxiv_fetcher  # noqa: E402
+import arxiv_taxonomy  # noqa: E402
+import fetch_engine  # noqa: E402
+import pdf_fulltext  # noqa: E402
+from config import Config  # noqa: E402
+from http_client import FeedHealth, http_client  # noqa: E402
+from metrics import metrics  # noqa: E402
+from pdf_fixtures import KEYWORD, build_corpus  # noqa: E402
+from relevance import rank_papers  # noqa: E402
+from replay_server import ReplayServer, route_for  # noqa: E402
+
+
+def run_fetch(server: ReplayServer):
+    metrics.reset()
+    requests_before = server.stats['requests']
+    start = time.perf_counter()
+    papers = arxiv_fetcher.ArxivFetcher().fetch_recent_papers(days_back=1)
+    wall = time.perf_counter() - start
+    timers = metrics.to_dict()['timers']
+
+    def total(name):
+        return sum(t['sum_s'] for t in timers.get(name, []))
+
+    return papers, {'wall': wall, 'download': total('pdf_download'), 'extract': total('pdf_extract'),
+                    'requests': server.stats['requests'] - requests_before}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--papers', type=int, default=40, help='RSS 中的论文数')
+    parser.add_argument('--pages', type=int, default=12, help='每篇 PDF 的页数')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='每个 HTTP 请求的固定延迟')
+    parser.add_argument('--workers', type=int, default=4, help='PDF 并发下载数')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    if not pdf_fulltext.pypdf_available():
+        sys.exit("需要 pypdf: pip install pypdf")
+
+    rss, pdfs, expected = build_corpus(args.papers, args.pages, seed=args.seed)
+    routes = {route_for(f"https://rss.arxiv.org/rss/{c}"): rss for c in arxiv_fetcher.ARXIV_CATEGORIES}
+    for arxiv_id, pdf in pdfs.items():
+        routes[route_for(f"https://arxiv.org/pdf/{arxiv_id}.pdf")] = pdf
+    n_candidates = args.papers - args.papers // 4
+
+    with ReplayServer(routes, latency=args.latency_ms / 1000) as server, \
+            tempfile.TemporaryDirectory() as cache_dir:
+        Config.SEARCH_KEYWORDS = [KEYWORD]
+        Config.FEED_MIRROR_URL = server.url
+        Config.PDF_FULLTEXT = True
+        Config.PDF_CACHE_DIR = os.path.join(cache_dir, 'pdf')
+        Config.PDF_MAX_PAPERS = args.papers
+        Config.PDF_WORKERS = args.workers
+        # 本地回放不需要礼貌限速
+        fetch_engine.rate_limiter.limits = {'127.0.0.1': (1e9, 10 ** 6)}
+        http_client.health = FeedHealth(os.path.join(cache_dir, 'feed_health.json'))
+
+        cold_papers, cold = run_fetch(server)
+        warm_papers, warm = run_fetch(server)
+
+        # 对照: 同一批 PDF 在当前进程中串行提取
+        serial_dir = os.path.join(cache_dir, 'serial')
+        os.makedirs(serial_dir)
+        paths = []
+        for arxiv_id in sorted(pdfs)[:n_candidates]:
+            path = os.path.join(serial_dir, arxiv_id + '.pdf')
+            with open(path, 'wb') as f:
+                f.write(pdfs[arxiv_id])
+            paths.append(path)
+        start = time.perf_counter()
+        for path in paths:
+            pdf_fulltext.extract_text(path)
+        serial = time.perf_counter() - start
+
+    pdf_bytes = sum(len(pdf) for pdf in pdfs.values())
+    print(f"论文: {args.papers}, 全文候选: {n_candidates}, 每篇 {args.pages} 页, "
+          f"PDF 共 {pdf_bytes / 1024 / 1024:.1f} MB, CPU 核心: {os.cpu_count()}")
+    print(f"{'':<10}{'总耗时':>10}{'下载(累计)':>12}{'提取':>10}{'HTTP 请求':>10}")
+    for name, r in (('首次', cold), ('缓存', warm)):
+        print(f"{name:<10}{r['wall'] * 1000:>8.0f}ms{r['download'] * 1000:>10.0f}ms"
+              f"{r['extract'] * 1000:>8.0f}ms{r['requests']:>10}")
+    if cold['extract']:
+        print(f"串行提取对照: {serial * 1000:.0f} ms（进程池加速 {serial / cold['extract']:.1f}x，含进程启动）")
+
+    failed = False
+    for name, papers in (('首次', cold_papers), ('缓存', warm_papers)):
+        found = {p.id for p in papers if p.fulltext_snippets}
+        if found != expected:
+            failed = True
+            print(f"✗ {name}: 全文找回 {sorted(found)}，预期 {sorted(expected)}")
+        unscored = [p.id for p in rank_papers(papers) if p.fulltext_snippets and not p.score]
+        if unscored:
+            failed = True
+            print(f"✗ {name}: 全文找回的论文相关度为 0: {unscored}")
+    rss_requests = len(arxiv_taxonomy.category_batches(arxiv_fetcher.configured_categories(),
+                                                       Config.ARXIV_BATCH_URL_CHARS, Config.ARXIV_BATCH_MAX_ENTRIES))
+    pdf_requests = warm['requests'] - rss_requests
+    if pdf_requests:
+        failed = True
+        print(f"✗ 缓存运行仍请求了 {pdf_requests} 个 PDF")
+    if failed:
+        sys.exit(1)
+    example = next(p for p in rank_papers(cold_papers) if p.fulltext_snippets)
+    print(f"全文找回 {len(expected)} 篇，示例片段: {example.fulltext_snippets[0][1]}（相关度 {example.score:g}）")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,133 @@
+"""
+内存基准 — 数据源与订阅者成倍增加时，完整运行一次的 Python 内存峰值应基本不变
+
+数据源由本地回放服务器提供（同 bench_pipeline.py），每个规模 k 把 arXiv 分类与期刊源各复制 k 份
+（不同地址、相同内容），订阅者数为 k × --subscribers；邮件发送到本地 SMTP 接收端（只计数不保留）。
+用 tracemalloc 统计 ArxivDailyDigest.run() 期间的内存峰值（不含预先生成的回放数据）。
+
+峰值主要由同时在途的订阅源响应体决定（FETCH_WORKERS × 单个源的大小），与源的总数无关；
+解析出的论文边解析边写入档案（每批 ARCHIVE_BATCH 篇），邮件逐封渲染、逐封发送。
+最大规模的峰值超过 --ceiling-mb，或相对最小规模增长超过 --max-growth 倍时以非零状态退出。
+
+用法: python benchmarks/bench_memory.py [--entries 300] [--scales 1,4] [--ceiling-mb 64] [--max-growth 1.5]
+"""
+import argparse
+import logging
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_pipeline import KEYWORDS, build_routes, write_subscribers  # noqa: E402  (同时关闭 SEEN_DB / HTTP 缓存)
+import arxiv_fetcher  # noqa: E402
+import fetch_engine  # noqa: E402
+import journal_rss  # noqa: E402
+import paper_archive  # noqa: E402
+import smtp_client  # noqa: E402
+from config import Config  # noqa: E402
+from http_client import FeedHealth, http_client  # noqa: E402
+from replay_server import ReplayServer, route_for  # noqa: E402
+from smtp_sink import SmtpSink  # noqa: E402
+
+CATEGORIES = list(arxiv_fetcher.ARXIV_CATEGORIES)
+FEEDS = list(journal_rss.JOURNAL_RSS_FEEDS)
+
+
+def scale_sources(routes, k: int):
+    """把数据源复制为 k 份（原地修改分类 / 期刊列表），返回扩展后的回放路由"""
+    scaled = dict(routes)
+    categories = list(CATEGORIES)
+    feeds = list(FEEDS)
+    for copy in range(1, k):
+        for category in CATEGORIES:
+            name = f"{category}-{copy}"
+            categories.append(name)
+            scaled[route_for(f"https://rss.arxiv.org/rss/{name}")] = routes[route_for(f"https://rss.arxiv.org/rss/{category}")]
+        for journal, url in FEEDS:
+            feeds.append((f"{journal} #{copy}", f"{url}/{copy}"))
+            scaled[route_for(f"{url}/{copy}")] = routes[route_for(url)]
+    arxiv_fetcher.ARXIV_CATEGORIES[:] = categories
+    journal_rss.JOURNAL_RSS_FEEDS[:] = feeds
+    return scaled
+
+
+def measure(base_routes, k: int, subscribers: int, tmp: str):
+    import main as digest_main
+    routes = scale_sources(base_routes, k)
+    input_bytes = sum(len(body) for body in routes.values())
+    with ReplayServer(routes) as server, SmtpSink(keep_messages=False) as sink:
+        Config.FEED_MIRROR_URL = server.url
+        Config.SMTP_HOST, Config.SMTP_PORT = sink.host, sink.port
+        Config.SMTP_TLS = 'none'  # 本地接收端不支持 TLS
+        Config.SUBSCRIBERS_FILE = write_subscribers(tmp, subscribers * k, seed=k)
+        paper_archive.paper_archive.path = os.path.join(tmp, f"archive-{k}.sqlite3")
+
+        tracemalloc.start()
+        start = time.perf_counter()
+        digest_main.ArxivDailyDigest().run()
+        wall = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {'sources': len(routes), 'subscribers': subscribers * k, 'input': input_bytes,
+                'peak': peak, 'wall': wall, 'emails': sink.received}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=300, help='每个源的条目数')
+    parser.add_argument('--days', type=float, default=7.0, help='期刊条目日期分布的天数')
+    parser.add_argument('--scales', default='1,4', help='逗号分隔的数据源 / 订阅者倍数')
+    parser.add_argument('--subscribers', type=int, default=50, help='规模为 1 时的订阅者数')
+    parser.add_argument('--workers', type=int, default=4, help='并发下载线程数（各规模相同）')
+    parser.add_argument('--ceiling-mb', type=float, default=64.0, help='内存峰值上限')
+    parser.add_argument('--max-growth', type=float, default=1.5, help='最大规模相对最小规模的峰值增长上限')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    import main  # noqa: F401  导入时会配置日志
+    logging.getLogger().setLevel(logging.WARNING)
+
+    routes = build_routes(args.entries, args.days)
+    Config.SEARCH_KEYWORDS = KEYWORDS
+    Config.FETCH_WORKERS = args.workers
+    Config.EMAIL_SENDER = Config.RECIPIENT_EMAIL = 'bench@localhost'
+    Config.EMAIL_PASSWORD = 'bench'
+    # 本地回放不需要礼貌限速
+    fetch_engine.rate_limiter.limits = {'127.0.0.1': (1e9, 10 ** 6)}
+    smtp_client.smtp_rate_limiter.limits = {'127.0.0.1': (1e9, 10 ** 6)}
+
+    print(f"每源条目: {args.entries}, 并发下载: {args.workers}")
+    print(f"{'规模':<6}{'源数':>6}{'订阅者':>8}{'邮件':>8}{'输入':>10}{'峰值':>10}{'峰值/输入':>10}{'耗时':>10}")
+    results = []
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            http_client.health = FeedHealth(os.path.join(tmp, 'feed_health.json'))
+            for k in (int(n) for n in args.scales.split(',')):
+                r = measure(routes, k, args.subscribers, tmp)
+                results.append(r)
+                print(f"{k:<6}{r['sources']:>6}{r['subscribers']:>8}{r['emails']:>8}"
+                      f"{r['input'] / 1e6:>8.1f}MB{r['peak'] / 1e6:>8.1f}MB{r['peak'] / r['input']:>10.2f}"
+                      f"{r['wall']:>9.1f}s")
+    finally:
+        arxiv_fetcher.ARXIV_CATEGORIES[:] = CATEGORIES
+        journal_rss.JOURNAL_RSS_FEEDS[:] = FEEDS
+
+    smallest, largest = results[0]['peak'], results[-1]['peak']
+    failed = False
+    if largest > args.ceiling_mb * 1e6:
+        failed = True
+        print(f"✗ 内存峰值 {largest / 1e6:.1f} MB 超过上限 {args.ceiling_mb:g} MB")
+    if len(results) > 1 and largest > smallest * args.max_growth:
+        failed = True
+        print(f"✗ 输入增长 {results[-1]['input'] / results[0]['input']:.1f} 倍时内存峰值增长 "
+              f"{largest / smallest:.2f} 倍，超过 {args.max_growth:g} 倍")
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
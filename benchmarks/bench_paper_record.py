@@ -0,0 +1,113 @@
+"""
+论文记录基准 — 字典 + strftime/strptime 往返 vs 紧凑的 Paper 记录
+
+以 arXiv 样本扩展出的条目为输入，分别测量:
+- 构造: 字典（发布时间格式化为字符串）vs Paper.create（整数时间戳）
+- 过滤 + 排序: strptime 回解析后比较 vs 直接比较时间戳
+- tracemalloc 统计的记录集合内存占用
+用法: python benchmarks/bench_paper_record.py [--entries 10000]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from feed_fixtures import scale_feed  # noqa: E402
+from feed_stream import stream_entries  # noqa: E402
+from paper import Paper  # noqa: E402
+
+
+def build_dicts(entries):
+    return [{
+        'id': e.link.rsplit('/', 1)[-1],
+        'title': e.title,
+        'authors': list(e.authors),
+        'abstract': e.summary,
+        'pdf_url': e.link.replace('/abs/', '/pdf/'),
+        'published': e.published.strftime('%Y-%m-%d %H:%M'),
+        'primary_category': e.categories[0] if e.categories else 'quant-ph',
+        'categories': list(e.categories) or ['quant-ph'],
+        'arxiv_url': e.link,
+        'matched_keywords': [],
+    } for e in entries]
+
+
+def build_papers(entries):
+    return [Paper.create(
+        id=e.link.rsplit('/', 1)[-1],
+        title=e.title,
+        authors=e.authors,
+        abstract=e.summary,
+        pdf_url=e.link.replace('/abs/', '/pdf/'),
+        published=e.published,
+        primary_category=e.categories[0] if e.categories else 'quant-ph',
+        categories=e.categories or ['quant-ph'],
+        arxiv_url=e.link,
+    ) for e in entries]
+
+
+def filter_dicts(papers, start, end):
+    kept = []
+    for p in papers:
+        pub_dt = datetime.strptime(p['published'], '%Y-%m-%d %H:%M').replace(tzinfo=timezone.utc)
+        if start <= pub_dt <= end:
+            kept.append(p)
+    kept.sort(key=lambda p: p['published'], reverse=True)
+    return kept
+
+
+def filter_papers(papers, start, end):
+    start_ts, end_ts = int(start.timestamp()), int(end.timestamp())
+    kept = [p for p in papers if start_ts <= p.published_ts <= end_ts]
+    kept.sort(key=lambda p: p.published_ts, reverse=True)
+    return kept
+
+
+def timed(fn, repeat: int = 3):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return result, best
+
+
+def footprint(fn):
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    result = fn()
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, after - before
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--entries', type=int, default=10000)
+    args = parser.parse_args()
+
+    now = datetime.now(timezone.utc)
+    start, end = now - timedelta(days=2), now
+    content = scale_feed('arxiv_quant-ph', args.entries, now=now)
+    entries = list(stream_entries(content, name='arxiv_quant-ph'))
+
+    dicts, t_dict = timed(lambda: build_dicts(entries))
+    papers, t_paper = timed(lambda: build_papers(entries))
+    _, m_dict = footprint(lambda: build_dicts(entries))
+    _, m_paper = footprint(lambda: build_papers(entries))
+    kept_d, f_dict = timed(lambda: filter_dicts(dicts, start, end))
+    kept_p, f_paper = timed(lambda: filter_papers(papers, start, end))
+
+    print(f"条目数: {len(entries)}")
+    print(f"{'':<10}{'构造':>10}{'过滤+排序':>12}{'记录内存':>12}")
+    print(f"{'字典':<10}{t_dict * 1000:>8.1f}ms{f_dict * 1000:>10.1f}ms{m_dict / 2**20:>10.1f}MB")
+    print(f"{'Paper':<10}{t_paper * 1000:>8.1f}ms{f_paper * 1000:>10.1f}ms{m_paper / 2**20:>10.1f}MB")
+    print(f"过滤结果: 字典 {len(kept_d)} 篇, Paper {len(kept_p)} 篇")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,238 @@
+"""
+端到端离线基准 — 回放录制的订阅源、本地 SMTP 接收端，统计每个环节的耗时
+
+所有 arXiv 分类与期刊源都由本地回放服务器提供（样本按规模扩展，可加延迟 / 随机失败），
+邮件发送到本地 SMTP 接收端。对 ArxivDailyDigest.run() 完整执行一次（--warm 时执行两次，
+第二次走 HTTP 缓存的 304 路径），各环节耗时写入 JSON，便于在提交之间比较。
+程序自身记录的运行指标（metrics.py）一并写入结果的 metrics 字段。
+
+环节（抓取相关环节在多个线程中并行，记录的是各次调用耗时之和）:
+  fetch.arxiv_rss     ArxivFetcher._fetch_category_rss
+  fetch.journal_rss   JournalRSSFetcher._fetch_rss
+  fetch_all           UnifiedPaperFetcher.fetch_all（墙钟时间）
+  keyword_filter      KeywordMatcher.count_fields（关键词预过滤，同时统计词频）
+  archive             PaperArchive.add（每个源解析出的全部论文写入全文检索档案）
+  dedup               deduplicate
+  rank                UnifiedPaperFetcher.rank（相关度排序，含每位订阅者的重排）
+  render_paper        digest_render.render_paper（单篇论文片段，命中缓存的调用也计入）
+  render_html         EmailSender._build_html_content
+  render_text         EmailSender._build_text_content
+  send                EmailSender._send_messages
+
+用法: python benchmarks/bench_pipeline.py [--entries 2000] [--latency-ms 50] [--failure-rate 0.1]
+                                          [--warm] [--output results.json]
+"""
+import argparse
+import functools
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ['SEEN_DB_PATH'] = ''   # 每次运行都从空状态开始
+os.environ['HTTP_CACHE_DIR'] = ''
+os.environ['FEED_SCHEDULE_PATH'] = ''
+os.environ['SKIP_IDLE_FETCHES'] = '0'   # 每次运行都抓取全部数据源（--warm 的第二次运行测量 304 路径）
+
+import arxiv_fetcher  # noqa: E402
+import digest_render  # noqa: E402
+import email_sender  # noqa: E402
+import fetch_engine  # noqa: E402
+import journal_rss  # noqa: E402
+import keyword_matcher  # noqa: E402
+import paper_archive  # noqa: E402
+import smtp_client  # noqa: E402
+import UnifiedFetcher  # noqa: E402
+from config import Config  # noqa: E402
+from feed_fixtures import scale_feed  # noqa: E402
+from http_cache import http_cache  # noqa: E402
+from http_client import FeedHealth, http_client  # noqa: E402
+from metrics import metrics  # noqa: E402
+from replay_server import ReplayServer, route_for  # noqa: E402
+from smtp_sink import SmtpSink  # noqa: E402
+
+KEYWORDS = ['Rydberg atom', 'quantum contextuality', 'quantum imaging', 'aperture synthesis']
+
+# 期刊主机 → 使用的样本结构
+HOST_FIXTURES = {
+    'feeds.aps.org': 'aps_pra',
+    'www.nature.com': 'nature_nphys',
+    'www.science.org': 'science_current',
+}
+
+
+class StageTimer:
+    """包装函数，累计每个环节的调用次数、总耗时和最大单次耗时（线程安全）"""
+
+    def __init__(self):
+        self.stages: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def wrap(self, owner, attr: str, stage: str):
+        original = getattr(owner, attr)
+
+        @functools.wraps(original)
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return original(*args, **kwargs)
+            finally:
+                self._record(stage, time.perf_counter() - start)
+
+        setattr(owner, attr, timed)
+
+    def _record(self, stage: str, elapsed: float):
+        with self._lock:
+            s = self.stages.setdefault(stage, {'calls': 0, 'total_s': 0.0, 'max_s': 0.0})
+            s['calls'] += 1
+            s['total_s'] += elapsed
+            s['max_s'] = max(s['max_s'], elapsed)
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+
+
+def build_routes(n_entries: int, days: float) -> Dict[str, bytes]:
+    now = datetime.now(timezone.utc)
+    routes = {}
+    arxiv_feed = scale_feed('arxiv_quant-ph', n_entries, now=now)
+    for category in arxiv_fetcher.ARXIV_CATEGORIES:
+        routes[route_for(f"https://rss.arxiv.org/rss/{category}")] = arxiv_feed
+    scaled = {}
+    for _, url in journal_rss.JOURNAL_RSS_FEEDS:
+        route = route_for(url)
+        fixture = HOST_FIXTURES.get(route.split('/')[1], 'atom_sample')
+        if fixture not in scaled:
+            scaled[fixture] = scale_feed(fixture, n_entries, days=days, now=now)
+        routes[route] = scaled[fixture]
+    return routes
+
+
+def write_subscribers(directory: str, n: int, seed: int) -> str:
+    rng = random.Random(seed)
+    entries = [{'name': f"sub{i}", 'email': f"sub{i}@localhost",
+                'keywords': rng.sample(KEYWORDS, rng.randint(1, len(KEYWORDS)))} for i in range(n)]
+    path = os.path.join(directory, 'subscribers.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(entries, f)
+    return path
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def install_timers(timer: StageTimer):
+    timer.wrap(arxiv_fetcher.ArxivFetcher, '_fetch_category_rss', 'fetch.arxiv_rss')
+    timer.wrap(journal_rss.JournalRSSFetcher, '_fetch_rss', 'fetch.journal_rss')
+    timer.wrap(UnifiedFetcher.UnifiedPaperFetcher, 'fetch_all', 'fetch_all')
+    timer.wrap(keyword_matcher.KeywordMatcher, 'count_fields', 'keyword_filter')
+    timer.wrap(paper_archive.PaperArchive, 'add', 'archive')
+    timer.wrap(UnifiedFetcher, 'deduplicate', 'dedup')
+    timer.wrap(UnifiedFetcher.UnifiedPaperFetcher, 'rank', 'rank')
+    timer.wrap(digest_render, 'render_paper', 'render_paper')
+    timer.wrap(email_sender.EmailSender, '_build_html_content', 'render_html')
+    timer.wrap(email_sender.EmailSender, '_build_text_content', 'render_text')
+    timer.wrap(email_sender.EmailSender, '_send_messages', 'send')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=2000, help='每个源的条目数')
+    parser.add_argument('--days', type=float, default=7.0, help='期刊条目日期分布的天数')
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='每个 HTTP 请求的固定延迟')
+    parser.add_argument('--jitter-ms', type=float, default=0.0, help='叠加的随机延迟上限')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='HTTP 请求返回 503 的概率')
+    parser.add_argument('--smtp-delay-ms', type=float, default=0.0, help='SMTP 接收端每封邮件的处理延迟')
+    parser.add_argument('--max-results', type=int, default=200)
+    parser.add_argument('--subscribers', type=int, default=0,
+                        help='生成该数量的订阅者（关键词为样本关键词的随机子集），0 为单订阅者')
+    parser.add_argument('--warm', action='store_true', help='启用 HTTP 缓存并运行两次，报告第二次（304）')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='结果 JSON 路径，默认 benchmarks/results/<时间>-<提交>.json')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    import main as digest_main  # 导入时会配置日志
+    logging.getLogger().setLevel(logging.WARNING)
+
+    routes = build_routes(args.entries, args.days)
+    timer = StageTimer()
+    install_timers(timer)
+
+    with ReplayServer(routes, latency=args.latency_ms / 1000, jitter=args.jitter_ms / 1000,
+                      failure_rate=args.failure_rate, seed=args.seed) as server, \
+            SmtpSink(delay=args.smtp_delay_ms / 1000) as sink, \
+            tempfile.TemporaryDirectory() as cache_dir:
+        Config.SEARCH_KEYWORDS = KEYWORDS
+        Config.MAX_RESULTS = args.max_results
+        Config.FEED_MIRROR_URL = server.url
+        Config.SMTP_HOST, Config.SMTP_PORT = sink.host, sink.port
+        Config.SMTP_TLS = 'none'  # 本地接收端不支持 TLS
+        Config.EMAIL_SENDER = Config.RECIPIENT_EMAIL = 'bench@localhost'
+        Config.EMAIL_PASSWORD = 'bench'
+        # 本地回放不需要礼貌限速
+        fetch_engine.rate_limiter.limits = {'127.0.0.1': (1e9, 10 ** 6)}
+        smtp_client.smtp_rate_limiter.limits = {'127.0.0.1': (1e9, 10 ** 6)}
+        paper_archive.paper_archive.path = os.path.join(cache_dir, 'archive.sqlite3')
+        http_client.health = FeedHealth(os.path.join(cache_dir, 'feed_health.json'))
+        if args.warm:
+            http_cache.cache_dir = cache_dir
+        if args.subscribers:
+            Config.SUBSCRIBERS_FILE = write_subscribers(cache_dir, args.subscribers, args.seed)
+
+        runs = 2 if args.warm else 1
+        for run in range(runs):
+            timer.reset()
+            metrics.reset()
+            sent_before = len(sink.messages)
+            start = time.perf_counter()
+            digest_main.ArxivDailyDigest().run()
+            wall = time.perf_counter() - start
+
+        report = {
+            'commit': git_commit(),
+            'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'params': vars(args),
+            'feeds': len(routes),
+            'wall_s': wall,
+            'stages': timer.stages,
+            'http': dict(server.stats),
+            'smtp': {'messages': len(sink.messages) - sent_before, 'bytes': sink.bytes_received},
+            'metrics': metrics.to_dict(),
+        }
+
+    output = args.output or os.path.join(
+        ROOT, 'benchmarks', 'results',
+        f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{report['commit'] or 'nogit'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"源数: {len(routes)}, 每源条目: {args.entries}, 总耗时: {wall * 1000:.0f} ms")
+    print(f"{'环节':<20}{'调用':>8}{'总耗时':>12}{'最大单次':>12}")
+    for stage, s in timer.stages.items():
+        print(f"{stage:<20}{s['calls']:>8}{s['total_s'] * 1000:>10.1f}ms{s['max_s'] * 1000:>10.1f}ms")
+    print(f"HTTP: {server.stats}")
+    print(f"SMTP: {report['smtp']}")
+    print(f"结果已写入 {output}")
+
+
+if __name__ == '__main__':
+    main()
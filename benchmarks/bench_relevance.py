@@ -0,0 +1,74 @@
+"""
+相关度排序基准 — 预过滤时统计词频 + 排序时只做算术 vs 排序时重新分词
+
+以 arXiv 样本扩展出的条目为输入（样本条目均命中关键词，即全部为候选），测量:
+- 预过滤: KeywordMatcher.find（只判断命中）vs count_fields（同时统计标题 / 摘要词频）
+- 打分: score_papers 使用预过滤得到的词频 vs 缺少词频时逐篇补算
+- 排序: rank_papers（打分 + 排序 + 为每篇论文生成带分数的新记录）
+用法: python benchmarks/bench_relevance.py [--entries 3000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from feed_fixtures import scale_feed  # noqa: E402
+from feed_stream import stream_entries  # noqa: E402
+from keyword_matcher import get_matcher  # noqa: E402
+from paper import Paper  # noqa: E402
+from relevance import rank_papers, score_papers  # noqa: E402
+
+KEYWORDS = ['Rydberg atom', 'quantum contextuality', 'quantum imaging', 'aperture synthesis',
+            'optical tweezer', 'quantum entanglement', 'superconducting qubit', 'blockade']
+
+
+def best_of(repeat: int, fn):
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=3000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    entries = list(stream_entries(scale_feed('arxiv_quant-ph', args.entries), name='bench'))
+    matcher = get_matcher(KEYWORDS)
+
+    find_ms, _ = best_of(args.repeat, lambda: [matcher.find(f"{e.title}\n{e.summary}") for e in entries])
+    count_ms, stats = best_of(args.repeat, lambda: [matcher.count_fields(e.title, e.summary) for e in entries])
+    print(f"预过滤 {len(entries)} 条: find {find_ms:.1f}ms, count_fields {count_ms:.1f}ms "
+          f"(+{(count_ms - find_ms) / len(entries) * 1000:.1f}µs/条)")
+
+    papers = []
+    for e, (lengths, keyword_tf) in zip(entries, stats):
+        if not keyword_tf:
+            continue
+        papers.append(Paper.create(
+            id=e.link.rsplit('/', 1)[-1], title=e.title, authors=e.authors, abstract=e.summary,
+            pdf_url=e.link, published=e.published, primary_category='quant-ph', categories=['quant-ph'],
+            arxiv_url=e.link, matched_keywords=[kw for kw, _, _ in keyword_tf],
+            field_lengths=lengths, keyword_tf=keyword_tf,
+        ))
+    bare = [p.evolve(field_lengths=(0, 0), keyword_tf=()) for p in papers]
+
+    score_ms, scores = best_of(args.repeat, lambda: score_papers(papers))
+    fallback_ms, scores_bare = best_of(args.repeat, lambda: score_papers(bare))
+    print(f"打分 {len(papers)} 篇候选: 预统计词频 {score_ms:.1f}ms, 逐篇补算 {fallback_ms:.1f}ms, "
+          f"结果一致: {list(scores) == list(scores_bare)}")
+    rank_ms, ranked = best_of(args.repeat, lambda: rank_papers(papers))
+    print(f"排序 {len(papers)} 篇候选: {rank_ms:.1f}ms")
+    for paper in ranked[:5]:
+        print(f"  {paper.score:6.2f}  {', '.join(paper.matched_keywords):<40} {paper.title[:60]}")
+
+
+if __name__ == '__main__':
+    main()
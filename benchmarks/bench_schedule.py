@@ -0,0 +1,149 @@
+"""
+抓取日程基准 — 模拟若干周的定时运行，统计按公告日历 / 订阅源更新频率跳过的抓取，并检查没有遗漏
+
+arXiv: 从 --start 起每天 --cron（UTC）运行一次（同 GitHub Actions 工作流），由 feed_schedule 判断是否抓取，
+成功抓取后记录。RSS 模式下 RSS 只包含最近一次公告，每次公告都必须在下一次公告可见之前被抓取到，否则计为遗漏；
+API 模式下检查每次查询的投稿时间窗口覆盖上次抓取之后公告的全部论文。没有新公告却抓取的计为多余。
+模拟期跨越夏令时切换，并包含 --holidays 中的假日。
+期刊: 守护模式每 --journal-hours 小时轮询一次，各源的更新频率取自录制的样本（Science 的 ttl、
+Nature Physics 的 sy:updatePeriod、arXiv RSS 的 skipDays、APS 无声明），检查每次抓取的时间窗口都覆盖上次成功抓取以来的时间。
+有遗漏或时间窗口不足时以非零状态退出。
+
+用法: python benchmarks/bench_schedule.py [--start 2026-10-19] [--weeks 8] [--cron 00:00] [--holidays 2026-11-26]
+"""
+import argparse
+import logging
+import os
+import sys
+from datetime import datetime, timedelta, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import arxiv_calendar  # noqa: E402
+from config import Config  # noqa: E402
+from feed_schedule import FeedSchedule, RELEASE_GRACE  # noqa: E402
+from feed_stream import feed_hints  # noqa: E402
+
+FIXTURES = os.path.join(ROOT, 'benchmarks', 'fixtures')
+JOURNALS = [('Science', 'science_current.xml'), ('Nature Physics', 'nature_nphys.xml'),
+            ('skipDays 样本', 'arxiv_quant-ph.xml'), ('PRA', 'aps_pra.xml')]
+
+
+def releases(start: datetime, end: datetime, mode: str):
+    """[start - 1 周, end] 之间各次公告可见的时刻"""
+    skip = arxiv_calendar.holidays()
+    day = arxiv_calendar.eastern_date(start) - timedelta(days=7)
+    times = []
+    while day <= arxiv_calendar.eastern_date(end):
+        if arxiv_calendar.is_announcement_day(day, skip):
+            times.append(arxiv_calendar.release_time(day, mode).timestamp())
+        day += timedelta(days=1)
+    return times
+
+
+def simulate_arxiv(start: datetime, weeks: int, mode: str):
+    key = 'arxiv:api' if mode == 'api' else 'arxiv:quant-ph'
+    Config.ARXIV_MODE = mode
+    schedule = FeedSchedule(path='')
+    runs = [(start + timedelta(days=i)).timestamp() for i in range(weeks * 7)]
+    fetches, problems = [], []
+    for now in runs:
+        plan = schedule.plan([key], days_back=1, now=now)
+        if not plan.due:
+            continue
+        last = schedule.last_fetch(key)
+        if mode == 'api' and last is not None:
+            # 窗口内公告的论文不早于上次抓取之后第一次公告的投稿起点
+            window = arxiv_calendar.submission_start(
+                datetime.fromtimestamp(now - plan.days_back['arxiv'] * 86400, timezone.utc))
+            needed = arxiv_calendar.submission_start(datetime.fromtimestamp(last, timezone.utc))
+            if window > needed:
+                problems.append(f"{datetime.fromtimestamp(now, timezone.utc):%m-%d %H:%M} 投稿窗口起点 "
+                                f"{window:%m-%d %H:%M} 晚于 {needed:%m-%d %H:%M}")
+        fetches.append(now)
+        schedule.record({key: now})
+
+    visible = releases(start, datetime.fromtimestamp(runs[-1], timezone.utc), mode)
+    wasted = 0
+    previous = None
+    for now in fetches:
+        if previous is not None and not any(previous < r <= now for r in visible):
+            wasted += 1
+        previous = now
+    if mode == 'rss':
+        for released, following in zip(visible, visible[1:]):
+            if released < runs[0] or following > runs[-1]:
+                continue
+            if not any(released <= t < following for t in fetches):
+                problems.append(f"{datetime.fromtimestamp(released, timezone.utc):%m-%d %H:%M} UTC 的公告在被替换前未抓取")
+    return {'runs': len(runs), 'fetches': len(fetches), 'wasted': wasted, 'problems': problems}
+
+
+def simulate_journals(start: datetime, weeks: int, hours: float):
+    schedule = FeedSchedule(path='')
+    polls = int(weeks * 7 * 24 / hours)
+    rows = []
+    problems = []
+    for name, fixture in JOURNALS:
+        with open(os.path.join(FIXTURES, fixture), 'rb') as f:
+            hints = feed_hints(f.read())
+        key = f"journal:{name}"
+        fetches = 0
+        for i in range(polls):
+            now = start.timestamp() + i * hours * 3600
+            plan = schedule.plan([key], days_back=1, now=now)
+            if not plan.due:
+                continue
+            last = schedule.last_fetch(key)
+            # JournalRSSFetcher.fetch_feeds 的窗口为 days_back + 1 天
+            window_start = now - (plan.days_back['journal'] + 1) * 86400
+            if last is not None and window_start > last:
+                problems.append(f"{name}: {datetime.fromtimestamp(now, timezone.utc):%m-%d %H:%M} 的时间窗口"
+                                f"未覆盖上次抓取以来的 {(now - last) / 3600:.0f} 小时")
+            fetches += 1
+            schedule.observe(key, hints)
+            schedule.record({key: now})
+        rows.append((name, hints, polls, fetches))
+    return rows, problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--start', default='2026-10-19', help='模拟起始日期（UTC）')
+    parser.add_argument('--weeks', type=int, default=8)
+    parser.add_argument('--cron', default='00:00', help='每日运行时刻（UTC）')
+    parser.add_argument('--holidays', default='2026-11-26', help='逗号分隔的 arXiv 假日（美东日期）')
+    parser.add_argument('--journal-hours', type=float, default=4.0, help='守护模式期刊轮询间隔')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+    Config.ARXIV_HOLIDAYS = args.holidays.split(',') if args.holidays else []
+    hour, minute = (int(v) for v in args.cron.split(':'))
+    start = datetime.strptime(args.start, '%Y-%m-%d').replace(hour=hour, minute=minute, tzinfo=timezone.utc)
+
+    problems = []
+    print(f"arXiv: {args.weeks} 周，每天 {args.cron} UTC 运行，假日 {args.holidays or '无'}")
+    print(f"{'模式':<8}{'运行':>6}{'抓取':>6}{'跳过':>6}{'多余':>6}")
+    for mode in ('rss', 'api'):
+        r = simulate_arxiv(start, args.weeks, mode)
+        print(f"{mode:<8}{r['runs']:>6}{r['fetches']:>6}{r['runs'] - r['fetches']:>6}{r['wasted']:>6}")
+        problems += [f"arXiv {mode}: {p}" for p in r['problems']]
+    Config.ARXIV_MODE = 'rss'
+
+    rows, journal_problems = simulate_journals(start, args.weeks, args.journal_hours)
+    problems += journal_problems
+    print(f"\n期刊: 每 {args.journal_hours:g} 小时轮询")
+    print(f"{'订阅源':<16}{'轮询':>6}{'抓取':>6}  声明")
+    for name, hints, polls, fetches in rows:
+        print(f"{name:<16}{polls:>6}{fetches:>6}  {hints or '无'}")
+
+    if problems:
+        for p in problems[:20]:
+            print(f"✗ {p}")
+        sys.exit(1)
+    print(f"\n没有遗漏的公告，所有抓取的时间窗口都覆盖上次抓取以来的时间（公告可见后 {RELEASE_GRACE // 3600} 小时内的抓取不计为已看到）")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+分片运行基准 — 检查任意分片方式合并后的摘要与不分片运行完全一致，并统计分片文件大小与合并耗时
+
+数据源由本地回放服务器提供（同 bench_pipeline.py）。先用 fetch_all() 得到参照结果，再对每个分片数 N
+依次抓取 N 个分片、写入分片文件，按倒序读回合并，逐篇比较论文 ID、相关度、命中关键词、链接与渲染出的摘要片段。
+任何分片数下结果与参照不一致时以非零状态退出。
+
+用法: python benchmarks/bench_sharding.py [--entries 500] [--shards 1,2,3,7]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from bench_pipeline import KEYWORDS, build_routes  # noqa: E402  (同时关闭 SEEN_DB / HTTP 缓存)
+import digest_render  # noqa: E402
+import fetch_engine  # noqa: E402
+import paper_archive  # noqa: E402
+from config import Config  # noqa: E402
+from http_client import FeedHealth, http_client  # noqa: E402
+from replay_server import ReplayServer  # noqa: E402
+from sharding import load_shards, shard_sources, write_shard  # noqa: E402
+from UnifiedFetcher import UnifiedPaperFetcher  # noqa: E402
+
+
+def digest_signature(papers):
+    return [(p.id, p.score, p.matched_keywords, p.links, digest_render.render_paper(p)) for p in papers]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--entries', type=int, default=500, help='每个源的条目数')
+    parser.add_argument('--days', type=float, default=7.0, help='期刊条目日期分布的天数')
+    parser.add_argument('--shards', default='1,2,3,7', help='逗号分隔的分片数')
+    args = parser.parse_args()
+
+    import logging
+    logging.getLogger().setLevel(logging.WARNING)
+
+    routes = build_routes(args.entries, args.days)
+    with ReplayServer(routes) as server, tempfile.TemporaryDirectory() as tmp:
+        Config.SEARCH_KEYWORDS = KEYWORDS
+        Config.FEED_MIRROR_URL = server.url
+        # 本地回放不需要礼貌限速
+        fetch_engine.rate_limiter.limits = {'127.0.0.1': (1e9, 10 ** 6)}
+        paper_archive.paper_archive.path = ''
+        http_client.health = FeedHealth(os.path.join(tmp, 'feed_health.json'))
+
+        fetcher = UnifiedPaperFetcher(KEYWORDS)
+        start = time.perf_counter()
+        reference = fetcher.fetch_all(days_back=1)
+        print(f"源数: {len(routes)}, 每源条目: {args.entries}, 不分片: {len(reference)} 篇, "
+              f"{(time.perf_counter() - start) * 1000:.0f} ms")
+        expected = digest_signature(reference)
+
+        print(f"{'分片数':<8}{'最慢分片':>10}{'合并':>10}{'分片文件':>12}{'去重前':>8}  结果")
+        failed = []
+        for count in (int(n) for n in args.shards.split(',')):
+            directory = os.path.join(tmp, f"n{count}")
+            paths = []
+            slowest = 0.0
+            for index in range(count):
+                start = time.perf_counter()
+                results = fetcher.fetch_sources(shard_sources(index, count), days_back=1)
+                paths.append(write_shard(directory, index, count, results, KEYWORDS, days_back=1))
+                slowest = max(slowest, time.perf_counter() - start)
+
+            start = time.perf_counter()
+            results, days_back = load_shards(paths[::-1], KEYWORDS)
+            merged = fetcher.combine(results, days_back)
+            merge_s = time.perf_counter() - start
+
+            size = sum(os.path.getsize(path) for path in paths)
+            n_papers = sum(len(papers) for papers in results.values() if papers)
+            same = digest_signature(merged) == expected
+            if not same:
+                failed.append(count)
+            print(f"{count:<8}{slowest * 1000:>8.0f}ms{merge_s * 1000:>8.0f}ms{size / 1024:>10.1f}KB{n_papers:>8}  "
+                  f"{'一致' if same else f'✗ 不一致（{len(merged)} 篇）'}")
+
+    if failed:
+        print(f"分片数 {failed} 的合并结果与不分片运行不一致")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""
+SMTP 发送吞吐基准 — 每封邮件单独建连 vs SmtpClient 复用连接
+
+邮件发送到本地 SMTP 接收端（可模拟处理延迟、服务器定期断线和 451 临时错误），
+比较两种方式的吞吐（封/秒），并检查断线重连和退避重试后是否全部送达。
+用法: python benchmarks/bench_smtp.py [--messages 200] [--delay-ms 2] [--disconnect-after 50]
+                                      [--tempfail-rate 0.05]
+"""
+import argparse
+import os
+import sys
+import time
+from email.mime.text import MIMEText
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import smtp_client  # noqa: E402
+from smtp_client import SmtpClient  # noqa: E402
+from smtp_sink import SmtpSink  # noqa: E402
+
+
+def make_messages(n: int, size: int):
+    body = ('x' * 76 + '\n') * (size // 77 + 1)
+    msgs = []
+    for i in range(n):
+        msg = MIMEText(body, 'plain', 'utf-8')
+        msg['Subject'] = f"bench #{i}"
+        msg['From'] = 'bench@localhost'
+        msg['To'] = f"sub{i}@localhost"
+        msgs.append(msg)
+    return msgs
+
+
+def run(mode: str, msgs, sink: SmtpSink, backoff: float):
+    before = len(sink.messages)
+    connections = sink.connections
+    start = time.perf_counter()
+    ok = 0
+    if mode == 'pooled':
+        with SmtpClient('bench@localhost', 'bench', host=sink.host, port=sink.port, tls='none',
+                        backoff=backoff) as client:
+            ok = sum(client.send(msg) for msg in msgs)
+    else:
+        # 旧实现：每封邮件新建连接、登录、发送、断开
+        for msg in msgs:
+            with SmtpClient('bench@localhost', 'bench', host=sink.host, port=sink.port, tls='none',
+                            backoff=backoff) as client:
+                ok += client.send(msg)
+    elapsed = time.perf_counter() - start
+    return ok, len(sink.messages) - before, sink.connections - connections, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--messages', type=int, default=200)
+    parser.add_argument('--size', type=int, default=50_000, help='每封邮件正文字节数')
+    parser.add_argument('--delay-ms', type=float, default=2.0, help='接收端每封邮件的处理延迟')
+    parser.add_argument('--disconnect-after', type=int, default=0, help='接收端每个连接收多少封后断开')
+    parser.add_argument('--tempfail-rate', type=float, default=0.0, help='接收端返回 451 的概率')
+    parser.add_argument('--backoff', type=float, default=0.01, help='退避基数（秒）')
+    args = parser.parse_args()
+
+    # 本地接收端不需要发信限速
+    smtp_client.smtp_rate_limiter.limits = {'127.0.0.1': (1e9, 10 ** 6)}
+    msgs = make_messages(args.messages, args.size)
+
+    print(f"{'方式':<12}{'成功':>6}{'送达':>6}{'连接数':>8}{'耗时':>10}{'吞吐':>14}")
+    with SmtpSink(delay=args.delay_ms / 1000, disconnect_after=args.disconnect_after,
+                  tempfail_rate=args.tempfail_rate) as sink:
+        for mode in ('per-message', 'pooled'):
+            ok, delivered, connections, elapsed = run(mode, msgs, sink, args.backoff)
+            print(f"{mode:<12}{ok:>6}{delivered:>6}{connections:>8}{elapsed * 1000:>8.0f}ms"
+                  f"{ok / elapsed:>10.1f} 封/秒")
+
+
+if __name__ == '__main__':
+    main()
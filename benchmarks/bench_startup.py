@@ -0,0 +1,106 @@
+"""
+启动耗时基准 — 各子命令的冷启动时间与导入开销（python -X importtime）
+
+每个场景在新的解释器进程中运行 --repeat 次，取墙钟时间的中位数，减去空解释器（python -c pass）
+的启动时间即为程序自身的启动开销；导入开销取自 -X importtime（不含解释器启动时 site 已导入的模块）。
+超出 --budget-ms 的场景以非零状态退出，可在 CI 中作为回归检查。
+
+场景:
+  import main     只导入入口模块
+  --help          解析命令行
+  validate        检查配置（不导入 requests / feedparser / smtplib / MIME）
+  search          检索本地档案（临时空档案）
+  run (imports)   导入日常运行所需的全部模块（不联网），作为对照
+用法: python benchmarks/bench_startup.py [--repeat 10] [--budget-ms 60] [--top 8]
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_IMPORT_RE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)")
+
+# 只做对照、不计入预算的场景
+UNBUDGETED = {'run (imports)'}
+
+
+def scenarios(tmp: str):
+    return {
+        'import main': ['-c', 'import main'],
+        '--help': ['main.py', '--help'],
+        'validate': ['main.py', 'validate'],
+        'search': ['main.py', 'search', 'Rydberg blockade'],
+        'run (imports)': ['-c', 'import main; main.ArxivDailyDigest()'],
+    }
+
+
+def run_once(args, env, importtime: bool = False):
+    cmd = [sys.executable] + (['-X', 'importtime'] if importtime else []) + args
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=ROOT, env=env, capture_output=True, text=True)
+    elapsed = (time.perf_counter() - start) * 1000
+    if proc.returncode != 0:
+        raise RuntimeError(f"{' '.join(args)} 退出状态 {proc.returncode}:\n{proc.stderr[-2000:]}")
+    return elapsed, proc.stderr
+
+
+def parse_importtime(stderr: str, baseline: set):
+    """返回 (导入总耗时 ms, [(自身耗时 ms, 模块)])，不含解释器启动时已导入的模块"""
+    total = 0
+    modules = []
+    for line in stderr.splitlines():
+        m = _IMPORT_RE.match(line)
+        if not m or m.group(4) in baseline:
+            continue
+        self_us, cumulative_us, indent, name = int(m.group(1)), int(m.group(2)), m.group(3), m.group(4)
+        if len(indent) <= 1:   # 顶层导入
+            total += cumulative_us
+        modules.append((self_us / 1000, name))
+    modules.sort(reverse=True)
+    return total / 1000, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--repeat', type=int, default=10)
+    parser.add_argument('--budget-ms', type=float, default=60.0, help='相对空解释器的启动开销上限')
+    parser.add_argument('--top', type=int, default=8, help='列出自身导入耗时最多的模块数')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, EMAIL_SENDER='bench@localhost', EMAIL_PASSWORD='bench',
+                   SUBSCRIBERS_FILE='', CACHE_DIR=tmp, REPORT_DIR='',
+                   ARCHIVE_DB_PATH=os.path.join(tmp, 'archive.sqlite3'))
+        _, base_err = run_once(['-c', 'pass'], env, importtime=True)
+        baseline_modules = {m.group(4) for m in map(_IMPORT_RE.match, base_err.splitlines()) if m}
+        baseline = statistics.median(run_once(['-c', 'pass'], env)[0] for _ in range(args.repeat))
+        print(f"空解释器启动: {baseline:.1f} ms（含 site，{len(baseline_modules)} 个模块）\n")
+
+        print(f"{'场景':<16}{'墙钟 p50':>10}{'启动开销':>10}{'导入':>10}  自身导入耗时最多的模块")
+        over = []
+        for name, cmd in scenarios(tmp).items():
+            wall = statistics.median(run_once(cmd, env)[0] for _ in range(args.repeat))
+            _, stderr = run_once(cmd, env, importtime=True)
+            import_ms, modules = parse_importtime(stderr, baseline_modules)
+            overhead = wall - baseline
+            top = ', '.join(f"{mod} {ms:.1f}" for ms, mod in modules[:args.top])
+            flag = ''
+            if name not in UNBUDGETED and overhead > args.budget_ms:
+                over.append(name)
+                flag = ' ✗'
+            print(f"{name:<16}{wall:>8.1f}ms{overhead:>8.1f}ms{import_ms:>8.1f}ms{flag}  {top}")
+
+    if over:
+        print(f"\n超出预算 {args.budget_ms:g} ms: {', '.join(over)}")
+        sys.exit(1)
+    print(f"\n全部场景在预算 {args.budget_ms:g} ms 以内")
+
+
+if __name__ == '__main__':
+    main()
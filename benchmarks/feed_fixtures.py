@@ -0,0 +1,76 @@
+"""
+基准测试用的订阅源样本
+
+fixtures/ 目录下是按真实 arXiv / APS / Nature / Science / Atom 源结构整理的样本，
+scale_feed() 将其中的条目复制扩展到任意规模（如 10k 条），并重写 ID、DOI、标题和日期，
+用于离线测量解析、过滤、去重等环节的性能。
+"""
+import os
+import re
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from typing import Dict, Optional
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# 样本名 → 每条目所在的元素名
+FIXTURES: Dict[str, str] = {
+    'arxiv_quant-ph': 'item',
+    'aps_pra': 'item',
+    'nature_nphys': 'item',
+    'science_current': 'item',
+    'atom_sample': 'entry',
+}
+
+_ARXIV_ID_RE = re.compile(r'\b(\d{4})\.\d{5}\b')
+_DOI_RE = re.compile(r'\b(10\.\d{4,9}/[^\s<"?&;|]+?)(?=[\s<"?&;|]|$)')
+_DATE_RE = re.compile(r'<(pubDate|dc:date|published|updated)>(.*?)</\1>')
+
+
+def load_fixture(name: str) -> bytes:
+    with open(os.path.join(FIXTURE_DIR, name + '.xml'), 'rb') as f:
+        return f.read()
+
+
+def _format_date(tag: str, dt: datetime) -> str:
+    if tag == 'pubDate':
+        return format_datetime(dt)
+    return dt.isoformat()
+
+
+def scale_feed(name: str, n_entries: int, days: float = 1.0,
+               now: Optional[datetime] = None) -> bytes:
+    """
+    将样本源扩展为 n_entries 条
+
+    Args:
+        days: 条目日期从 now 起按时间倒序均匀分布在这么多天内
+              （arXiv 样本所有条目为同一次公告，日期相同）
+    """
+    tag = FIXTURES[name]
+    text = load_fixture(name).decode('utf-8')
+    pattern = re.compile(rf'<{tag}[\s>].*?</{tag}>', re.S)
+    items = pattern.findall(text)
+    head = text[:text.index(items[0])]
+    tail = text[text.rindex(items[-1]) + len(items[-1]):]
+
+    now = now or datetime.now(timezone.utc)
+    same_day = name.startswith('arxiv')
+    out = [head]
+    for i in range(n_entries):
+        block = items[i % len(items)]
+        suffix = i // len(items)
+        if suffix:
+            block = _ARXIV_ID_RE.sub(lambda m: f"{m.group(1)}.{(50000 + i) % 100000:05d}", block)
+            block = _DOI_RE.sub(lambda m: f"{m.group(1)}.{suffix}", block)
+            if ']]></title>' in block:
+                block = block.replace(']]></title>', f' ({suffix})]]></title>', 1)
+            else:
+                block = block.replace('</title>', f' ({suffix})</title>', 1)
+        offset = timedelta(hours=1) if same_day else timedelta(days=days * i / max(n_entries, 1))
+        dt = (now - offset).replace(microsecond=0)
+        block = _DATE_RE.sub(lambda m: f"<{m.group(1)}>{_format_date(m.group(1), dt)}</{m.group(1)}>", block)
+        out.append(block)
+        out.append('\n    ')
+    out.append(tail)
+    return ''.join(out).encode('utf-8')
@@ -0,0 +1,158 @@
+"""
+本地 OAI-PMH 服务器 — 替代 oaipmh.arxiv.org，供回填（backfill）的离线测试与基准使用
+
+以录制的 ListRecords 页面为样本，按 resumptionToken 依次返回若干页：
+- 记录由样本中的 <record> 复制扩展而来，每条替换为唯一的 arXiv ID，可指定总页数、每页条数
+- 可对指定页先返回 503 + Retry-After（OAI-PMH 流控），或持续返回 500 模拟收割中途失败
+- 未知的 resumptionToken 返回 OAI 错误 badResumptionToken
+"""
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Set
+from urllib.parse import parse_qs, urlparse
+
+_RECORD_RE = re.compile(rb'<record>.*?</record>\s*', re.S)
+_ID_RE = re.compile(rb'\d{4}\.\d{4,5}')
+
+_HEAD = b"""<?xml version="1.0" encoding="UTF-8"?>
+<OAI-PMH xmlns="http://www.openarchives.org/OAI/2.0/" xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance">
+<responseDate>2026-09-15T08:12:41Z</responseDate>
+<request verb="ListRecords">http://127.0.0.1/oai</request>
+"""
+
+
+def sample_records(content: bytes) -> List[bytes]:
+    """从录制的 ListRecords 响应中取出全部 <record> 元素"""
+    return _RECORD_RE.findall(content)
+
+
+class OAIServer:
+    """
+    Args:
+        records: 样本 <record> 元素（sample_records() 的结果），循环复制生成各页
+        pages: 总页数
+        page_size: 每页记录数
+        throttle_pages: 这些页（从 1 开始）第一次请求时返回 503 + Retry-After
+        fail_pages: 这些页返回 500（重试也失败，直到从 fail_pages 中移除），用于模拟收割中断
+        retry_after: 503 响应的 Retry-After 秒数
+    """
+
+    def __init__(self, records: List[bytes], pages: int = 10, page_size: int = 100,
+                 throttle_pages: Optional[Set[int]] = None, fail_pages: Optional[Set[int]] = None,
+                 retry_after: int = 0):
+        self.records = records
+        self.pages = pages
+        self.page_size = page_size
+        self.throttle_pages = set(throttle_pages or ())
+        self.fail_pages = set(fail_pages or ())
+        self.retry_after = retry_after
+        self._body_cache: Dict[int, bytes] = {}
+        self.stats = {'requests': 0, 'throttled': 0, 'failures': 0, 'bytes_sent': 0}
+        self.page_requests: List[int] = []
+        self._lock = threading.Lock()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/oai"
+
+    @property
+    def total_records(self) -> int:
+        return self.pages * self.page_size
+
+    def page_body(self, page: int) -> bytes:
+        """第 page 页（从 1 开始）的 ListRecords 响应"""
+        body = self._body_cache.get(page)
+        if body is not None:
+            return body
+        chunks = [_HEAD, b'<ListRecords>\n']
+        first = (page - 1) * self.page_size
+        for i in range(first, first + self.page_size):
+            # 每条记录替换为唯一 ID: 26MM.NNNNN（按序号编排）
+            new_id = b'26%02d.%05d' % (i // 100000 % 100, i % 100000)
+            chunks.append(_ID_RE.sub(new_id, self.records[i % len(self.records)]))
+        if page < self.pages:
+            chunks.append(b'<resumptionToken cursor="%d" completeListSize="%d">page-%d</resumptionToken>\n'
+                          % (first, self.total_records, page + 1))
+        else:
+            chunks.append(b'<resumptionToken cursor="%d" completeListSize="%d"/>\n'
+                          % (first, self.total_records))
+        chunks.append(b'</ListRecords>\n</OAI-PMH>\n')
+        body = b''.join(chunks)
+        self._body_cache[page] = body
+        return body
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                query = parse_qs(urlparse(self.path).query)
+                token = query.get('resumptionToken', [''])[0]
+                if token:
+                    match = re.fullmatch(r'page-(\d+)', token)
+                    page = int(match.group(1)) if match else 0
+                    if not 1 < page <= server.pages:
+                        self._reply(200, _HEAD + b'<error code="badResumptionToken">unknown token</error>\n'
+                                                 b'</OAI-PMH>\n')
+                        return
+                else:
+                    page = 1
+
+                with server._lock:
+                    server.stats['requests'] += 1
+                    server.page_requests.append(page)
+                    throttle = page in server.throttle_pages
+                    fail = not throttle and page in server.fail_pages
+                    server.throttle_pages.discard(page)
+                    if throttle:
+                        server.stats['throttled'] += 1
+                    elif fail:
+                        server.stats['failures'] += 1
+                if throttle:
+                    self._reply(503, retry_after=server.retry_after)
+                elif fail:
+                    self._reply(500)
+                else:
+                    body = server.page_body(page)
+                    with server._lock:
+                        server.stats['bytes_sent'] += len(body)
+                    self._reply(200, body)
+
+            def _reply(self, status: int, body: bytes = b'', retry_after: Optional[int] = None):
+                self.send_response(status)
+                if retry_after is not None:
+                    self.send_header('Retry-After', str(retry_after))
+                if status == 200:
+                    self.send_header('Content-Type', 'text/xml; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if body:
+                    self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'OAIServer':
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._httpd.daemon_threads = True
+        threading.Thread(target=self._httpd.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> 'OAIServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
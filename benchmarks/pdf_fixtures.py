@@ -0,0 +1,114 @@
+"""
+PDF 全文匹配基准测试用的样本 — 生成 arXiv 分类 RSS 与对应的论文 PDF
+
+make_pdf() 直接写出最小的合法 PDF（Type1 字体、未压缩的文本流），不依赖任何 PDF 库。
+build_corpus() 生成的论文按四种类型循环:
+  body    标题 / 摘要与关键词接近（词都出现但不相邻），正文中出现关键词 → 应被全文匹配找回
+  refs    同上，但关键词只出现在参考文献中 → 不应命中
+  none    同上，全文都没有关键词 → 不应命中
+  far     摘要与关键词无关 → 不是候选，不应下载 PDF
+"""
+import random
+from datetime import datetime, timedelta, timezone
+from email.utils import format_datetime
+from html import escape
+from typing import Dict, List, Optional, Set, Tuple
+
+KEYWORD = 'Rydberg atom'
+KINDS = ('body', 'refs', 'none', 'far')
+
+_FILLER = ('the we of a in optical lattice trap laser cooling detuning coupling blockade interaction '
+           'field measurement spectrum resonance fidelity gate state excitation ensemble density '
+           'photon cavity loss rate model numerical simulation result shows that with for and by').split()
+
+_ABSTRACTS = {
+    'near': 'Cold atoms in an optical lattice are excited to high-lying Rydberg states and we study '
+            'the resulting long-range interactions and their effect on transport.',
+    'far': 'We derive tight detection-efficiency thresholds for Bell inequality violations in '
+           'multi-setting scenarios with imperfect detectors.',
+}
+_BODY_HIT = 'In our setup individual Rydberg atoms are trapped in optical tweezers and imaged.'
+_REFERENCE_HIT = '[1] A. Author, Quantum simulation with Rydberg atoms, Rev. Mod. Phys. (2020).'
+
+
+def _pdf_string(line: str) -> str:
+    return line.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def make_pdf(pages: List[List[str]]) -> bytes:
+    """每页一组文本行 → PDF 字节"""
+    kids = ' '.join(f"{4 + 2 * i} 0 R" for i in range(len(pages)))
+    objects = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        f"<< /Type /Pages /Kids [{kids}] /Count {len(pages)} >>".encode(),
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    for i, lines in enumerate(pages):
+        ops = ['BT', '/F1 10 Tf', '12 TL', '50 770 Td'] + [f"({_pdf_string(line)}) Tj T*" for line in lines] + ['ET']
+        stream = '\n'.join(ops).encode('latin-1')
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>".encode())
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, obj in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n" % number + obj + b"\nendobj\n"
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    for offset in offsets:
+        out += b"%010d 00000 n \n" % offset
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+    return bytes(out)
+
+
+def _paper_pdf(kind: str, n_pages: int, rng: random.Random) -> bytes:
+    pages = [[' '.join(rng.choice(_FILLER) for _ in range(14)) for _ in range(50)] for _ in range(n_pages)]
+    if kind == 'body':
+        pages[n_pages // 2][25] = _BODY_HIT
+    pages[-1][30:] = ['References'] + [' '.join(rng.choice(_FILLER) for _ in range(10)) for _ in range(19)]
+    if kind == 'refs':
+        pages[-1][31] = _REFERENCE_HIT
+    return make_pdf(pages)
+
+
+def build_corpus(n_papers: int, n_pages: int, seed: int = 0,
+                 now: Optional[datetime] = None) -> Tuple[bytes, Dict[str, bytes], Set[str]]:
+    """
+    Returns:
+        (arXiv RSS 内容, arXiv ID → PDF, 应被全文匹配找回的 arXiv ID)
+    """
+    rng = random.Random(seed)
+    now = now or datetime.now(timezone.utc)
+    pub_date = format_datetime(now - timedelta(hours=1))
+    items = []
+    pdfs = {}
+    expected = set()
+    for i in range(n_papers):
+        kind = KINDS[i % len(KINDS)]
+        arxiv_id = f"2610.{20000 + i:05d}"
+        abstract = _ABSTRACTS['far' if kind == 'far' else 'near']
+        items.append(f"""    <item>
+      <title>{escape(f'Paper {i}: long-range interactions in a driven many-body system')}</title>
+      <link>https://arxiv.org/abs/{arxiv_id}</link>
+      <description>arXiv:{arxiv_id}v1 Announce Type: new
+Abstract: {escape(abstract)}</description>
+      <category>quant-ph</category>
+      <pubDate>{pub_date}</pubDate>
+      <dc:creator>Author {i}</dc:creator>
+    </item>""")
+        pdfs[arxiv_id] = _paper_pdf(kind, n_pages, rng)
+        if kind == 'body':
+            expected.add(arxiv_id)
+
+    rss = f"""<?xml version='1.0' encoding='UTF-8'?>
+<rss xmlns:dc="http://purl.org/dc/elements/1.1/" version="2.0">
+  <channel>
+    <title>quant-ph updates on arXiv.org</title>
+    <link>http://rss.arxiv.org/rss/quant-ph</link>
+{chr(10).join(items)}
+  </channel>
+</rss>
+"""
+    return rss.encode('utf-8'), pdfs, expected
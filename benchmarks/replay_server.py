@@ -0,0 +1,166 @@
+"""
+本地订阅源回放服务器 — 替代 rss.arxiv.org 与各期刊 RSS，供离线基准测试使用
+
+配合 Config.FEED_MIRROR_URL 使用：抓取器请求 {mirror}/host/path，
+服务器按 "/host/path" 查找预先录制 / 扩展好的源内容并返回。
+支持 ETag 条件请求（304）、可配置的响应延迟和随机失败率，以及按路径挂起（迟迟不响应）或逐块缓慢发送响应体。
+arXiv 的合并订阅源 /rss.arxiv.org/rss/cat1+cat2+... 由各分类的源即时合成（交叉列出的条目只保留一份）。
+"""
+import hashlib
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+ARXIV_RSS_ROUTE = '/rss.arxiv.org/rss/'
+
+_ITEM = re.compile(rb'<item\b.*?</item>\s*', re.S)
+_LINK = re.compile(rb'<link>(.*?)</link>')
+
+
+def route_for(url: str) -> str:
+    """真实订阅源地址 → 回放服务器上的路径"""
+    parts = urlparse(url)
+    return f"/{parts.hostname}{parts.path}"
+
+
+class ReplayServer:
+    """
+    Args:
+        routes: 路径 → 响应体，路径由 route_for() 生成
+        latency: 每个请求的固定延迟（秒）
+        jitter: 在固定延迟之上叠加的 [0, jitter) 随机延迟（秒）
+        failure_rate: 以该概率返回 503
+        stalls: 路径 → 响应前额外等待的秒数（模拟挂起的订阅源）
+        drips: 路径 → 响应体分 DRIP_CHUNKS 块发送的总耗时（秒），模拟响应缓慢的订阅源
+    """
+
+    DRIP_CHUNKS = 20
+
+    def __init__(self, routes: Dict[str, bytes], latency: float = 0.0, jitter: float = 0.0,
+                 failure_rate: float = 0.0, seed: int = 0, stalls: Optional[Dict[str, float]] = None,
+                 drips: Optional[Dict[str, float]] = None):
+        self.routes = dict(routes)
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.stalls = dict(stalls or {})
+        self.drips = dict(drips or {})
+        self._rng = random.Random(seed)
+        self._rng_lock = threading.Lock()
+        self._etags = {path: '"%s"' % hashlib.sha1(body).hexdigest()[:16] for path, body in routes.items()}
+        self.stats = {'requests': 0, 'not_modified': 0, 'failures': 0, 'not_found': 0, 'bytes_sent': 0}
+        self._stats_lock = threading.Lock()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _combined(self, path: str) -> Optional[bytes]:
+        """合成 arXiv 合并订阅源: 以第一个分类的源为框架，依次加入各分类的条目（按链接去重）"""
+        if not path.startswith(ARXIV_RSS_ROUTE) or '+' not in path:
+            return None
+        feeds = [self.routes.get(ARXIV_RSS_ROUTE + c) for c in path[len(ARXIV_RSS_ROUTE):].split('+')]
+        if any(feed is None for feed in feeds):
+            return None
+        items = []
+        seen = set()
+        for feed in feeds:
+            for match in _ITEM.finditer(feed):
+                link = _LINK.search(match.group())
+                key = link.group(1) if link else match.group()
+                if key not in seen:
+                    seen.add(key)
+                    items.append(match.group())
+        first = feeds[0]
+        tail = first.rindex(b'</channel>')
+        head = _ITEM.search(first)
+        body = first[:head.start() if head else tail] + b''.join(items) + first[tail:]
+        with self._stats_lock:
+            self.routes[path] = body
+            self._etags[path] = '"%s"' % hashlib.sha1(body).hexdigest()[:16]
+        return body
+
+    def _count(self, key: str, n: int = 1):
+        with self._stats_lock:
+            self.stats[key] += n
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def do_GET(self):
+                server._count('requests')
+                with server._rng_lock:
+                    delay = server.latency + server._rng.random() * server.jitter
+                    fail = server._rng.random() < server.failure_rate
+                path = self.path.split('?', 1)[0]
+                delay += server.stalls.get(path, 0.0)
+                if delay:
+                    time.sleep(delay)
+
+                body = server.routes.get(path) or server._combined(path)
+                if fail:
+                    server._count('failures')
+                    self._reply(503)
+                elif body is None:
+                    server._count('not_found')
+                    self._reply(404)
+                elif self.headers.get('If-None-Match') == server._etags[path]:
+                    server._count('not_modified')
+                    self._reply(304, etag=server._etags[path])
+                else:
+                    server._count('bytes_sent', len(body))
+                    self._reply(200, body, server._etags[path], server.drips.get(path, 0.0))
+
+            def _reply(self, status: int, body: bytes = b'', etag: str = '', drip: float = 0.0):
+                self.send_response(status)
+                if etag:
+                    self.send_header('ETag', etag)
+                if status == 200:
+                    self.send_header('Content-Type', 'application/xml')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if body and drip:
+                    step = -(-len(body) // server.DRIP_CHUNKS)
+                    try:
+                        for i in range(0, len(body), step):
+                            self.wfile.write(body[i:i + step])
+                            self.wfile.flush()
+                            time.sleep(drip / server.DRIP_CHUNKS)
+                    except (BrokenPipeError, ConnectionResetError):
+                        self.close_connection = True   # 客户端已放弃
+                elif body:
+                    self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self) -> 'ReplayServer':
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self) -> 'ReplayServer':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,138 @@
+"""
+本地 SMTP 接收端 — 接收 EmailSender 发出的邮件并丢弃，供离线基准测试使用
+
+实现 EHLO/HELO、AUTH PLAIN/LOGIN（接受任意凭据）、MAIL、RCPT、DATA、RSET、NOOP、QUIT，
+不支持 STARTTLS。标准库 smtpd 已在 Python 3.12 移除，aiosmtpd 非项目依赖，故自行实现最小子集。
+"""
+import random
+import socketserver
+import threading
+import time
+from typing import List, Optional
+
+
+class SmtpSink:
+    def __init__(self, delay: float = 0.0, disconnect_after: int = 0, tempfail_rate: float = 0.0,
+                 seed: int = 0, keep_messages: bool = True):
+        """
+        Args:
+            delay: 每封邮件 DATA 结束后模拟的服务器处理时间（秒）
+            disconnect_after: 每个连接接收这么多封邮件后直接断开（模拟服务器主动断线），0 为不断开
+            tempfail_rate: 以该概率对 DATA 返回 451 临时错误（邮件不计入）
+            keep_messages: 为 False 时只计数、不保留邮件内容（内存基准测试用）
+        """
+        self.delay = delay
+        self.disconnect_after = disconnect_after
+        self.tempfail_rate = tempfail_rate
+        self._rng = random.Random(seed)
+        self.keep_messages = keep_messages
+        self.messages: List[bytes] = []
+        self.received = 0
+        self._bytes = 0
+        self.connections = 0
+        self._lock = threading.Lock()
+        self._server: Optional[socketserver.ThreadingTCPServer] = None
+
+    @property
+    def host(self) -> str:
+        return self._server.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self._server.server_address[1]
+
+    @property
+    def bytes_received(self) -> int:
+        with self._lock:
+            return self._bytes
+
+    def _handler(self):
+        sink = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def reply(self, line: str):
+                self.wfile.write(line.encode('ascii') + b'\r\n')
+
+            def handle(self):
+                with sink._lock:
+                    sink.connections += 1
+                received = 0
+                self.reply('220 localhost SMTP sink')
+                while True:
+                    line = self.rfile.readline()
+                    if not line:
+                        return
+                    verb = line.strip().split(b' ', 1)[0].upper()
+                    if verb == b'EHLO':
+                        self.reply('250-localhost')
+                        self.reply('250-AUTH PLAIN LOGIN')
+                        self.reply('250 8BITMIME')
+                    elif verb == b'HELO':
+                        self.reply('250 localhost')
+                    elif verb == b'AUTH':
+                        args = line.strip().split()
+                        if args[1].upper() == b'LOGIN':
+                            remaining = 2 if len(args) == 2 else 1  # 用户名可能随命令一起发送
+                            for _ in range(remaining):
+                                self.reply('334 ')
+                                self.rfile.readline()
+                        elif len(args) == 2:
+                            self.reply('334 ')
+                            self.rfile.readline()
+                        self.reply('235 2.7.0 Authentication successful')
+                    elif verb in (b'MAIL', b'RCPT', b'RSET', b'NOOP'):
+                        self.reply('250 OK')
+                    elif verb == b'DATA':
+                        if sink.disconnect_after and received >= sink.disconnect_after:
+                            return  # 不回复直接断开
+                        self.reply('354 End data with <CR><LF>.<CR><LF>')
+                        data = self._read_data()
+                        if sink.delay:
+                            time.sleep(sink.delay)
+                        with sink._lock:
+                            tempfail = sink._rng.random() < sink.tempfail_rate
+                            if not tempfail:
+                                sink.received += 1
+                                sink._bytes += len(data)
+                                if sink.keep_messages:
+                                    sink.messages.append(data)
+                        if tempfail:
+                            self.reply('451 4.3.0 Temporary failure, try again')
+                        else:
+                            received += 1
+                            self.reply('250 OK queued')
+                    elif verb == b'QUIT':
+                        self.reply('221 Bye')
+                        return
+                    else:
+                        self.reply('502 Command not implemented')
+
+            def _read_data(self):
+                chunks = []
+                while True:
+                    line = self.rfile.readline()
+                    if not line or line in (b'.\r\n', b'.\n'):
+                        break
+                    chunks.append(line[1:] if line.startswith(b'..') else line)
+                return b''.join(chunks)
+
+        return Handler
+
+    def start(self) -> 'SmtpSink':
+        socketserver.ThreadingTCPServer.allow_reuse_address = True
+        self._server = socketserver.ThreadingTCPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> 'SmtpSink':
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
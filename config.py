@@ -1,18 +1,142 @@
+"""
+配置 — 每个配置项在访问时才从环境变量读取（首次访问时加载 .env）
+
+导入本模块不读取任何环境变量、不导入 dotenv；默认值可以依赖其他配置项（如缓存目录下的各个路径）。
+运行时可直接赋值覆盖（Config.MAX_RESULTS = 5，基准测试使用），Config.reload() 重新读取 .env。
+"""
 import os
-from dotenv import load_dotenv
 
-load_dotenv()
+_env_loaded = False
+
+
+def _load_env(override: bool = False):
+    global _env_loaded
+    if _env_loaded and not override:
+        return
+    from dotenv import load_dotenv
+    load_dotenv(override=override)
+    _env_loaded = True
+
+
+def _split(value: str):
+    return value.split(",")
+
+
+def _flag(value: str) -> bool:
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+class _Setting:
+    """环境变量配置项: 未设置时取 default（可为以 Config 为参数的函数）；数值类设置为空字符串时同样取默认值"""
+
+    def __init__(self, default=None, cast=str):
+        self.default = default
+        self.cast = cast
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, owner):
+        _load_env()
+        raw = os.environ.get(self.name)
+        if raw is None or (raw == '' and self.cast is not str):
+            return self.default(owner) if callable(self.default) else self.default
+        return self.cast(raw)
+
+
+def _in_cache_dir(name: str):
+    return lambda config: os.path.join(config.CACHE_DIR, name)
 
 
 class Config:
     # 邮箱配置
-    EMAIL_SENDER = os.getenv("EMAIL_SENDER")
-    EMAIL_PASSWORD = os.getenv("EMAIL_PASSWORD")
-    RECIPIENT_EMAIL = os.getenv("RECIPIENT_EMAIL")
+    EMAIL_SENDER = _Setting()
+    EMAIL_PASSWORD = _Setting()
+    RECIPIENT_EMAIL = _Setting()
+
+    # SMTP 服务器；为空时按发件人邮箱域名自动选择（见 smtp_client.SMTP_PROVIDERS）
+    SMTP_HOST = _Setting("")
+    SMTP_PORT = _Setting(0, int)  # 0 表示按加密方式取默认端口
+    SMTP_TLS = _Setting("")  # ssl / starttls / none；指定 SMTP_HOST 时按端口推断（465 为 ssl，其余 starttls），明文须显式设为 none
+    SMTP_MAX_RETRIES = _Setting(3, int)  # 临时错误的重试次数
+    SMTP_BACKOFF = _Setting(1.0, float)  # 退避基数（秒），第 n 次重试最多等待 base * 2^n
+    MAX_EMAIL_KB = _Setting(2048, int)  # 单封邮件大小上限，超出时分卷发送
 
     # 搜索配置
-    SEARCH_KEYWORDS = os.getenv("SEARCH_KEYWORDS", "Rydberg atom").split(",")
-    MAX_RESULTS = int(os.getenv("MAX_RESULTS", 20))
+    SEARCH_KEYWORDS = _Setting(lambda config: ["Rydberg atom"], _split)
+    MAX_RESULTS = _Setting(20, int)
+    # 多订阅者配置文件（JSON），为空时使用 RECIPIENT_EMAIL + SEARCH_KEYWORDS
+    SUBSCRIBERS_FILE = _Setting("")
+
+    # 抓取配置
+    FETCH_WORKERS = _Setting(8, int)  # 并发下载线程数
+    # 逗号分隔的 arXiv 分类，可用学科名（如 cs、cond-mat）或 all；为空时使用 arxiv_fetcher.ARXIV_CATEGORIES
+    ARXIV_CATEGORIES = _Setting(lambda config: [], _split)
+    # 多个分类合并为一次 RSS 请求（cat1+cat2+...），每次请求的 URL 长度与预计条目数上限；条目数为 0 时每个分类单独请求
+    ARXIV_BATCH_URL_CHARS = _Setting(1000, int)
+    ARXIV_BATCH_MAX_ENTRIES = _Setting(2000, int)
+    # arXiv 抓取方式: rss（按分类下载 RSS 再本地过滤）或 api（关键词在 arXiv API 服务器端检索，只下载命中的论文）
+    ARXIV_MODE = _Setting("rss")
+    ARXIV_API_URL = _Setting("https://export.arxiv.org/api/query")
+    ARXIV_API_QUERY_CHARS = _Setting(1000, int)  # 单个查询的长度上限，关键词较多时分为多个查询
+    ARXIV_API_PAGE_SIZE = _Setting(200, int)  # 每页条目数（max_results）
+    ARXIV_API_MAX_RESULTS = _Setting(2000, int)  # 每个查询最多翻页获取的条目数
+    # arXiv 假日（美东日期 YYYY-MM-DD，逗号分隔）: 当晚不公告，跳过其后的抓取（见 arxiv_calendar.py）
+    ARXIV_HOLIDAYS = _Setting(lambda config: [], _split)
+    # 按 arXiv 公告日历与期刊源的更新频率元数据（ttl、skipDays、sy:updatePeriod）跳过不可能有新内容的抓取
+    SKIP_IDLE_FETCHES = _Setting(True, _flag)
+    # 订阅源镜像地址，设置后 https://host/path 改为请求 {FEED_MIRROR_URL}/host/path（离线基准测试使用）
+    FEED_MIRROR_URL = _Setting("")
+
+    # HTTP 客户端（连接池、重试、熔断、自适应超时）
+    HTTP_TIMEOUT = _Setting(30.0, float)  # 超时上限（秒），尚无延迟记录的主机使用此值
+    HTTP_MIN_TIMEOUT = _Setting(5.0, float)  # 按历史延迟自适应的超时下限
+    HTTP_MAX_RETRIES = _Setting(2, int)
+    HTTP_BACKOFF = _Setting(1.0, float)  # 无 Retry-After 时的退避基数（秒）
+    HTTP_MAX_RETRY_AFTER = _Setting(60.0, float)  # 单次等待上限（秒）
+    BREAKER_THRESHOLD = _Setting(3, int)  # 订阅源连续失败几次后熔断
+    BREAKER_COOLDOWN_HOURS = _Setting(36.0, float)  # 首次熔断时长，再次失败时加倍
+    # 一次运行抓取阶段的总时间预算（秒），到期后取消未完成的请求，已获取的论文照常发送，摘要中列出未完成的数据源；0 为不限
+    RUN_DEADLINE_SECONDS = _Setting(120.0, float)
+
+    # 缓存配置（目录由 GitHub Actions cache 跨运行保存）
+    CACHE_DIR = _Setting(".cache")
+    HTTP_CACHE_DIR = _Setting(_in_cache_dir("http"))  # 置空可禁用
+    HTTP_CACHE_MAX_MB = _Setting(50, int)
+    SEEN_DB_PATH = _Setting(_in_cache_dir("seen.sqlite3"))  # 置空可禁用
+    FEED_HEALTH_PATH = _Setting(_in_cache_dir("feed_health.json"))  # 置空则不跨运行保存
+    # 全文检索档案（如 .cache/archive.sqlite3），默认不启用: 启用后每个订阅源的所有条目都要解析为论文记录写入档案
+    ARCHIVE_DB_PATH = _Setting("")
+    ARCHIVE_MAX_PAPERS = _Setting(50000, int)  # 档案保留的论文数上限，超出时按发布时间删除最旧的；0 为不限
+    FEED_SCHEDULE_PATH = _Setting(_in_cache_dir("feed_schedule.json"))  # 各数据源上次抓取时间，置空则不跨运行保存
+
+    # PDF 全文匹配（可选，需要 pip install pypdf）：标题 / 摘要未命中的 arXiv 论文下载全文再匹配一次
+    PDF_FULLTEXT = _Setting(False, _flag)
+    PDF_NEAR_MISS_RATIO = _Setting(1.0, float)  # 多词关键词中至少该比例的词出现在标题 / 摘要中才下载全文
+    PDF_MAX_PAPERS = _Setting(20, int)  # 每次运行最多下载的 PDF 数
+    PDF_WORKERS = _Setting(4, int)  # 并发下载数；文本提取使用所有 CPU 核心
+    PDF_MAX_MB = _Setting(20, int)  # 单个 PDF 大小上限
+    PDF_CACHE_DIR = _Setting(_in_cache_dir("pdf"))  # 按 arXiv ID 缓存 PDF 与提取的文本，置空则不缓存
+    PDF_CACHE_MAX_MB = _Setting(200, int)
+
+    # 历史回填（arXiv OAI-PMH）
+    OAI_BASE_URL = _Setting("https://oaipmh.arxiv.org/oai")
+    OAI_CHECKPOINT_DIR = _Setting(_in_cache_dir("oai"))  # 置空则不保存进度
+
+    # 分片运行（main.py shard / merge）的中间结果目录；分片在不同机器上运行时需自行传递到 merge 所在的机器
+    SHARD_DIR = _Setting("shards")
+
+    # 守护模式（main.py serve）的调度
+    SERVE_ARXIV_TIMES = _Setting(lambda config: ["05:30", "11:30"], _split)  # UTC，arXiv 每日公告之后
+    SERVE_JOURNAL_INTERVAL_HOURS = _Setting(4.0, float)
+
+    # 运行报告（JSON + Prometheus textfile），由工作流作为 artifact 上传；置空可禁用
+    REPORT_DIR = _Setting("reports")
+
+    @classmethod
+    def reload(cls):
+        """重新读取 .env（覆盖已有的环境变量），此后访问的配置项即为新值（守护模式下修改配置无需重启）"""
+        _load_env(override=True)
 
     @classmethod
     def validate(cls):
@@ -0,0 +1,303 @@
+"""
+跨数据源去重 — arXiv 预印本与期刊发表版合并
+
+1. 标题归一化（Unicode / TeX / HTML）
+2. 从期刊条目中提取 DOI 与 arXiv ID（prism:doi、链接、摘要）
+3. MinHash + LSH 近似重复索引（标题字符 shingle、摘要词 shingle），整体接近线性
+4. 合并重复记录，保留预印本与期刊两方的链接，命中的关键词与词频取各版本的并集
+
+仅凭标题（相同或相近）合并时还要求作者姓氏有交集: "Editorial"、"Correction"、"Reply to Comment"
+等通用标题在不同期刊、不同作者之间大量重复。
+"""
+import html
+import re
+import unicodedata
+import zlib
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import logging
+
+from paper import Paper
+
+logger = logging.getLogger(__name__)
+
+# ========================
+# 归一化
+# ========================
+_HTML_TAG_RE = re.compile(r'<[^>]+>')
+# TeX 重音命令，如 \"u \'{e} \c{c}
+_TEX_ACCENT_RE = re.compile(r'''\\["'`^~=.uvHckrbd]\s*\{?([A-Za-z])\}?''')
+# 其余 TeX 命令，如 \mathrm \textit \alpha（保留参数内容，去掉命令名）
+_TEX_COMMAND_RE = re.compile(r'\\[A-Za-z]+\*?')
+_NON_WORD_RE = re.compile(r'[\W_]+')
+
+_ARXIV_ID_RE = re.compile(r'(?:arxiv\.org/(?:abs|pdf)/|arXiv:\s*)(\d{4}\.\d{4,5}|[a-z\-]+(?:\.[A-Z]{2})?/\d{7})(?:v\d+)?',
+                          re.IGNORECASE)
+_DOI_RE = re.compile(r'\b(10\.\d{4,9}/[^\s"<>?#&]+)')
+
+# 摘要 shingle 过少时（如仅有"Nature Physics, Published online ..."等模板文字）不做摘要相似判定
+_MIN_ABSTRACT_SHINGLES = 20
+
+
+def strip_markup(text: str) -> str:
+    """去掉 HTML 标签 / 实体与 TeX 标记，保留可读文本"""
+    text = html.unescape(_HTML_TAG_RE.sub(' ', text))
+    text = _TEX_ACCENT_RE.sub(r'\1', text)
+    text = _TEX_COMMAND_RE.sub(' ', text)
+    return text.replace('$', ' ').replace('{', '').replace('}', '')
+
+
+def normalize_title(title: str) -> str:
+    """标题归一化：去标记、Unicode 兼容分解并去掉重音、小写、去标点"""
+    text = strip_markup(title)
+    if not text.isascii():
+        text = unicodedata.normalize('NFKD', text)
+        text = ''.join(ch for ch in text if not unicodedata.combining(ch))
+    return _NON_WORD_RE.sub(' ', text.casefold()).strip()
+
+
+def extract_arxiv_id(*texts: str) -> str:
+    for text in texts:
+        if text:
+            m = _ARXIV_ID_RE.search(text)
+            if m:
+                return m.group(1)
+    return ''
+
+
+def extract_doi(*texts: str) -> str:
+    for text in texts:
+        if text:
+            m = _DOI_RE.search(text)
+            if m:
+                return m.group(1).rstrip('.,;)').lower()
+    return ''
+
+
+def author_surnames(paper: Paper) -> Set[str]:
+    """作者姓氏（归一化后的最后一个词），"J. Doe" 与 "Jane Doe" 得到同一个姓氏"""
+    surnames = set()
+    for name in paper.authors:
+        words = normalize_title(name).split()
+        if words:
+            surnames.add(words[-1])
+    return surnames
+
+
+def paper_identifiers(paper: Paper) -> Tuple[str, str]:
+    """返回 (arXiv ID, DOI)，任一未找到时为空字符串"""
+    if paper.is_arxiv:
+        arxiv_id = re.sub(r'v\d+$', '', paper.id)
+    else:
+        arxiv_id = paper.arxiv_id or extract_arxiv_id(paper.id, paper.arxiv_url, paper.abstract)
+    doi = paper.doi.lower() or extract_doi(paper.id, paper.pdf_url)
+    return arxiv_id, doi
+
+
+# ========================
+# MinHash + LSH
+# ========================
+class MinHasher:
+    """
+    单次置换 MinHash（one permutation hashing + 旋转致密化）
+
+    每个 shingle 只哈希一次并按哈希值落入 num_perm 个桶中，各桶取最小值；
+    代价与 shingle 数量成线性，而不是 shingle 数 × 置换数。
+    使用 CRC32 而非内置 hash()，结果与进程、运行无关；
+    桶内碰撞造成的误候选会在精确 Jaccard 校验时剔除。
+    """
+
+    def __init__(self, num_perm: int = 64):
+        self.num_perm = num_perm
+
+    @staticmethod
+    def _hash(shingle: str) -> int:
+        return zlib.crc32(shingle.encode())
+
+    def signature(self, shingles: Set[str]) -> Tuple[int, ...]:
+        if not shingles:
+            return ()
+        n = self.num_perm
+        bins: List[Optional[int]] = [None] * n
+        for shingle in shingles:
+            h = self._hash(shingle)
+            b, v = h % n, h // n
+            if bins[b] is None or v < bins[b]:
+                bins[b] = v
+        # 空桶借用右侧最近非空桶的值（加上距离偏移），短文本也能得到完整签名
+        filled: List[int] = []
+        for i in range(n):
+            for d in range(n):
+                v = bins[(i + d) % n]
+                if v is not None:
+                    filled.append(v + d * (1 << 32))
+                    break
+        return tuple(filled)
+
+
+class LSHIndex:
+    """将签名分为 bands 段，任一段完全相同的条目成为候选对"""
+
+    def __init__(self, bands: int = 16, rows: int = 4):
+        self.bands = bands
+        self.rows = rows
+        self._buckets: Dict[Tuple[int, Tuple[int, ...]], List[int]] = {}
+
+    def _chunks(self, signature: Tuple[int, ...]):
+        for band in range(self.bands):
+            yield band, signature[band * self.rows:(band + 1) * self.rows]
+
+    def query(self, signature: Tuple[int, ...]) -> Set[int]:
+        """返回与签名在任一段上碰撞的已有条目"""
+        candidates: Set[int] = set()
+        if signature:
+            for key in self._chunks(signature):
+                candidates.update(self._buckets.get(key, ()))
+        return candidates
+
+    def insert(self, key: int, signature: Tuple[int, ...]):
+        if signature:
+            for chunk_key in self._chunks(signature):
+                self._buckets.setdefault(chunk_key, []).append(key)
+
+
+def title_shingles(norm_title: str, k: int = 4) -> Set[str]:
+    text = norm_title.replace(' ', '')
+    return {text[i:i + k] for i in range(max(len(text) - k + 1, 1))} if text else set()
+
+
+def abstract_shingles(abstract: str, k: int = 3) -> Set[str]:
+    words = normalize_title(abstract).split()
+    return {' '.join(words[i:i + k]) for i in range(len(words) - k + 1)}
+
+
+def jaccard(a: Set[str], b: Set[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+# ========================
+# 合并
+# ========================
+def _merge(group: List[Paper]) -> Paper:
+    """合并一组重复论文：以 arXiv 版本为主记录，补充期刊信息和全部链接"""
+    primary = next((p for p in group if p.is_arxiv), group[0])
+    doi, arxiv_id, journal = primary.doi, primary.arxiv_id, primary.journal
+    links: List[Tuple[str, str]] = []
+    keywords: List[str] = []
+    # 只在期刊版本的标题 / 摘要（或全文）中命中的关键词同样计入排序与分发
+    keyword_tf = list(primary.keyword_tf)
+    body_tf = list(primary.body_tf)
+    seen_urls = set()
+
+    for p in group:
+        label = p.source or 'arXiv'
+        url = p.arxiv_url
+        if url and url not in seen_urls:
+            seen_urls.add(url)
+            links.append((label, url))
+        for kw in p.matched_keywords:
+            if kw not in keywords:
+                keywords.append(kw)
+        if p is not primary:
+            counted = {kw for kw, _, _ in keyword_tf}
+            keyword_tf.extend(tf for tf in p.keyword_tf if tf[0] not in counted)
+            counted = {kw for kw, _ in body_tf}
+            body_tf.extend(tf for tf in p.body_tf if tf[0] not in counted)
+        p_arxiv_id, p_doi = paper_identifiers(p)
+        doi = doi or p_doi
+        arxiv_id = arxiv_id or p_arxiv_id
+        journal = journal or p.source or ''
+
+    return primary.evolve(doi=doi, arxiv_id=arxiv_id, journal=journal, links=tuple(links),
+                          matched_keywords=tuple(keywords), keyword_tf=tuple(keyword_tf), body_tf=tuple(body_tf))
+
+
+def deduplicate(papers: Iterable[Paper], title_threshold: float = 0.8,
+                abstract_threshold: float = 0.7) -> List[Paper]:
+    """
+    合并重复论文，保持首次出现的顺序
+
+    判定为重复的条件（任一即可）:
+    - arXiv ID 或 DOI 相同
+    - 归一化标题相同，且作者姓氏有交集
+    - LSH 候选对中，标题 shingle Jaccard ≥ title_threshold 且作者姓氏有交集，
+      或摘要 shingle Jaccard ≥ abstract_threshold
+    """
+    papers = list(papers)
+    parent = list(range(len(papers)))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i: int, j: int):
+        ri, rj = find(i), find(j)
+        if ri != rj:
+            parent[max(ri, rj)] = min(ri, rj)
+
+    hasher = MinHasher()
+    title_index, abstract_index = LSHIndex(), LSHIndex()
+    exact: Dict[str, int] = {}
+    same_title: Dict[str, List[int]] = {}
+    t_shingles: List[Set[str]] = []
+    a_shingles: List[Set[str]] = []
+    surnames: List[Set[str]] = []
+
+    for i, paper in enumerate(papers):
+        norm = normalize_title(paper.title)
+        arxiv_id, doi = paper_identifiers(paper)
+        names = author_surnames(paper)
+        surnames.append(names)
+        for key in (f"arxiv:{arxiv_id}" if arxiv_id else None,
+                    f"doi:{doi}" if doi else None):
+            if key is None:
+                continue
+            if key in exact:
+                union(i, exact[key])
+            else:
+                exact[key] = i
+        if norm:
+            earlier = same_title.setdefault(norm, [])
+            for j in earlier:
+                if not names.isdisjoint(surnames[j]):
+                    union(i, j)
+            earlier.append(i)
+
+        ts = title_shingles(norm)
+        abs_s = abstract_shingles(paper.abstract)
+        if len(abs_s) < _MIN_ABSTRACT_SHINGLES:
+            abs_s = set()
+        t_shingles.append(ts)
+        a_shingles.append(abs_s)
+
+        # 已归入同一组的候选无需再计算相似度
+        t_sig, a_sig = hasher.signature(ts), hasher.signature(abs_s)
+        for j in title_index.query(t_sig):
+            if (find(j) != find(i) and not names.isdisjoint(surnames[j])
+                    and jaccard(ts, t_shingles[j]) >= title_threshold):
+                union(i, j)
+        for j in abstract_index.query(a_sig):
+            if find(j) != find(i) and jaccard(abs_s, a_shingles[j]) >= abstract_threshold:
+                union(i, j)
+
+        # 只有未并入已有组的论文才作为代表加入索引，重复很多时候选集合保持很小
+        if find(i) == i:
+            title_index.insert(i, t_sig)
+            abstract_index.insert(i, a_sig)
+
+    groups: Dict[int, List[Paper]] = {}
+    for i, paper in enumerate(papers):
+        groups.setdefault(find(i), []).append(paper)
+
+    result = []
+    for root in sorted(groups):
+        group = groups[root]
+        result.append(_merge(group) if len(group) > 1 else group[0])
+
+    merged = len(papers) - len(result)
+    if merged:
+        logger.info(f"跨源去重: 合并 {merged} 篇重复论文")
+    return result
@@ -0,0 +1,357 @@
+"""
+摘要渲染 — 模板在导入时编译一次，邮件正文由片段拼接而成
+
+- 每篇论文的字段（转义、截断、作者列表等）只整理一次，HTML 与纯文本两种片段共用，
+  并按论文缓存：多位订阅者、多封分卷邮件重复出现的论文不再重复渲染
+- 所有字段插入 HTML 前做转义，RSS 中自带的 HTML 标签 / 实体先还原为纯文本
+- 按估算的 MIME 邮件大小将论文分为若干卷，每卷不超过 MAX_EMAIL_KB
+- 本次运行有数据源超时或获取失败时，摘要（分卷时为第一卷）与『无新论文』通知开头列出这些数据源
+"""
+import html
+import re
+from datetime import datetime
+from functools import lru_cache
+from string import Template
+from typing import List, Sequence, Tuple
+
+from config import Config
+from paper import Paper
+
+_TAG_RE = re.compile(r'<[^>]+>')
+
+HTML_ABSTRACT_CHARS = 500
+TEXT_ABSTRACT_CHARS = 800
+
+# MIMEText 以 base64 编码 UTF-8 正文：每 3 字节变为 4 字节，每 76 字符换行
+_BASE64_FACTOR = 4 / 3 * 77 / 76
+# 邮件头、multipart 边界等固定开销
+_MESSAGE_OVERHEAD = 2048
+
+# ========================
+# 模板
+# ========================
+_HTML_HEAD = Template("""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <style>
+        body { font-family: Arial, sans-serif; line-height: 1.6; }
+        .paper { margin: 20px 0; padding: 15px; border: 1px solid #e0e0e0; border-radius: 5px; }
+        .title { color: #2c3e50; font-size: 18px; margin-bottom: 10px; }
+        .meta { color: #7f8c8d; font-size: 14px; margin-bottom: 10px; }
+        .abstract { background: #f9f9f9; padding: 10px; border-radius: 3px; }
+        .fulltext { background: #fef9e7; padding: 10px; border-radius: 3px; margin-top: 10px; font-size: 14px; }
+        .links { margin-top: 10px; }
+        .link { color: #3498db; text-decoration: none; margin-right: 15px; }
+        .header { background: #2c3e50; color: white; padding: 20px; border-radius: 5px; }
+    </style>
+</head>
+<body>
+    <div class="header">
+        <h1>📚 Arxiv 量子论文每日摘要</h1>
+        <p>日期: $date | 共 $total 篇论文$part</p>
+    </div>
+$incomplete""")
+
+# 编号之后的部分，按论文缓存
+_HTML_PAPER = Template("""$title</div>
+        <div class="meta">
+            👥 作者: $authors<br>
+            📅 发布时间: $published | 📚 分类: $category<br>
+            🔍 命中关键词: $keywords | ⭐ 相关度: $score
+        </div>
+        <div class="abstract">
+            <strong>摘要:</strong><br>
+            $abstract...
+        </div>$fulltext
+        <div class="links">
+            <a class="link" href="$pdf_url">📥 下载PDF</a>
+            <a class="link" href="$arxiv_url">🔗 查看原文</a>
+            $extra_links
+        </div>
+    </div>
+""")
+
+_HTML_INCOMPLETE = Template("""    <div style="background: #fdecea; color: #922b21; padding: 10px 15px; border-radius: 5px; margin: 20px 0;">
+        <strong>⚠️ 本次摘要不完整:</strong> 以下数据源超时或获取失败，下次运行会重新抓取
+        <ul>
+$items        </ul>
+    </div>
+""")
+
+_TEXT_INCOMPLETE = Template("""
+⚠️ 本次摘要不完整: 以下数据源超时或获取失败，下次运行会重新抓取
+$items""")
+
+_HTML_FOOT = Template("""
+    <hr>
+    <p style="color: #95a5a6; font-size: 12px;">
+        此邮件由Arxiv自动摘要系统生成 | 关键词: $keywords
+    </p>
+</body>
+</html>
+""")
+
+_TEXT_HEAD = Template("""Arxiv 量子论文每日摘要$part
+生成时间: $time
+共发现 $total 篇相关论文
+============================================================
+$incomplete""")
+
+_TEXT_PAPER = Template("""============================================================
+📄 标题: $title
+
+👥 作者: $authors
+📅 发布时间: $published
+📚 分类: $category
+🔍 命中关键词: $keywords
+⭐ 相关度: $score
+
+📝 摘要:
+$abstract
+$fulltext
+🔗 链接:
+PDF: $pdf_url
+Arxiv: $arxiv_url
+$extra_links============================================================
+""")
+
+_NO_PAPERS_HTML = Template("""<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <style>
+        body { font-family: Arial, sans-serif; line-height: 1.6; }
+        .container { max-width: 600px; margin: 0 auto; padding: 20px; }
+        .header { background: #f8f9fa; padding: 20px; border-radius: 10px; text-align: center; }
+        .icon { font-size: 48px; margin: 20px 0; }
+        .content { background: white; padding: 30px; border-radius: 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); margin: 20px 0; }
+        .search-info { background: #e8f4fd; padding: 15px; border-radius: 5px; margin: 20px 0; }
+        .footer { color: #6c757d; font-size: 12px; text-align: center; margin-top: 30px; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <div class="icon">📭</div>
+            <h1 style="color: #6c757d;">今日无新论文</h1>
+            <p>Arxiv 量子论文监控报告</p>
+        </div>
+
+        <div class="content">
+            <h2>📅 报告日期：$date</h2>
+$incomplete
+            <div class="search-info">
+                <h3>🔍 搜索条件</h3>
+                <p><strong>关键词：</strong>$keywords</p>
+                <p><strong>时间范围：</strong>最近24小时</p>
+                <p><strong>数据库：</strong>arXiv.org</p>
+            </div>
+
+            <h3>✅ 系统运行正常</h3>
+            <p>监控系统已成功运行，但在过去24小时内未发现符合条件的新论文。</p>
+
+            <h3>可能的原因：</h3>
+            <ul>
+                <li>相关领域今日确实无新论文发表</li>
+                <li>论文发布时间在今日9点之后（下次检查可见）</li>
+                <li>部分论文可能使用不同关键词</li>
+            </ul>
+
+            <div style="background: #fff3cd; padding: 15px; border-radius: 5px; margin: 20px 0;">
+                <p><strong>💡 建议：</strong>如需调整搜索条件，请修改配置文件中的关键词设置。</p>
+            </div>
+        </div>
+
+        <div class="footer">
+            <p>此邮件由 Arxiv 自动监控系统生成</p>
+            <p>下次报告时间：明日 09:00</p>
+        </div>
+    </div>
+</body>
+</html>
+""")
+
+_NO_PAPERS_TEXT = Template("""============================================================
+ARXIV 量子论文监控报告
+============================================================
+
+报告日期：$date
+状态：今日无新论文
+$incomplete
+📊 监控摘要：
+• 系统已成功运行
+• 搜索时间：最近24小时
+• 关键词：$keywords
+• 结果：未发现符合条件的新论文
+
+🔍 可能原因：
+1. 相关领域今日确实无新论文发表
+2. 论文发布时间在今日9点之后
+3. 论文使用了不同的关键词
+
+💡 建议：
+如需调整搜索条件，请修改配置文件中的关键词。
+
+============================================================
+此报告由 Arxiv 自动监控系统生成
+下次报告：明日 09:00
+============================================================
+""")
+
+
+# ========================
+# 单篇论文片段
+# ========================
+def plain_text(text: str) -> str:
+    """RSS 字段可能带 HTML 标签和实体，还原为纯文本"""
+    if '<' in text or '&' in text:
+        text = html.unescape(_TAG_RE.sub('', text))
+    return text.strip()
+
+
+def truncate_text(text: str, max_length: int) -> str:
+    """按词截断文本"""
+    if len(text) <= max_length:
+        return text
+    return text[:max_length].rsplit(' ', 1)[0]
+
+
+@lru_cache(maxsize=4096)
+def render_paper(paper: Paper) -> Tuple[str, str]:
+    """返回论文的 (HTML 片段, 纯文本片段)；两者共用同一次字段整理"""
+    title = plain_text(paper.title)
+    abstract = plain_text(paper.abstract)
+    authors = ', '.join(paper.authors[:3]) + ('等' if len(paper.authors) > 3 else '')
+    keywords = ', '.join(paper.matched_keywords)
+    score = f"{paper.score:.2f}"
+    extra_links = paper.links[1:]  # 跨源合并的论文附带期刊版本等其他链接
+    snippets = paper.fulltext_snippets  # PDF 全文匹配命中的上下文
+
+    esc = html.escape
+    html_fragment = _HTML_PAPER.substitute(
+        title=esc(title),
+        authors=esc(authors),
+        published=paper.published,
+        category=esc(paper.primary_category),
+        keywords=esc(keywords),
+        score=score,
+        abstract=esc(abstract[:HTML_ABSTRACT_CHARS]),
+        fulltext=('\n        <div class="fulltext"><strong>📄 全文命中:</strong><br>'
+                  + '<br>'.join(f"<em>{esc(kw)}</em>: {esc(snippet)}" for kw, snippet in snippets)
+                  + '</div>') if snippets else '',
+        pdf_url=esc(paper.pdf_url),
+        arxiv_url=esc(paper.arxiv_url),
+        extra_links=''.join(f'<a class="link" href="{esc(url)}">📰 {esc(label)}</a>'
+                            for label, url in extra_links),
+    )
+    text_fragment = _TEXT_PAPER.substitute(
+        title=title,
+        authors=authors,
+        published=paper.published,
+        category=paper.primary_category,
+        keywords=keywords,
+        score=score,
+        abstract=truncate_text(abstract, TEXT_ABSTRACT_CHARS) + ("..." if len(abstract) > TEXT_ABSTRACT_CHARS else ""),
+        fulltext=('\n📄 全文命中:\n' + ''.join(f"[{kw}] {snippet}\n" for kw, snippet in snippets))
+        if snippets else '',
+        pdf_url=paper.pdf_url,
+        arxiv_url=paper.arxiv_url,
+        extra_links=''.join(f"{label}: {url}\n" for label, url in extra_links),
+    )
+    return html_fragment, text_fragment
+
+
+@lru_cache(maxsize=4096)
+def _paper_bytes(paper: Paper) -> int:
+    html_fragment, text_fragment = render_paper(paper)
+    # 编号行等每篇论文的额外文字按 200 字节估计
+    return len(html_fragment.encode('utf-8')) + len(text_fragment.encode('utf-8')) + 200
+
+
+def paper_summary(paper: Paper) -> str:
+    """单篇论文的纯文本摘要"""
+    return render_paper(paper)[1]
+
+
+# ========================
+# 整封邮件
+# ========================
+def estimate_message_bytes(body_bytes: int) -> int:
+    """由 HTML + 纯文本正文的 UTF-8 字节数估算最终 MIME 邮件大小"""
+    return int(body_bytes * _BASE64_FACTOR) + _MESSAGE_OVERHEAD
+
+
+def split_digest(papers: Sequence[Paper], max_bytes: int = 0) -> List[List[Paper]]:
+    """
+    按估算大小将论文分卷，每卷邮件不超过 max_bytes（默认 MAX_EMAIL_KB）
+
+    单篇论文本身超过上限时单独成卷。
+    """
+    max_bytes = max_bytes or Config.MAX_EMAIL_KB * 1024
+    fixed = len(_HTML_HEAD.template.encode('utf-8')) + len(_HTML_FOOT.template.encode('utf-8')) + 512
+    parts: List[List[Paper]] = []
+    current: List[Paper] = []
+    size = fixed
+    for paper in papers:
+        paper_size = _paper_bytes(paper)
+        if current and estimate_message_bytes(size + paper_size) > max_bytes:
+            parts.append(current)
+            current, size = [], fixed
+        current.append(paper)
+        size += paper_size
+    if current:
+        parts.append(current)
+    return parts
+
+
+def render_incomplete(sources: Sequence[Tuple[str, str]]) -> Tuple[str, str]:
+    """未完成的数据源 (名称, 原因) 列表的 (HTML, 纯文本) 片段，没有时为空字符串"""
+    if not sources:
+        return '', ''
+    html_items = ''.join(f"            <li>{html.escape(name)}: {html.escape(reason)}</li>\n" for name, reason in sources)
+    text_items = ''.join(f"  - {name}: {reason}\n" for name, reason in sources)
+    return _HTML_INCOMPLETE.substitute(items=html_items), _TEXT_INCOMPLETE.substitute(items=text_items)
+
+
+def _part_label(part: int, parts: int, sep: str) -> str:
+    return f"{sep}第 {part}/{parts} 部分" if parts > 1 else ''
+
+
+def render_html(papers: Sequence[Paper], keywords: Sequence[str], start: int = 1,
+                total: int = 0, part: int = 1, parts: int = 1,
+                incomplete: Sequence[Tuple[str, str]] = ()) -> str:
+    """渲染一卷 HTML 正文；start 为本卷第一篇论文的编号，total 为全部卷的论文总数，incomplete 为未完成的数据源"""
+    chunks = [_HTML_HEAD.substitute(date=datetime.now().strftime('%Y年%m月%d日'),
+                                    total=total or len(papers),
+                                    part=_part_label(part, parts, ' | '),
+                                    incomplete=render_incomplete(incomplete)[0])]
+    for i, paper in enumerate(papers, start):
+        chunks.append(f'    <div class="paper">\n        <div class="title">📄 论文 #{i}: ')
+        chunks.append(render_paper(paper)[0])
+    chunks.append(_HTML_FOOT.substitute(keywords=html.escape(', '.join(keywords))))
+    return ''.join(chunks)
+
+
+def render_text(papers: Sequence[Paper], start: int = 1, total: int = 0,
+                part: int = 1, parts: int = 1, incomplete: Sequence[Tuple[str, str]] = ()) -> str:
+    """渲染一卷纯文本正文"""
+    chunks = [_TEXT_HEAD.substitute(time=datetime.now().strftime('%Y-%m-%d %H:%M'),
+                                    total=total or len(papers),
+                                    part=_part_label(part, parts, ' — '),
+                                    incomplete=render_incomplete(incomplete)[1])]
+    for i, paper in enumerate(papers, start):
+        chunks.append(f"\n论文 #{i}: {plain_text(paper.title)}\n")
+        chunks.append(render_paper(paper)[1])
+    return ''.join(chunks)
+
+
+def render_no_papers(keywords: Sequence[str], incomplete: Sequence[Tuple[str, str]] = ()) -> Tuple[str, str]:
+    """『今日无新论文』通知的 (HTML, 纯文本)"""
+    joined = ', '.join(keywords)
+    notice_html, notice_text = render_incomplete(incomplete)
+    return (
+        _NO_PAPERS_HTML.substitute(date=datetime.now().strftime('%Y年%m月%d日'), keywords=html.escape(joined),
+                                   incomplete=notice_html),
+        _NO_PAPERS_TEXT.substitute(date=datetime.now().strftime('%Y-%m-%d'), keywords=joined, incomplete=notice_text),
+    )
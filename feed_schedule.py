@@ -0,0 +1,169 @@
+"""
+抓取日程 — 跳过自上次成功抓取以来不可能有新内容的数据源
+
+- arXiv（arxiv:<分类> / arxiv:api）: 按 arxiv_calendar 的公告日历，上次抓取之后没有新的公告（周末、假日）时跳过
+- 期刊（journal:<期刊名>）: 遵循订阅源声明的更新频率（feed_stream.feed_hints）——ttl / sy:updatePeriod
+  给出的间隔内不重复抓取，skipDays / skipHours（UTC）期间不抓取
+- 被跳过的源下一次抓取时，时间窗口从上次成功抓取算起（plan() 按组放宽 days_back），跳过期间发布的论文不会遗漏
+- 抓取时刻在摘要发送成功后才记录（record()），发送失败时下次运行照常重新抓取；
+  状态保存在 FEED_SCHEDULE_PATH（随 .cache 跨运行保存）
+- 拿不准时总是抓取: 从未抓取过、状态文件丢失或上次抓取已超过 MAX_INTERVAL 的源都视为需要抓取
+"""
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, NamedTuple, Optional, Sequence
+import logging
+
+import arxiv_calendar
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+RELEASE_GRACE = 2 * 3600     # 公告可见后这段时间内的抓取不算已看到（RSS 的更新时刻有出入）
+MAX_INTERVAL = 7 * 86400     # 订阅源声明的更新间隔上限，超过后总是抓取
+EARLY = 0.1                  # 更新间隔的容差比例（定时任务的启动时刻有几分钟抖动）
+WINDOW_SLACK = 3600          # 距上次抓取比 days_back 多出不到这么多时不放宽窗口
+MAX_CATCHUP_DAYS = 7         # 放宽后的时间窗口上限（RSS 本身也只保留最近的条目）
+
+_WEEKDAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+
+class FetchPlan(NamedTuple):
+    due: List[str]               # 需要抓取的数据源键，保持传入的顺序
+    skipped: Dict[str, str]      # 跳过的数据源键 → 原因
+    days_back: Dict[str, int]    # 'arxiv' / 'journal' → 该组本次的回溯天数
+
+
+class FeedSchedule:
+    """各数据源上次成功抓取的时间与声明的更新频率，保存为 JSON 文件"""
+
+    def __init__(self, path: Optional[str] = None):
+        self._path = path   # None: 按当前 Config.FEED_SCHEDULE_PATH 解析
+        self._lock = threading.Lock()
+        self._sources: Optional[Dict[str, dict]] = None
+        self._loaded_from: Optional[str] = None
+        self._dirty = False
+
+    @property
+    def path(self) -> str:
+        return Config.FEED_SCHEDULE_PATH if self._path is None else self._path
+
+    @path.setter
+    def path(self, value: Optional[str]):
+        self._path = value
+
+    def _load(self):
+        # 路径变化（重新加载配置）后从新文件读取；旧文件的内容应已在此之前 save()
+        path = self.path
+        if self._sources is not None and self._loaded_from == path:
+            return
+        self._sources = {}
+        self._loaded_from = path
+        self._dirty = False
+        if not path:
+            return
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                self._sources = json.load(f).get('sources', {})
+        except (OSError, ValueError):
+            return
+
+    def last_fetch(self, key: str) -> Optional[float]:
+        with self._lock:
+            self._load()
+            return self._sources.get(key, {}).get('fetched_at')
+
+    def observe(self, key: str, hints: Dict[str, object]):
+        """记录订阅源声明的更新频率（每次下载到新内容时调用）"""
+        with self._lock:
+            self._load()
+            state = self._sources.setdefault(key, {})
+            if state.get('hints', {}) != hints:
+                state['hints'] = hints
+                self._dirty = True
+
+    def skip_reason(self, key: str, now: Optional[float] = None) -> Optional[str]:
+        """数据源 key 此刻不可能有新内容时返回原因，否则返回 None"""
+        now = time.time() if now is None else now
+        with self._lock:
+            self._load()
+            state = dict(self._sources.get(key, {}))
+        last = state.get('fetched_at')
+        if last is None or now - last >= MAX_INTERVAL:
+            return None
+        moment = datetime.fromtimestamp(now, timezone.utc)
+
+        if key.startswith('arxiv:'):
+            mode = 'api' if Config.ARXIV_MODE == 'api' else 'rss'
+            released = arxiv_calendar.last_release(moment, mode)
+            if released is None or last < released.timestamp() + RELEASE_GRACE:
+                return None
+            upcoming = arxiv_calendar.next_release(moment, mode)
+            when = f"，下次约 {upcoming:%m-%d %H:%M} UTC" if upcoming else ''
+            return f"上次抓取后 arXiv 没有新的公告{when}"
+
+        hints = state.get('hints', {})
+        skip_days = hints.get('skip_days', [])
+        if len(skip_days) < 7 and _WEEKDAYS[moment.weekday()] in skip_days:
+            return f"订阅源声明 {_WEEKDAYS[moment.weekday()]} 不更新 (skipDays)"
+        skip_hours = hints.get('skip_hours', [])
+        if len(skip_hours) < 24 and moment.hour in skip_hours:
+            return f"订阅源声明 UTC {moment.hour} 点不更新 (skipHours)"
+        interval = min(hints.get('interval', 0), MAX_INTERVAL)
+        if interval and now < last + interval * (1 - EARLY):
+            return f"订阅源每 {interval / 3600:g} 小时更新，距上次抓取 {(now - last) / 3600:.1f} 小时"
+        return None
+
+    def plan(self, sources: Sequence[str], days_back: int, now: Optional[float] = None) -> FetchPlan:
+        """
+        按数据源键（见 sharding.all_sources）划分需要抓取与跳过的源
+
+        需要抓取的源若距上次成功抓取已超过 days_back，所在组的回溯天数放宽到覆盖上次抓取以来的全部时间
+        """
+        now = time.time() if now is None else now
+        due: List[str] = []
+        skipped: Dict[str, str] = {}
+        days = {'arxiv': days_back, 'journal': days_back}
+        for key in sources:
+            reason = self.skip_reason(key, now)
+            if reason:
+                skipped[key] = reason
+                continue
+            due.append(key)
+            last = self.last_fetch(key)
+            if last is not None:
+                group = key.split(':', 1)[0]
+                gap = math.ceil((now - last - WINDOW_SLACK) / 86400)
+                days[group] = max(days.get(group, days_back), min(gap, MAX_CATCHUP_DAYS))
+        return FetchPlan(due, skipped, days)
+
+    def record(self, fetched: Dict[str, float]):
+        """记录数据源键 → 成功抓取的时刻（摘要发送成功后调用）"""
+        if not fetched:
+            return
+        with self._lock:
+            self._load()
+            for key, ts in fetched.items():
+                self._sources.setdefault(key, {})['fetched_at'] = ts
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp = f"{self.path}.{threading.get_ident()}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'sources': self._sources, 'updated_at': time.time()}, f, ensure_ascii=False)
+            os.replace(tmp, self.path)
+            self._dirty = False
+
+
+# 所有抓取器共享同一个实例
+feed_schedule = FeedSchedule()
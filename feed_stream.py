@@ -0,0 +1,264 @@
+"""
+流式 RSS / Atom 解析器 — 基于 ElementTree.XMLPullParser，逐条产出轻量条目
+解析过程中即可应用日期截止和关键词预过滤，条目早于时间窗口后提前停止；
+遇到格式异常的源时回退到 feedparser。
+feed_hints() 读取频道声明的更新频率（ttl / skipDays / sy:updatePeriod 等），供 feed_schedule 判断何时需要重新抓取。
+"""
+import itertools
+import re
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterator, List, Optional
+from xml.etree.ElementTree import ParseError, XMLPullParser
+import logging
+
+logger = logging.getLogger(__name__)
+
+# 条目元素的本地名: RSS 1.0/2.0 为 item，Atom 为 entry
+_ENTRY_TAGS = ('item', 'entry')
+
+# 每次喂给解析器的字节数
+_FEED_CHUNK = 64 * 1024
+
+NS_DC = 'http://purl.org/dc/elements/1.1/'
+NS_PRISM_PREFIX = 'http://prismstandard.org/namespaces/'
+
+# 频道级的更新频率元数据（RSS 2.0 ttl / skipDays / skipHours，RSS 1.0 syndication 模块）位于第一个条目之前
+_HINTS_HEAD = 32 * 1024
+_FIRST_ENTRY_RE = re.compile(rb'<(?:item|entry)[\s>]')
+_TTL_RE = re.compile(rb'<ttl>\s*(\d+)\s*</ttl>')
+_SY_PERIOD_RE = re.compile(rb'<sy:updatePeriod>\s*(\w+)\s*</sy:updatePeriod>')
+_SY_FREQUENCY_RE = re.compile(rb'<sy:updateFrequency>\s*(\d+)\s*</sy:updateFrequency>')
+_SKIP_DAYS_RE = re.compile(rb'<skipDays>(.*?)</skipDays>', re.S)
+_SKIP_HOURS_RE = re.compile(rb'<skipHours>(.*?)</skipHours>', re.S)
+_DAY_RE = re.compile(rb'<day>\s*(\w+)\s*</day>')
+_HOUR_RE = re.compile(rb'<hour>\s*(\d+)\s*</hour>')
+_SY_PERIODS = {b'hourly': 3600, b'daily': 86400, b'weekly': 7 * 86400,
+               b'monthly': 30 * 86400, b'yearly': 365 * 86400}
+_WEEKDAYS = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+
+class FeedEntry:
+    """单个订阅条目，只保留抓取器需要的字段"""
+
+    __slots__ = ('title', 'link', 'summary', 'authors', 'categories', 'published', 'doi',
+                 'matched_keywords', 'field_lengths', 'keyword_tf')
+
+    def __init__(self):
+        self.title = ''
+        self.link = ''
+        self.summary = ''
+        self.authors: List[str] = []
+        self.categories: List[str] = []
+        self.published: Optional[datetime] = None
+        self.doi = ''
+        self.matched_keywords: List[str] = []  # 由预过滤回调填写
+        self.field_lengths = (0, 0)            # (标题词数, 摘要词数)，同上
+        self.keyword_tf: tuple = ()            # ((关键词, 标题词频, 摘要词频), ...)，同上
+
+
+def filter_fingerprint(cutoff: Optional[datetime], keywords) -> str:
+    """解析时过滤条件的指纹（时间窗口长度 + 关键词），用于判断缓存的解析结果是否仍可复用"""
+    window = '' if cutoff is None else round((datetime.now(timezone.utc) - cutoff).total_seconds() / 3600)
+    return f"{window}h|{'|'.join(keywords)}"
+
+
+def feed_hints(content: bytes) -> Dict[str, object]:
+    """
+    订阅源声明的更新频率: {'interval': 秒, 'skip_days': [星期名], 'skip_hours': [UTC 小时]}，未声明的项省略
+
+    interval 取 <ttl>（分钟）与 sy:updatePeriod / sy:updateFrequency 中较长者
+    """
+    head = content[:_HINTS_HEAD]
+    first = _FIRST_ENTRY_RE.search(head)
+    if first is not None:
+        head = head[:first.start()]
+    hints: Dict[str, object] = {}
+    intervals = []
+    ttl = _TTL_RE.search(head)
+    if ttl:
+        intervals.append(int(ttl.group(1)) * 60)
+    period = _SY_PERIOD_RE.search(head)
+    if period and period.group(1).lower() in _SY_PERIODS:
+        frequency = _SY_FREQUENCY_RE.search(head)
+        intervals.append(_SY_PERIODS[period.group(1).lower()] // max(1, int(frequency.group(1)) if frequency else 1))
+    if intervals and max(intervals) > 0:
+        hints['interval'] = max(intervals)
+    days = _SKIP_DAYS_RE.search(head)
+    if days:
+        names = {d.decode().capitalize() for d in _DAY_RE.findall(days.group(1))}
+        hints['skip_days'] = [d for d in _WEEKDAYS if d in names]
+    hours = _SKIP_HOURS_RE.search(head)
+    if hours:
+        hints['skip_hours'] = sorted({int(h) % 24 for h in _HOUR_RE.findall(hours.group(1))})
+    return {key: value for key, value in hints.items() if value}
+
+
+def _split(tag: str):
+    """'{ns}local' → (ns, local)"""
+    if tag[0] == '{':
+        ns, local = tag[1:].split('}', 1)
+        return ns, local
+    return '', tag
+
+
+def _text(elem) -> str:
+    return ''.join(elem.itertext()).strip()
+
+
+def parse_date(value: str) -> Optional[datetime]:
+    """解析 RFC 822 (RSS pubDate) 或 ISO 8601 (dc:date / Atom) 日期，统一为 UTC"""
+    value = value.strip()
+    if not value:
+        return None
+    try:
+        if value[:4].isdigit():
+            dt = datetime.fromisoformat(value.replace('Z', '+00:00'))
+        else:
+            dt = parsedate_to_datetime(value)
+    except (ValueError, TypeError):
+        return None
+    if dt.tzinfo is None:
+        return dt.replace(tzinfo=timezone.utc)
+    return dt.astimezone(timezone.utc)
+
+
+def _clean_doi(value: str) -> str:
+    value = value.strip()
+    if value.lower().startswith('doi:'):
+        value = value[4:]
+    return value.strip()
+
+
+def _build_entry(elem) -> FeedEntry:
+    entry = FeedEntry()
+    summary = content = ''
+    for child in elem:
+        ns, local = _split(child.tag)
+        if local == 'title' and not entry.title:
+            entry.title = _text(child)
+        elif local == 'link':
+            href = child.get('href')
+            if href is not None:
+                # Atom: 优先 rel="alternate"
+                if child.get('rel', 'alternate') == 'alternate' and not entry.link:
+                    entry.link = href
+            elif not entry.link:
+                entry.link = _text(child)
+        elif local in ('description', 'summary'):
+            summary = _text(child)
+        elif local in ('content', 'encoded'):
+            content = _text(child)
+        elif local == 'creator' or (local == 'author' and ns != NS_DC):
+            name = child.find('{http://www.w3.org/2005/Atom}name')
+            entry.authors.append(_text(name if name is not None else child))
+        elif local in ('category', 'subject'):
+            term = child.get('term') or _text(child)
+            if term:
+                entry.categories.append(term)
+        elif local in ('pubDate', 'published', 'date', 'updated', 'publicationDate'):
+            # published/pubDate 优先于 updated/dc:date
+            if entry.published is None or local in ('pubDate', 'published'):
+                entry.published = parse_date(_text(child)) or entry.published
+        elif local == 'doi' and ns.startswith(NS_PRISM_PREFIX):
+            entry.doi = _clean_doi(_text(child))
+        elif local == 'identifier' and not entry.doi:
+            value = _text(child)
+            if value.lower().startswith('doi:'):
+                entry.doi = _clean_doi(value)
+    entry.summary = summary or content
+    return entry
+
+
+def _iter_xml(content: bytes) -> Iterator[FeedEntry]:
+    # 不用 iterparse: 提前停止时它的内部生成器处于引用循环中，连同整个响应体要等到下次垃圾回收才释放
+    parser = XMLPullParser(events=('start', 'end'))
+    depth = 0
+    chunks = (content[offset:offset + _FEED_CHUNK] for offset in range(0, len(content), _FEED_CHUNK))
+    for chunk in itertools.chain(chunks, [b'']):  # 空块表示结束
+        if chunk:
+            parser.feed(chunk)
+        else:
+            parser.close()
+        for event, elem in parser.read_events():
+            local = _split(elem.tag)[1]
+            if local not in _ENTRY_TAGS:
+                continue
+            if event == 'start':
+                depth += 1
+                continue
+            depth -= 1
+            if depth == 0:
+                yield _build_entry(elem)
+                elem.clear()  # 释放已处理条目，保持内存占用平稳
+
+
+def entry_from_feedparser(e) -> FeedEntry:
+    """将 feedparser 条目转换为 FeedEntry（回退路径）"""
+    entry = FeedEntry()
+    entry.title = e.get('title', '').strip()
+    entry.link = e.get('link', '')
+    entry.summary = (e.get('summary', '') or e.get('description', '')).strip()
+    author = e.get('author', '') or e.get('dc:creator', '')
+    if author:
+        entry.authors = [author]
+    entry.categories = [t.get('term', '') for t in e.get('tags', []) if t.get('term')]
+    parsed = e.get('published_parsed') or e.get('updated_parsed')
+    if parsed:
+        entry.published = datetime(*parsed[:6], tzinfo=timezone.utc)
+    else:
+        entry.published = parse_date(e.get('published') or e.get('updated') or '')
+    entry.doi = _clean_doi(e.get('prism_doi', '') or '')
+    if not entry.doi and (e.get('dc_identifier', '') or '').lower().startswith('doi:'):
+        entry.doi = _clean_doi(e['dc_identifier'])
+    return entry
+
+
+def _iter_feedparser(content: bytes) -> Iterator[FeedEntry]:
+    import feedparser
+    for e in feedparser.parse(content).entries:
+        yield entry_from_feedparser(e)
+
+
+def stream_entries(content: bytes,
+                   cutoff: Optional[datetime] = None,
+                   accept: Optional[Callable[[FeedEntry], bool]] = None,
+                   stop_after_old: int = 0,
+                   name: str = '') -> Iterator[FeedEntry]:
+    """
+    逐条产出订阅条目
+
+    Args:
+        content: 原始 RSS / Atom 字节
+        cutoff: 早于该时间的条目被丢弃；无日期的条目保留
+        accept: 预过滤回调（如关键词匹配），返回 False 的条目被丢弃
+        stop_after_old: 连续遇到这么多条早于 cutoff 的条目后停止解析（0 表示不提前停止）
+        name: 源名称，仅用于日志
+    """
+    def _filter(entries: Iterator[FeedEntry]) -> Iterator[FeedEntry]:
+        old_run = 0
+        for entry in entries:
+            if cutoff is not None and entry.published is not None and entry.published < cutoff:
+                old_run += 1
+                if stop_after_old and old_run >= stop_after_old:
+                    return
+                continue
+            old_run = 0
+            if accept is not None and not accept(entry):
+                continue
+            yield entry
+
+    produced = 0
+    try:
+        for entry in _filter(_iter_xml(content)):
+            produced += 1
+            yield entry
+        return
+    except ParseError as e:
+        if produced:
+            # 已产出部分条目后才出错，不再回退以免重复
+            logger.warning(f"  {name}: XML 解析中断 ({e})，保留已解析的 {produced} 条")
+            return
+        logger.info(f"  {name}: 流式解析失败 ({e})，回退到 feedparser")
+
+    yield from _filter(_iter_feedparser(content))
@@ -0,0 +1,207 @@
+"""
+并发抓取引擎 — 线程池并行下载所有 RSS 源
+礼貌爬取由按主机划分的令牌桶保证，替代原先源与源之间的全局 sleep；
+一次运行的抓取阶段受 run_deadline 的总时间预算约束（RUN_DEADLINE_SECONDS），到期后协作式取消未完成的请求
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple, TypeVar
+from urllib.parse import urlparse
+import logging
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar('T')
+R = TypeVar('R')
+
+# 每个主机的限速: (每秒补充令牌数, 桶容量)
+# 按域名后缀匹配，如 'nature.com' 同时覆盖 www.nature.com
+HOST_RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+    'rss.arxiv.org': (0.5, 4),    # 原先每个分类间隔 2 秒
+    'oaipmh.arxiv.org': (1 / 3, 1),  # arXiv 批量接口要求每 3 秒不超过 1 次请求
+    'export.arxiv.org': (1 / 3, 1),  # arXiv API 同样要求每 3 秒不超过 1 次请求（ARXIV_MODE=api）
+    'arxiv.org': (0.5, 2),        # PDF 全文下载（pdf_fulltext）
+    'feeds.aps.org': (1.0, 2),
+    'nature.com': (1.0, 4),
+    'science.org': (1.0, 2),
+}
+DEFAULT_RATE_LIMIT: Tuple[float, int] = (1.0, 2)
+
+
+class TokenBucket:
+    """线程安全的令牌桶，acquire() 在令牌不足时阻塞等待（可限定最长等待时间）"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None) -> bool:
+        """取得一个令牌；timeout 秒内等不到时立即返回 False（不消耗令牌）"""
+        give_up = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if give_up is not None and now + wait > give_up:
+                return False
+            time.sleep(wait)
+
+
+class HostRateLimiter:
+    """按主机名分配令牌桶"""
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, int]]] = None):
+        self.limits = HOST_RATE_LIMITS if limits is None else limits
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _limit_for(self, host: str) -> Tuple[str, Tuple[float, int]]:
+        for suffix, limit in self.limits.items():
+            if host == suffix or host.endswith('.' + suffix):
+                return suffix, limit
+        return host, DEFAULT_RATE_LIMIT
+
+    def acquire(self, url: str, timeout: Optional[float] = None) -> bool:
+        """在请求 url 之前调用，必要时阻塞直到该主机有可用令牌；timeout 秒内等不到时返回 False"""
+        host = (urlparse(url).hostname or '').lower()
+        key, (rate, capacity) = self._limit_for(host)
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(rate, capacity)
+        return bucket.acquire(timeout)
+
+
+class RunDeadline:
+    """
+    一次运行的总时间预算，由抓取线程协作检查（未 start() 时不限时）
+
+    http_client 发出请求、重试、等待限速令牌前检查剩余时间，单次请求的超时不超过剩余时间，
+    到期后不再发出新的请求；正在读取的响应体通过 guard() 登记中断方法，到期时立即中断。
+    因预算到期而放弃的订阅源记录在 cancelled 中
+    """
+
+    def __init__(self):
+        self.seconds = 0.0
+        self._until: Optional[float] = None
+        self._cancelled: Set[str] = set()
+        self._aborts: Dict[int, Callable[[], None]] = {}
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+
+    def start(self, seconds: float):
+        """开始计时；seconds <= 0 表示不限时"""
+        self.clear()
+        with self._lock:
+            self.seconds = seconds
+            self._cancelled = set()
+            if seconds > 0:
+                self._until = time.monotonic() + seconds
+                self._timer = threading.Timer(seconds, self._expire)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def clear(self):
+        """运行结束，取消时间限制（cancelled 保留到下次 start()）"""
+        with self._lock:
+            self._until = None
+            self._aborts.clear()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+
+    def _expire(self):
+        with self._lock:
+            aborts = list(self._aborts.values())
+            self._aborts.clear()
+        for abort in aborts:
+            try:
+                abort()
+            except Exception as e:
+                logger.debug(f"中断未完成的读取失败: {e}")
+
+    @contextmanager
+    def guard(self, abort: Callable[[], None]) -> Iterator[None]:
+        """with 块执行期间预算到期时调用 abort()（如关闭正在读取的连接），使阻塞的读取立即返回"""
+        key = id(abort)
+        with self._lock:
+            if self._until is not None:
+                self._aborts[key] = abort
+        if self.expired:
+            abort()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self._aborts.pop(key, None)
+
+    def remaining(self) -> Optional[float]:
+        """剩余秒数（到期后为 0），不限时为 None"""
+        until = self._until
+        return None if until is None else max(0.0, until - time.monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.remaining() == 0
+
+    def cancel(self, *feeds: str):
+        """记录因预算到期而未完成的订阅源"""
+        with self._lock:
+            self._cancelled.update(feeds)
+
+    @property
+    def cancelled(self) -> Set[str]:
+        with self._lock:
+            return set(self._cancelled)
+
+
+def mirror_url(url: str) -> str:
+    """配置了 FEED_MIRROR_URL 时，将订阅源地址改写到镜像服务器"""
+    mirror = Config.FEED_MIRROR_URL
+    if not mirror:
+        return url
+    parts = urlparse(url)
+    path = parts.path + (f"?{parts.query}" if parts.query else '')
+    return f"{mirror.rstrip('/')}/{parts.hostname}{path}"
+
+
+# 所有抓取器共享同一个限速器，保证同一主机的总请求速率受控
+rate_limiter = HostRateLimiter()
+# 所有抓取器共享同一个时间预算，由 main 在抓取开始时 start()、结束后 clear()
+run_deadline = RunDeadline()
+
+
+def fetch_concurrently(items: Iterable[T], worker: Callable[[T], R],
+                       max_workers: Optional[int] = None) -> List[Optional[R]]:
+    """
+    并行执行 worker(item)，按输入顺序返回结果
+
+    worker 自行处理网络异常；此处兜底捕获未预期异常并以 None 作为该项结果，
+    保证单个源失败不影响其他源。
+    """
+    items = list(items)
+    if not items:
+        return []
+    workers = min(max_workers or Config.FETCH_WORKERS, len(items))
+
+    def _safe(item):
+        try:
+            return worker(item)
+        except Exception as e:
+            logger.warning(f"抓取任务 {item} 异常: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='fetch') as pool:
+        return list(pool.map(_safe, items))
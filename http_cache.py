@@ -0,0 +1,207 @@
+"""
+磁盘 HTTP 缓存 — 为 RSS 源提供条件请求 (ETag / Last-Modified)
+每个 URL 保存压缩后的响应体、校验字段以及已解析的条目；
+服务器返回 304 时直接复用解析结果，跳过解析。
+缓存目录可由 GitHub Actions cache 持久化，跨运行复用。
+"""
+import gzip
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+import logging
+
+from config import Config
+from paper import Paper
+
+logger = logging.getLogger(__name__)
+
+
+class CacheEntry:
+    """单个 URL 的缓存记录"""
+
+    def __init__(self, url: str, etag: str = '', last_modified: str = '',
+                 fetched_at: float = 0.0, papers: Optional[List[Paper]] = None,
+                 variant: str = ''):
+        self.url = url
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+        self.papers = papers
+        self.variant = variant  # 解析参数指纹，不一致时需从原始内容重新解析
+
+
+class HttpCache:
+    def __init__(self, cache_dir: Optional[str] = None, max_bytes: Optional[int] = None):
+        # 未指定时每次使用都按当前 Config 解析（守护模式重新加载配置后即生效）
+        self._cache_dir = cache_dir
+        self._max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    @property
+    def cache_dir(self) -> str:
+        return Config.HTTP_CACHE_DIR if self._cache_dir is None else self._cache_dir
+
+    @cache_dir.setter
+    def cache_dir(self, value: Optional[str]):
+        self._cache_dir = value
+
+    @property
+    def max_bytes(self) -> int:
+        return Config.HTTP_CACHE_MAX_MB * 1024 * 1024 if self._max_bytes is None else self._max_bytes
+
+    @max_bytes.setter
+    def max_bytes(self, value: Optional[int]):
+        self._max_bytes = value
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.cache_dir)
+
+    def _path(self, url: str, suffix: str) -> str:
+        key = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, key + suffix)
+
+    def lookup(self, url: str) -> Optional[CacheEntry]:
+        """读取 url 的缓存记录，不存在或损坏时返回 None"""
+        if not self.enabled:
+            return None
+        try:
+            with open(self._path(url, '.json'), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if meta.get('url') != url:
+            return None
+        papers = meta.get('papers')
+        if papers is not None:
+            try:
+                papers = [Paper.from_dict(p) for p in papers]
+            except (KeyError, TypeError):
+                papers = None  # 旧格式的解析结果，从缓存的原始内容重新解析
+        return CacheEntry(url, meta.get('etag', ''), meta.get('last_modified', ''),
+                          meta.get('fetched_at', 0.0), papers, meta.get('variant', ''))
+
+    def validators(self, entry: Optional[CacheEntry]) -> Dict[str, str]:
+        """根据缓存记录生成条件请求头"""
+        headers = {}
+        if entry is None:
+            return headers
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def load_body(self, url: str) -> Optional[bytes]:
+        """读取缓存的原始响应体"""
+        try:
+            with gzip.open(self._path(url, '.body.gz'), 'rb') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def touch(self, url: str):
+        """304 命中时刷新访问时间，供 LRU 淘汰使用"""
+        if not self.enabled:
+            return
+        try:
+            os.utime(self._path(url, '.json'))
+        except OSError:
+            pass
+
+    def store(self, url: str, resp, papers: List[Paper], variant: str = ''):
+        """保存响应体、校验字段和解析结果；无校验字段的响应不缓存"""
+        if not self.enabled:
+            return
+        etag = resp.headers.get('ETag', '')
+        last_modified = resp.headers.get('Last-Modified', '')
+        if not etag and not last_modified:
+            return
+
+        meta = {
+            'url': url,
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': time.time(),
+            'papers': [p.to_dict() for p in papers],
+            'variant': variant,
+        }
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            self._atomic_write(self._path(url, '.body.gz'), gzip.compress(resp.content))
+            self._atomic_write(self._path(url, '.json'),
+                               json.dumps(meta, ensure_ascii=False).encode('utf-8'))
+        except OSError as e:
+            logger.warning(f"写入 HTTP 缓存失败: {e}")
+            return
+        self.evict()
+
+    def update_papers(self, entry: CacheEntry, papers: List[Paper], variant: str = ''):
+        """304 后按新的解析参数重新解析了缓存的响应体时，只更新解析结果（响应体与校验字段不变）"""
+        if not self.enabled:
+            return
+        meta = {
+            'url': entry.url,
+            'etag': entry.etag,
+            'last_modified': entry.last_modified,
+            'fetched_at': entry.fetched_at,
+            'papers': [p.to_dict() for p in papers],
+            'variant': variant,
+        }
+        try:
+            self._atomic_write(self._path(entry.url, '.json'),
+                               json.dumps(meta, ensure_ascii=False).encode('utf-8'))
+        except OSError as e:
+            logger.warning(f"写入 HTTP 缓存失败: {e}")
+
+    def _atomic_write(self, path: str, data: bytes):
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+
+    def evict(self):
+        """总大小超过上限时，按最近访问时间淘汰最旧的记录"""
+        with self._lock:
+            try:
+                names = os.listdir(self.cache_dir)
+            except OSError:
+                return
+
+            groups: Dict[str, List] = {}
+            total = 0
+            for name in names:
+                if name.endswith('.tmp'):
+                    continue
+                path = os.path.join(self.cache_dir, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                key = name.split('.', 1)[0]
+                group = groups.setdefault(key, [0.0, 0, []])
+                if name.endswith('.json'):
+                    group[0] = st.st_mtime
+                group[1] += st.st_size
+                group[2].append(path)
+                total += st.st_size
+
+            if total <= self.max_bytes:
+                return
+
+            for _, size, paths in sorted(groups.values(), key=lambda g: g[0]):
+                for path in paths:
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                total -= size
+                if total <= self.max_bytes:
+                    break
+
+
+# 所有抓取器共享同一个缓存实例
+http_cache = HttpCache()
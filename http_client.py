@@ -0,0 +1,304 @@
+"""
+共享 HTTP 客户端 — 连接池、重试、熔断与自适应超时
+
+- 所有订阅源共用一个 requests.Session：同一主机（feeds.aps.org、nature.com 等）的请求复用 keep-alive 连接，
+  响应 gzip 压缩传输
+- 连接错误、超时、响应体读取中断（分块编码 / 压缩数据损坏）与 429 / 5xx 响应按 HTTP_MAX_RETRIES 重试：有 Retry-After 时按其等待（上限 HTTP_MAX_RETRY_AFTER），
+  否则指数退避 + 全抖动
+- 每个订阅源的请求结果记录在 FEED_HEALTH_PATH（随 .cache 跨运行保存）：连续 BREAKER_THRESHOLD 次运行失败后熔断，
+  在冷却期内直接跳过该源（冷却期随失败次数加倍，最长 7 天）；冷却期过后放行一次试探，成功即恢复
+- 超时按主机的历史响应延迟自适应（RFC 6298 的 SRTT + 4·RTTVAR，限定在 HTTP_MIN_TIMEOUT ~ HTTP_TIMEOUT），
+  从未成功过的主机使用 HTTP_TIMEOUT；同一次运行中某主机上连续 HOST_FAIL_FAST 个订阅源连接失败后，该主机的其余订阅源不再等待超时
+- 运行设有总时间预算（fetch_engine.run_deadline）时，请求超时、限速与重试等待都不超过剩余时间，响应体分块读取，
+  预算到期即放弃（DeadlineExceededError）；因预算到期而放弃的请求不计入健康记录与熔断
+"""
+import json
+import os
+import random
+import socket
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional
+from urllib.parse import urlparse
+import logging
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import Config
+from fetch_engine import rate_limiter, run_deadline
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+MAX_COOLDOWN = 7 * 86400
+HISTORY_SIZE = 20
+HOST_FAIL_FAST = 2        # 同一次运行中主机上连续几个订阅源连接失败（各自重试用尽）后，其余请求直接失败
+BODY_CHUNK = 64 * 1024    # 有时间预算时分块读取响应体，每块之后检查剩余时间
+# 可重试的请求错误；响应体读到一半连接断开时 requests 抛出的是 ChunkedEncodingError 等，而非 ConnectionError
+TRANSIENT_ERRORS = (requests.ConnectionError, requests.Timeout,
+                    requests.exceptions.ChunkedEncodingError, requests.exceptions.ContentDecodingError)
+
+
+class CircuitOpenError(requests.RequestException):
+    """订阅源处于熔断冷却期，本次未发出请求"""
+
+
+class HostUnavailableError(requests.ConnectionError):
+    """本次运行中该主机已连续连接失败，未发出请求"""
+
+
+class DeadlineExceededError(requests.Timeout):
+    """本次运行的时间预算已用完，请求未发出或已中断"""
+
+
+def _host(url: str) -> str:
+    return (urlparse(url).hostname or '').lower()
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """解析 Retry-After（秒数或 HTTP 日期）"""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class FeedHealth:
+    """各订阅源的请求历史与熔断状态、各主机的响应延迟统计，保存为 JSON 文件"""
+
+    def __init__(self, path: Optional[str] = None):
+        self._path = path   # None: 按当前 Config.FEED_HEALTH_PATH 解析
+        self._lock = threading.Lock()
+        self._feeds: Optional[Dict[str, dict]] = None
+        self._hosts: Dict[str, dict] = {}
+        self._loaded_from: Optional[str] = None
+        self._dirty = False
+
+    @property
+    def path(self) -> str:
+        return Config.FEED_HEALTH_PATH if self._path is None else self._path
+
+    @path.setter
+    def path(self, value: Optional[str]):
+        self._path = value
+
+    def _load(self):
+        # 路径变化（重新加载配置）后从新文件读取；旧文件的内容应已在此之前 save()
+        path = self.path
+        if self._feeds is not None and self._loaded_from == path:
+            return
+        self._feeds, self._hosts = {}, {}
+        self._loaded_from = path
+        self._dirty = False
+        if not path:
+            return
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        self._feeds = data.get('feeds', {})
+        self._hosts = data.get('hosts', {})
+
+    def blocked_until(self, feed: str) -> float:
+        """熔断冷却期的结束时间，未熔断时返回 0"""
+        with self._lock:
+            self._load()
+            state = self._feeds.get(feed)
+            if not state or state.get('open_until', 0) <= time.time():
+                return 0.0
+            return state['open_until']
+
+    def timeout(self, host: str) -> float:
+        with self._lock:
+            self._load()
+            stats = self._hosts.get(host)
+        if not stats:
+            return Config.HTTP_TIMEOUT
+        rto = stats['srtt'] + 4 * stats['rttvar']
+        return min(Config.HTTP_TIMEOUT, max(Config.HTTP_MIN_TIMEOUT, rto))
+
+    def record(self, feed: str, host: str, ok: bool, latency: float, error: str = ''):
+        """记录一次请求（含重试）的最终结果；成功时更新主机延迟统计"""
+        now = time.time()
+        with self._lock:
+            self._load()
+            state = self._feeds.setdefault(feed, {'failures': 0, 'open_until': 0, 'history': []})
+            state['history'] = (state['history'] + [[int(now), ok, round(latency, 3)]])[-HISTORY_SIZE:]
+            if ok:
+                if state['failures'] >= Config.BREAKER_THRESHOLD:
+                    logger.info(f"  {feed}: 恢复正常，解除熔断")
+                state.update(failures=0, open_until=0, last_success=int(now), last_error='')
+                stats = self._hosts.get(host)
+                if stats is None:
+                    self._hosts[host] = {'srtt': latency, 'rttvar': latency / 2}
+                else:
+                    stats['rttvar'] = 0.75 * stats['rttvar'] + 0.25 * abs(stats['srtt'] - latency)
+                    stats['srtt'] = 0.875 * stats['srtt'] + 0.125 * latency
+            else:
+                state['failures'] += 1
+                state['last_error'] = error[:200]
+                over = state['failures'] - Config.BREAKER_THRESHOLD
+                if over >= 0:
+                    cooldown = min(MAX_COOLDOWN, Config.BREAKER_COOLDOWN_HOURS * 3600 * 2 ** over)
+                    state['open_until'] = int(now + cooldown)
+                    logger.warning(f"  {feed}: 连续 {state['failures']} 次失败，熔断 {cooldown / 3600:.0f} 小时")
+            self._dirty = True
+
+    def save(self):
+        with self._lock:
+            if not self.path or not self._dirty:
+                return
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp = f"{self.path}.{threading.get_ident()}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                json.dump({'feeds': self._feeds, 'hosts': self._hosts, 'updated_at': time.time()}, f)
+            os.replace(tmp, self.path)
+            self._dirty = False
+
+
+class HttpClient:
+    def __init__(self, health: Optional[FeedHealth] = None):
+        self.health = FeedHealth() if health is None else health
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=16, pool_maxsize=max(Config.FETCH_WORKERS, 4))
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.session.headers['Accept-Encoding'] = 'gzip, deflate'
+        self._host_failures: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _sleep_before_retry(self, attempt: int, resp: Optional[requests.Response]):
+        delay = retry_after_seconds(resp.headers.get('Retry-After')) if resp is not None else None
+        if delay is None:
+            delay = random.uniform(0, Config.HTTP_BACKOFF * (2 ** attempt))
+        delay = min(delay, Config.HTTP_MAX_RETRY_AFTER)
+        remaining = run_deadline.remaining()
+        if remaining is not None:
+            delay = min(delay, remaining)
+        if delay:
+            time.sleep(delay)
+
+    @staticmethod
+    def _cancel(feed: str, url: str) -> DeadlineExceededError:
+        run_deadline.cancel(feed)
+        metrics.inc('deadline_cancels', feed=feed)
+        return DeadlineExceededError(f"运行时间预算（{run_deadline.seconds:g} 秒）已用完，放弃请求 {url}")
+
+    @staticmethod
+    def _read_body(resp: requests.Response):
+        """分块读取响应体（内容与 resp.content 相同），预算到期时关闭连接、立即中断仍在等待的读取"""
+        sock = getattr(getattr(resp.raw, 'connection', None), 'sock', None)
+
+        def abort():
+            if sock is not None:
+                try:
+                    sock.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+        chunks = []
+        try:
+            with run_deadline.guard(abort):
+                for chunk in resp.iter_content(BODY_CHUNK):
+                    chunks.append(chunk)
+                    if run_deadline.expired:
+                        raise DeadlineExceededError("响应体未在时间预算内读完")
+        except requests.RequestException as e:
+            if run_deadline.expired and not isinstance(e, DeadlineExceededError):
+                raise DeadlineExceededError("响应体未在时间预算内读完") from e
+            raise
+        finally:
+            resp.close()
+        resp._content = b''.join(chunks)
+
+    def get(self, url: str, headers: Optional[Dict[str, str]] = None,
+            feed: Optional[str] = None, track: bool = True) -> requests.Response:
+        """
+        GET 请求（按主机限速、重试），返回最终响应（调用方自行处理 304 / raise_for_status）
+
+        feed 为熔断与健康记录的键，默认为 url。熔断中、主机本次已不可达或运行时间预算已用完时抛出 RequestException 子类。
+        track=False 用于一次性的请求（如 PDF 下载）：不做熔断、不写入健康记录，其余相同。
+        """
+        feed = feed or url
+        host = _host(url)
+        blocked = self.health.blocked_until(feed) if track else 0
+        if blocked:
+            metrics.inc('breaker_skips', feed=feed)
+            until = time.strftime('%Y-%m-%d %H:%M', time.gmtime(blocked))
+            raise CircuitOpenError(f"连续失败已熔断，{until} UTC 前跳过")
+
+        timeout = self.health.timeout(host)
+        started = time.perf_counter()
+        error = ''
+        resp = None
+        for attempt in range(Config.HTTP_MAX_RETRIES + 1):
+            with self._lock:
+                unavailable = self._host_failures.get(host, 0) >= HOST_FAIL_FAST
+            if unavailable:
+                if attempt and track:   # 本源已实际请求失败过，计入健康记录
+                    self.health.record(feed, host, False, time.perf_counter() - started, error)
+                raise HostUnavailableError(f"{host} 本次运行已有连续 {HOST_FAIL_FAST} 个订阅源连接失败，跳过")
+            if attempt:
+                metrics.inc('http_retries', host=host)
+            if not rate_limiter.acquire(url, run_deadline.remaining()):
+                raise self._cancel(feed, url)
+            remaining = run_deadline.remaining()
+            if remaining == 0:
+                raise self._cancel(feed, url)
+            try:
+                if remaining is None:
+                    resp = self.session.get(url, headers=headers, timeout=timeout)
+                else:
+                    resp = self.session.get(url, headers=headers, timeout=min(timeout, remaining), stream=True)
+                    self._read_body(resp)
+            except TRANSIENT_ERRORS as e:
+                if run_deadline.expired:   # 超时由预算截短，不是订阅源本身的问题
+                    raise self._cancel(feed, url) from e
+                error = f"{type(e).__name__}: {e}"
+                if attempt == Config.HTTP_MAX_RETRIES:
+                    # 每个订阅源只在重试全部失败后计一次，单个源的重试不会使整个主机被判为不可达
+                    with self._lock:
+                        self._host_failures[host] = self._host_failures.get(host, 0) + 1
+                    if track:
+                        self.health.record(feed, host, False, time.perf_counter() - started, error)
+                    raise
+                self._sleep_before_retry(attempt, None)
+                continue
+
+            with self._lock:
+                self._host_failures[host] = 0
+            if resp.status_code in RETRY_STATUS and attempt < Config.HTTP_MAX_RETRIES:
+                logger.info(f"  {feed}: HTTP {resp.status_code}，稍后重试（第 {attempt + 1} 次）")
+                self._sleep_before_retry(attempt, resp)
+                continue
+            break
+
+        ok = resp.status_code < 400
+        if track:
+            self.health.record(feed, host, ok, resp.elapsed.total_seconds(),
+                               '' if ok else f"HTTP {resp.status_code}")
+        return resp
+
+    def close(self):
+        """保存订阅源健康记录；主机连接失败计数只在一次运行内有效"""
+        with self._lock:
+            self._host_failures.clear()
+        try:
+            self.health.save()
+        except OSError as e:
+            logger.warning(f"保存订阅源健康记录失败: {e}")
+
+
+# 所有抓取器共享同一个客户端（连接池、健康记录）
+http_client = HttpClient()
@@ -4,12 +4,23 @@
 arXiv 已覆盖绝大多数物理学期刊论文，期刊 RSS 仅作补充。
 本地运行时通常可正常获取期刊 RSS。
 """
+import time
 import requests
-import feedparser
 from datetime import datetime, timedelta, timezone
-from typing import List, Dict, Optional
+from typing import Dict, List, Optional, Sequence
 import logging
-import time
+
+from feed_schedule import feed_schedule
+from feed_stream import FeedEntry, feed_hints, filter_fingerprint, stream_entries
+from fetch_engine import fetch_concurrently, mirror_url
+from http_cache import http_cache
+from http_client import http_client
+from keyword_matcher import get_matcher
+from metrics import CallTimer, metrics
+from dedup import normalize_title
+from paper import Paper
+from paper_archive import paper_archive
+from seen_store import seen_store
 
 logger = logging.getLogger(__name__)
 
@@ -51,144 +62,201 @@ class JournalRSSFetcher:
 
     def __init__(self, keywords: List[str]):
         self.keywords = keywords
+        self.matcher = get_matcher(keywords)
+
+    def _fetch_rss(self, journal_name: str, url: str,
+                   cutoff: Optional[datetime] = None) -> Optional[List[Paper]]:
+        """获取单个期刊 RSS 源（cutoff 之前的条目和未命中关键词的条目在解析时即被丢弃），失败时返回 None"""
+        # 缓存的解析结果依赖于关键词和时间窗口长度，二者变化时需从缓存的原始内容重新解析
+        variant = filter_fingerprint(cutoff, self.keywords)
+        url = mirror_url(url)
+        cached = http_cache.lookup(url)
+        headers = {'User-Agent': 'Mozilla/5.0 (compatible; ArxivDigest/1.0; +https://github.com/balabalabalalaba/arxiv-paper-monitor)'}
+        headers.update(http_cache.validators(cached))
 
-    def _fetch_rss(self, journal_name: str, url: str) -> List[Dict]:
-        """获取单个期刊 RSS 源"""
         try:
-            resp = requests.get(
-                url,
-                timeout=30,
-                headers={'User-Agent': 'Mozilla/5.0 (compatible; ArxivDigest/1.0; +https://github.com/balabalabalalaba/arxiv-paper-monitor)'}
-            )
+            with metrics.timer('feed_fetch', feed=journal_name):
+                resp = http_client.get(url, headers=headers, feed=journal_name)
+            metrics.inc('feed_requests', feed=journal_name, status=resp.status_code)
+            metrics.inc('feed_bytes', len(resp.content), feed=journal_name)
+            if resp.status_code == 304 and cached is not None:
+                http_cache.touch(url)
+                if cached.papers is not None and cached.variant == variant:
+                    logger.info(f"  {journal_name}: RSS 未更新 (304)，复用缓存 {len(cached.papers)} 篇")
+                    return cached.papers
+                # 解析参数变化（关键词、时间窗口）: 从缓存的响应体重新解析，并按新参数更新缓存的解析结果
+                body = http_cache.load_body(url)
+                papers = self._parse_feed(body or b'', journal_name, cutoff)
+                if body is not None:
+                    http_cache.update_papers(cached, papers, variant)
+                return papers
             resp.raise_for_status()
         except requests.RequestException as e:
+            metrics.inc('feed_errors', feed=journal_name)
             logger.warning(f"  {journal_name}: RSS 获取失败 — {e}")
-            return []
+            return None
 
-        feed = feedparser.parse(resp.content)
-        papers = []
+        papers = self._parse_feed(resp.content, journal_name, cutoff)
+        http_cache.store(url, resp, papers, variant)
+        # 订阅源声明的更新频率（ttl、skipDays、sy:updatePeriod），决定之后的运行何时需要重新抓取
+        feed_schedule.observe(f"journal:{journal_name}", feed_hints(resp.content))
+        return papers
 
-        for entry in feed.entries:
+    def _prefilter(self, entry: FeedEntry) -> bool:
+        """解析时的关键词预过滤，命中的关键词及其在标题 / 摘要中的词频记录在条目上（供相关度排序）"""
+        entry.field_lengths, entry.keyword_tf = self.matcher.count_fields(entry.title, entry.summary)
+        entry.matched_keywords = [kw for kw, _, _ in entry.keyword_tf]
+        return bool(entry.keyword_tf)
+
+    def _parse_feed(self, content: bytes, journal_name: str,
+                    cutoff: Optional[datetime] = None) -> List[Paper]:
+        """流式解析期刊 RSS 内容为论文列表（启用档案时所有条目都写入档案，只返回命中关键词的）"""
+        start = time.perf_counter()
+        prefilter = CallTimer(self._prefilter)
+        papers = []
+        # 所有条目（不论是否命中）按批写入档案，内存中最多保留一批
+        archive = paper_archive.buffer()
+        archiving = paper_archive.enabled
+        # 期刊条目大致按时间倒序，但不严格，连续较多旧条目后才停止
+        entries = stream_entries(content, cutoff=cutoff, accept=None if archiving else prefilter,
+                                 stop_after_old=20, name=journal_name)
+
+        for entry in entries:
             try:
-                title = entry.get('title', '').strip()
-                summary = entry.get('summary', '') or entry.get('description', '')
-                link = entry.get('link', '')
-
-                # 解析日期 — 兼容 RSS 1.0/2.0 和 Atom
-                pub_date = None
-                pub_parsed = entry.get('published_parsed') or entry.get('updated_parsed')
-                if pub_parsed:
-                    pub_date = datetime(*pub_parsed[:6], tzinfo=timezone.utc)
-                else:
-                    # 尝试从字符串解析 (RSS 1.0 dc:date 等)
-                    date_str = entry.get('published') or entry.get('updated') or entry.get('dc:date', '')
-                    if date_str:
-                        try:
-                            from email.utils import parsedate_to_datetime
-                            pub_date = parsedate_to_datetime(date_str).replace(tzinfo=timezone.utc)
-                        except Exception:
-                            pass
+                matched = prefilter(entry) if archiving else True
+                title = entry.title
+                link = entry.link
+                doi = entry.doi
+
+                # 已投递过的论文无需继续解析（仍需存档的除外）
+                delivered = False
+                if matched:
+                    keys = ['title:' + normalize_title(title)]
+                    if doi:
+                        keys.append('doi:' + doi.lower())
+                    delivered = seen_store.is_delivered(keys)
+                if not archiving and delivered:
+                    continue
+
+                # 日期 — 兼容 RSS 1.0/2.0 和 Atom，解析器已统一为 UTC
+                pub_date = entry.published
                 if not pub_date:
-                    # 最后兜底：使用当前时间
+                    # 最后兜底：使用当前时间（重复推送由 seen_store 拦截）
                     pub_date = datetime.now(timezone.utc)
 
                 # 提取作者 — 兼容多种 RSS 格式
-                authors = []
-                author_str = entry.get('author', '') or entry.get('dc:creator', '')
-                if author_str:
-                    authors = [a.strip() for a in author_str.split(',')]
-
-                paper = {
-                    'id': link,
-                    'title': title,
-                    'authors': authors,
-                    'abstract': summary.strip(),
-                    'pdf_url': link,
-                    'published': pub_date.strftime('%Y-%m-%d %H:%M'),
-                    'primary_category': journal_name,
-                    'categories': [journal_name],
-                    'arxiv_url': link,
-                    'source': journal_name,  # 标记来源期刊
-                }
-                papers.append(paper)
+                authors = [a.strip() for author in entry.authors for a in author.split(',') if a.strip()]
+
+                paper = Paper.create(
+                    id=link,
+                    title=title,
+                    authors=authors,
+                    abstract=entry.summary,
+                    pdf_url=link,
+                    published=pub_date,
+                    primary_category=journal_name,
+                    categories=[journal_name],
+                    arxiv_url=link,
+                    source=journal_name,  # 标记来源期刊
+                    doi=doi,
+                    matched_keywords=entry.matched_keywords,
+                    field_lengths=entry.field_lengths,
+                    keyword_tf=entry.keyword_tf,
+                )
+                if archiving:
+                    archive.append(paper)
+                if matched and not delivered:
+                    papers.append(paper)
 
             except Exception:
                 continue
 
+        # 解析耗时包含关键词预过滤，预过滤另行单独记录
+        metrics.observe('feed_parse', time.perf_counter() - start, feed=journal_name)
+        metrics.observe('keyword_filter', prefilter.elapsed, feed=journal_name)
+        metrics.inc('feed_entries', prefilter.calls, feed=journal_name)
+        metrics.inc('feed_candidates', len(papers), feed=journal_name)
+        archive.flush()
         if papers:
-            logger.info(f"  {journal_name}: 从 RSS 获取 {len(papers)} 篇论文")
+            logger.info(f"  {journal_name}: 从 RSS 获取 {len(papers)} 篇候选论文")
         return papers
 
-    def _matches_keywords(self, paper: Dict) -> bool:
-        """检查论文是否匹配关键词"""
-        text = f"{paper['title']} {paper['abstract']}".lower()
-        for kw in self.keywords:
-            kw_parts = kw.strip().lower().split()
-            if all(part in text for part in kw_parts):
-                return True
-        return False
-
-    def fetch_all(self, days_back: int = 1) -> List[Dict]:
+    def fetch_feeds(self, feeds: Sequence[tuple], days_back: int = 1) -> Dict[str, Optional[List[Paper]]]:
         """
-        从所有期刊 RSS 源获取近期论文
+        下载并解析给定的期刊源，按期刊名返回通过日期与关键词过滤的论文（获取失败的源为 None）
 
         Args:
+            feeds: (显示名称, RSS URL) 列表，JOURNAL_RSS_FEEDS 或其子集（分片运行）
             days_back: 回溯天数
         """
         end_date = datetime.now(timezone.utc)
         start_date = end_date - timedelta(days=days_back + 1)  # +1 天缓冲
 
-        all_papers = []
-        seen_titles = set()
-
-        successful = 0
-        failed = 0
-        total_matched = 0
+        start_ts, end_ts = int(start_date.timestamp()), int(end_date.timestamp())
 
-        for journal_name, url in JOURNAL_RSS_FEEDS:
-            logger.info(f"获取 {journal_name} RSS...")
-            papers = self._fetch_rss(journal_name, url)
+        # 所有期刊并行下载，限速由 rate_limiter 按主机控制
+        logger.info(f"并行获取 {len(feeds)} 个期刊 RSS...")
+        results = fetch_concurrently(feeds, lambda feed: self._fetch_rss(feed[0], feed[1], start_date))
 
-            if not papers:
-                failed += 1
+        filtered: Dict[str, Optional[List[Paper]]] = {}
+        for (journal_name, url), papers in zip(feeds, results):
+            if papers is None:
+                filtered[journal_name] = None
                 continue
 
-            successful += 1
-            matched = 0
-
+            kept = []
             for paper in papers:
                 # 日期过滤
-                pub_str = paper['published']
-                try:
-                    pub_dt = datetime.strptime(pub_str, '%Y-%m-%d %H:%M').replace(tzinfo=timezone.utc)
-                except ValueError:
-                    continue
-
-                if pub_dt < start_date or pub_dt > end_date:
+                if paper.published_ts < start_ts or paper.published_ts > end_ts:
                     continue
 
-                # 关键词过滤
-                if not self._matches_keywords(paper):
-                    continue
+                # 关键词过滤（解析时已预过滤，此处兼容旧缓存）
+                if not paper.matched_keywords:
+                    hits = self.matcher.match_paper(paper)
+                    if not hits:
+                        continue
+                    paper = paper.evolve(matched_keywords=tuple(hits))
+                kept.append(paper)
+
+            if kept:
+                logger.info(f"  {journal_name}: {len(papers)}篇 → 匹配 {len(kept)}篇")
+            filtered[journal_name] = kept
+        return filtered
+
+    def combine(self, results: Dict[str, Optional[List[Paper]]]) -> List[Paper]:
+        """按 JOURNAL_RSS_FEEDS 的顺序合并各期刊的结果（标题去重），按日期排序；与期刊如何分片无关"""
+        all_papers = []
+        seen_titles = set()
+        successful = 0
+        failed = 0
+        for journal_name, _ in JOURNAL_RSS_FEEDS:
+            if journal_name not in results:
+                continue
+            papers = results[journal_name]
+            if papers is None:
+                failed += 1
+                continue
+            successful += 1
 
+            for paper in papers:
                 # 标题去重
-                title_key = paper['title'].lower().strip()
+                title_key = paper.title.lower().strip()
                 if title_key in seen_titles:
                     continue
                 seen_titles.add(title_key)
-
                 all_papers.append(paper)
-                matched += 1
-
-            if matched > 0:
-                logger.info(f"  {journal_name}: {len(papers)}篇 → 匹配 {matched}篇")
-            total_matched += matched
-
-            # 期刊间延迟
-            time.sleep(1)
 
         # 按日期排序
-        all_papers.sort(key=lambda p: p['published'], reverse=True)
+        all_papers.sort(key=lambda p: p.published_ts, reverse=True)
 
-        logger.info(f"期刊RSS: {successful} 个期刊成功, {failed} 个失败, 共匹配 {total_matched} 篇论文")
+        logger.info(f"期刊RSS: {successful} 个期刊成功, {failed} 个失败, 共匹配 {len(all_papers)} 篇论文")
         return all_papers
+
+    def fetch_all(self, days_back: int = 1) -> List[Paper]:
+        """
+        从所有期刊 RSS 源获取近期论文
+
+        Args:
+            days_back: 回溯天数
+        """
+        return self.combine(self.fetch_feeds(JOURNAL_RSS_FEEDS, days_back))
@@ -0,0 +1,175 @@
+"""
+编译式多关键词匹配器 — arXiv 与期刊抓取器共用
+关键词按"词"编译为首词索引，每篇文档分词一次、单次扫描，并返回命中的关键词
+"""
+import re
+from functools import lru_cache
+from itertools import repeat
+from typing import Dict, List, Sequence, Tuple
+
+from paper import Paper
+
+# 按词切分；连字符、换行等都视为分隔符，如 "Rydberg-atom" 与 "Rydberg atom" 等价
+_TOKEN_RE = re.compile(r'\w+')
+# 词尾允许的复数后缀，如 "Rydberg atom" 匹配 "Rydberg atoms"
+_PLURAL_SUFFIXES = ('s', 'es')
+
+
+def tokenize(text: str) -> List[str]:
+    """小写并切分为词"""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def _surface_forms(word: str) -> Tuple[str, ...]:
+    """关键词中一个词可接受的写法（原形及复数形式）"""
+    return (word,) + tuple(word + suf for suf in _PLURAL_SUFFIXES)
+
+
+class KeywordMatcher:
+    """
+    将关键词列表编译为词表 + "首词 → 短语"索引
+
+    与旧实现（每个关键词的每个词分别做子串查找）相比:
+    - 每篇文档只分词、归一化一次，只检查首词出现过的关键词
+    - 按整词匹配，"ion" 不再命中 "ionization"
+    - 多词关键词按短语（相邻词）匹配
+    """
+
+    def __init__(self, keywords: Sequence[str]):
+        self.keywords: List[str] = []
+        self._single: Dict[str, List[int]] = {}    # 单词关键词: 词 → 关键词编号
+        self._phrases: Dict[str, List[Tuple[int, str]]] = {}  # 短语: 首词 → [(编号, " w1 w2 ")]
+        self._surface: Dict[str, str] = {}  # 关键词中出现过的词的各种写法 → 原形
+        self._phrase_words: List[Tuple[int, frozenset]] = []  # 多词关键词: (编号, 词集合)
+        parsed = []
+        seen = set()
+        for kw in keywords:
+            words = tuple(tokenize(kw))
+            if words and words not in seen:
+                seen.add(words)
+                parsed.append((kw.strip(), words))
+
+        # 关键词自身的单复数写法统一到同一原形，如 "Rydberg atoms" 与 "Rydberg atom"
+        vocab = {w for _, words in parsed for w in words}
+        canonical = {w: self._canonical(w, vocab) for w in vocab}
+        for base in set(canonical.values()):
+            for form in _surface_forms(base):
+                self._surface.setdefault(form, base)
+        for base in canonical.values():
+            self._surface[base] = base  # 原形优先于其他词的复数写法
+
+        for kw, words in parsed:
+            words = tuple(canonical[w] for w in words)
+            kid = len(self.keywords)
+            self.keywords.append(kw)
+            if len(words) == 1:
+                self._single.setdefault(words[0], []).append(kid)
+            else:
+                self._phrases.setdefault(words[0], []).append((kid, f" {' '.join(words)} "))
+                self._phrase_words.append((kid, frozenset(words)))
+        self._firsts = frozenset(self._single) | frozenset(self._phrases)
+
+    @staticmethod
+    def _canonical(word: str, vocab) -> str:
+        for suf in _PLURAL_SUFFIXES[::-1]:
+            if word.endswith(suf) and word[:-len(suf)] in vocab:
+                return word[:-len(suf)]
+        return word
+
+    def find_tokens(self, tokens: Sequence[str]) -> List[str]:
+        """在已分词的文本中查找，返回命中的关键词（按配置顺序）"""
+        # 将词还原为关键词中的原形，不相关的词置空（保证短语只能跨相邻词命中）
+        surface = self._surface
+        norm = [surface.get(t, '') for t in tokens]
+        firsts = self._firsts.intersection(norm)
+        if not firsts:
+            return []
+
+        hit = []
+        norm_text = None
+        for first in firsts:
+            hit.extend(self._single.get(first, ()))
+            phrases = self._phrases.get(first)
+            if phrases:
+                if norm_text is None:
+                    norm_text = f" {' '.join(norm)} "
+                hit.extend(kid for kid, phrase in phrases if phrase in norm_text)
+        return [self.keywords[k] for k in sorted(hit)]
+
+    def count_tokens(self, tokens: Sequence[str]) -> Dict[int, int]:
+        """统计已分词文本中每个关键词出现的次数: 关键词编号 → 次数（未出现的不列出）"""
+        norm = list(map(self._surface.get, tokens, repeat('')))
+        firsts = self._firsts.intersection(norm)
+        counts: Dict[int, int] = {}
+        if not firsts:
+            return counts
+        norm_text = None
+        for first in firsts:
+            single = self._single.get(first)
+            if single:
+                n = norm.count(first)
+                for kid in single:
+                    counts[kid] = n
+            phrases = self._phrases.get(first)
+            if phrases:
+                if norm_text is None:
+                    norm_text = f" {' '.join(norm)} "
+                for kid, phrase in phrases:
+                    n = norm_text.count(phrase)
+                    if n:
+                        counts[kid] = n
+        return counts
+
+    def count_fields(self, title: str, abstract: str) -> Tuple[Tuple[int, int], Tuple[Tuple[str, int, int], ...]]:
+        """
+        一次分词统计标题与摘要中每个关键词的词频，供相关度排序使用
+
+        Returns:
+            ((标题词数, 摘要词数), ((关键词, 标题词频, 摘要词频), ...))，关键词按配置顺序，只含命中的
+        """
+        tokens = tokenize(f"{title}\n{abstract}")
+        n_title = len(tokenize(title))
+        lengths = (n_title, len(tokens) - n_title)
+        if not self._firsts:
+            return lengths, ()
+        total = self.count_tokens(tokens)
+        if not total:
+            return lengths, ()
+        in_title = self.count_tokens(tokens[:n_title])
+        return lengths, tuple((self.keywords[kid], in_title.get(kid, 0), n - in_title.get(kid, 0))
+                              for kid, n in sorted(total.items()))
+
+    def near_misses(self, text: str, ratio: float = 1.0) -> List[str]:
+        """
+        未按短语命中、但至少 ratio 比例的词出现在 text 中的多词关键词（PDF 全文匹配的候选）
+
+        如 "Rydberg atom" 之于 "... atoms excited to high-lying Rydberg states ..."
+        """
+        if not self._phrase_words or not text:
+            return []
+        present = set(map(self._surface.get, tokenize(text), repeat('')))
+        hits = set(self.find(text))
+        return [self.keywords[kid] for kid, words in self._phrase_words
+                if self.keywords[kid] not in hits and len(words & present) >= ratio * len(words)]
+
+    def find(self, text: str) -> List[str]:
+        """返回 text 中命中的关键词（按配置顺序）"""
+        if not self._firsts or not text:
+            return []
+        return self.find_tokens(tokenize(text))
+
+    def match_paper(self, paper: Paper) -> List[str]:
+        """对论文标题 + 摘要做一次扫描，返回命中的关键词（复用 Paper 缓存的小写文本）"""
+        if not self._firsts:
+            return []
+        return self.find_tokens(_TOKEN_RE.findall(paper.search_text))
+
+
+@lru_cache(maxsize=8)
+def _build(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(keywords)
+
+
+def get_matcher(keywords: Sequence[str]) -> KeywordMatcher:
+    """获取关键词列表对应的匹配器；同一组关键词在一次运行中只编译一次"""
+    return _build(tuple(keywords))
@@ -1,14 +1,18 @@
 """
 arXiv + 期刊 论文每日摘要 — 适配 GitHub Actions
 每天获取过去 24 小时的 Rydberg atom 相关论文，邮件推送
+
+抓取、发信等较重的模块（requests、feedparser、smtplib、MIME 等）在子命令用到时才导入，
+validate / search 等轻量子命令无需加载它们（启动耗时见 benchmarks/bench_startup.py）。
 """
+import argparse
 import os
-from datetime import datetime
+import time
+from datetime import date, datetime, timedelta
 import logging
 
 from config import Config
-from UnifiedFetcher import UnifiedPaperFetcher
-from email_sender import EmailSender
+from metrics import metrics
 
 logging.basicConfig(
     level=logging.INFO,
@@ -18,57 +22,493 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+def _save_schedule():
+    from feed_schedule import feed_schedule
+    try:
+        feed_schedule.save()
+    except OSError as e:
+        logger.warning(f"保存抓取日程失败: {e}")
+
+
+def _close_stores():
+    """关闭数据库连接（合并 WAL），保存订阅源健康记录与抓取日程"""
+    from http_client import http_client
+    from paper_archive import paper_archive
+    from seen_store import seen_store
+    seen_store.close()
+    paper_archive.close()
+    http_client.close()
+    _save_schedule()
+
+
 class ArxivDailyDigest:
     def __init__(self):
-        self.fetcher = UnifiedPaperFetcher()
+        from UnifiedFetcher import UnifiedPaperFetcher
+        from email_sender import EmailSender
+        from subscribers import SubscriberIndex, load_subscribers
+
+        self.subscribers = SubscriberIndex(load_subscribers())
+        # 所有订阅者的关键词合并后只抓取、解析一次
+        self.fetcher = UnifiedPaperFetcher(self.subscribers.keywords)
         self.email_sender = EmailSender()
 
+    def _fetch(self, stage, fetch, *args):
+        """
+        在 RUN_DEADLINE_SECONDS 的时间预算内执行 fetch(*args, days_back=1)，到期后取消未完成的请求
+
+        抓取出错时不抛出: 返回空列表，本次需要抓取的数据源都记为未完成，之后照常发送（摘要中列出这些数据源）
+        """
+        from fetch_engine import run_deadline
+        run_deadline.start(Config.RUN_DEADLINE_SECONDS)
+        try:
+            with metrics.stage(stage):
+                return fetch(*args, days_back=1)
+        except Exception as e:
+            metrics.inc('run_errors')
+            logger.exception(f"抓取出错，本次抓取结果作废，摘要中将列出未完成的数据源: {e}")
+            self.fetcher.abandon(f"抓取出错: {e}")
+            return []
+        finally:
+            run_deadline.clear()
+
     def run(self):
         """运行一次论文抓取 + 邮件发送"""
         logger.info("=" * 60)
         logger.info(f"开始执行论文抓取任务 - {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
 
         try:
-            # 获取过去 24 小时的论文
-            papers = self.fetcher.fetch_all(days_back=1)
+            # 获取过去 24 小时的论文（上次成功抓取更早时窗口相应放宽）；
+            # 超出时间预算或出错的数据源不影响其他数据源，已获取的论文照常发送
+            papers = self._fetch('fetch', self.fetcher.fetch_all)
+
+            if not self.fetcher.due:
+                logger.info("所有数据源自上次抓取以来都没有新内容（arXiv 周末 / 假日不公告），本次不发送邮件")
+                return
+            # arXiv 本次没有新公告时不发送『无新论文』通知，只向有新论文（来自期刊）的订阅者推送
+            arxiv_idle = any(key.startswith('arxiv:') for key in self.fetcher.skipped)
 
-            # 生成摘要
-            summaries = []
             if papers:
-                summaries = [self.fetcher.generate_summary(paper) for paper in papers]
                 logger.info(f"找到 {len(papers)} 篇相关论文")
+            elif arxiv_idle:
+                logger.info("今日没有找到相关论文，arXiv 今日无公告，不发送『无新论文』通知")
             else:
                 logger.info("今日没有找到相关论文，将发送『无新论文』通知")
 
-            # 发送邮件
-            success = self.email_sender.send_digest(papers, summaries)
-            if success:
-                logger.info(f"✅ 任务完成！{'成功发送 ' + str(len(papers)) + ' 篇论文摘要' if papers else '已发送『今日无新论文』通知'}")
-            else:
-                logger.error("邮件发送失败")
+            incomplete = self.fetcher.incomplete_sources()
+            if incomplete:
+                logger.warning(f"本次摘要不完整: {len(incomplete)} 个数据源超时或获取失败，将在摘要中列出")
+
+            with metrics.stage('deliver'):
+                if self.deliver(papers, skip_empty=arxiv_idle, incomplete=incomplete):
+                    self.fetcher.commit_schedule()
 
         except Exception as e:
+            metrics.inc('run_errors')
             logger.exception(f"任务执行失败: {e}")
+        finally:
+            _close_stores()
+
+        logger.info("=" * 60)
 
+    def backfill(self, start: date, end: date, categories=None, resume: bool = True,
+                 dry_run: bool = False):
+        """
+        回填 [start, end] 期间的 arXiv 论文并推送（dry_run 时只列出，不发送、不记录投递、不读写检查点）
+
+        收割检查点与其中暂存的论文在投递成功后才删除；中断或发送失败后重新运行同一命令，已收割的页不再请求，
+        其中的论文与其余各页一并推送（已收到的订阅者不会重复收到）
+        """
         logger.info("=" * 60)
+        logger.info(f"开始历史回填 {start} ~ {end}")
+        try:
+            with metrics.stage('fetch'):
+                papers = self.fetcher.backfill(start, end, categories, resume, checkpoint=not dry_run)
+            logger.info(f"回填共找到 {len(papers)} 篇未投递的相关论文")
+            if dry_run:
+                for paper in papers:
+                    print(f"{paper.score:6.2f}  {paper.published[:10]}  [{paper.primary_category}] "
+                          f"{paper.id}  {paper.title}")
+                return
+            delivered = True
+            if papers:
+                with metrics.stage('deliver'):
+                    delivered = self.deliver(papers, limit=0)
+            if delivered:
+                self.fetcher.finish_backfill(start, end, categories)
+            else:
+                logger.error("部分邮件发送失败，检查点已保留，重新运行同一命令即可补发")
+        except Exception as e:
+            metrics.inc('run_errors')
+            logger.exception(f"回填失败（已收割的页与其中的论文已保存在检查点，重新运行即可继续）: {e}")
+        finally:
+            _close_stores()
+            logger.info("=" * 60)
+
+    def fetch_shard(self, index: int, count: int):
+        """分片抓取: 只抓取第 index 片的数据源，结果写入 SHARD_DIR，不发送邮件（由 merge 统一发送）"""
+        from sharding import shard_sources, write_shard
+        sources = shard_sources(index, count)
+        logger.info(f"分片 {index + 1}/{count}: {len(sources)} 个数据源")
+        try:
+            with metrics.stage('fetch'):
+                results = self.fetcher.fetch_sources(sources, days_back=1)
+            path = write_shard(Config.SHARD_DIR, index, count, results, self.subscribers.keywords, days_back=1)
+            logger.info(f"分片结果已写入 {path}（{sum(len(p) for p in results.values() if p)} 篇论文）")
+        finally:
+            _close_stores()
+
+    def merge(self, paths=None):
+        """合并各分片的结果，之后与 run() 相同: 跨源去重、排序，按订阅者发送"""
+        from sharding import find_shards, load_shards
+        logger.info("=" * 60)
+        try:
+            results, days_back = load_shards(paths or find_shards(Config.SHARD_DIR), self.subscribers.keywords)
+            with metrics.stage('merge'):
+                papers = self.fetcher.combine(results, days_back)
+            self.fetcher.record_failures(results)
+            with metrics.stage('deliver'):
+                self.deliver(papers, incomplete=self.fetcher.incomplete_sources())
+        except Exception as e:
+            metrics.inc('run_errors')
+            logger.exception(f"合并分片失败: {e}")
+        finally:
+            _close_stores()
+        logger.info("=" * 60)
+
+    def poll(self, source):
+        """守护模式下的一次抓取: 只抓取一类数据源，只向有新论文的订阅者推送（不发送『无新论文』通知）"""
+        papers = self._fetch(f'fetch.{source}', self.fetcher.fetch_source, source)
+        if not papers:
+            logger.info(f"{source}: 没有新论文")
+            self.fetcher.commit_schedule()
+            return
+        with metrics.stage('deliver'):
+            if self.deliver(papers, skip_empty=True, incomplete=self.fetcher.incomplete_sources()):
+                self.fetcher.commit_schedule()
+
+    def deliver(self, papers, limit=None, skip_empty=False, incomplete=()) -> bool:
+        """
+        按订阅关键词分发并批量发送，按订阅者记录已收到的论文；全部发送成功（或无需发送）时返回 True
+
+        每位订阅者的论文先去掉其已收到的，再按其自己的关键词重新计算相关度，只发送前 limit 篇（默认 MAX_RESULTS，0 为不限）；
+        skip_empty 时不给没有命中论文的订阅者发送通知；incomplete 为超时或获取失败的数据源 (名称, 原因)，列在摘要开头
+        """
+        limit = Config.MAX_RESULTS if limit is None else limit
+        # 按订阅关键词分发，每位订阅者收到只含自己关键词的摘要；
+        # 排序在发送前逐位进行，内存中只保留当前订阅者的摘要与已发送摘要的论文 ID
+        sent_ids = []
+        pending = {}   # 论文 ID → 分发到、尚未收到该论文的订阅者数
+
+        def digests():
+            for sub, sub_papers in zip(self.subscribers.subscribers, self.subscribers.route(papers)):
+                sub_papers = self.fetcher.filter_unsent(sub.email, sub_papers)
+                for p in sub_papers:
+                    pending[p.id] = pending.get(p.id, 0) + 1
+                ranked = self.fetcher.rank(sub_papers, limit)
+                if ranked or not skip_empty:
+                    sent_ids.append((sub.email, tuple(p.id for p in ranked)))
+                    yield sub.email, ranked, sub.keywords
+
+        # 批量发送邮件（每篇论文的正文片段只渲染一次，各订阅者的摘要共用）
+        results = self.email_sender.send_batch(digests(), incomplete)
+        if not results:
+            logger.info("没有需要推送的订阅者")
+            return True
+
+        # 按订阅者记录: 被某位订阅者的 limit 截掉或发送失败的论文，下次运行只补发给该订阅者；
+        # 分发到的每位订阅者都已收到的论文才记为已投递
+        by_id = {p.id: p for p in papers}
+        received = {}
+        for (email, ids), ok in zip(sent_ids, results):
+            if not ok:
+                continue
+            self.fetcher.mark_sent(email, [by_id[pid] for pid in ids])
+            for pid in ids:
+                received[pid] = received.get(pid, 0) + 1
+        delivered = [p for p in papers if p.id in pending and received.get(p.id, 0) == pending[p.id]]
+        self.fetcher.mark_delivered(delivered)
+
+        sent = sum(results)
+        metrics.set('digests', sent, status='sent')
+        metrics.set('digests', len(results) - sent, status='failed')
+        metrics.set('papers_delivered', len(delivered))
+        if sent == len(results):
+            metrics.set('last_success_timestamp_seconds', time.time())
+            logger.info(f"✅ 任务完成！已向 {sent} 位订阅者发送摘要，共 {len(delivered)} 篇论文")
+        elif sent:
+            logger.error(f"部分邮件发送失败: {sent}/{len(results)} 位订阅者发送成功")
+        else:
+            logger.error("邮件发送失败")
+        return sent == len(results)
+
+
+class DigestDaemon:
+    """
+    守护模式: 常驻进程，arXiv 与期刊 RSS 按各自的周期抓取并推送
+
+    HTTP 连接池、订阅源健康记录、编译好的关键词匹配器和数据库连接在各次抓取之间保持；
+    SIGTERM / SIGINT 时等待当前任务完成后退出；SIGHUP 或 .env / 订阅者文件变化时重新加载配置，无需重启
+    """
+
+    def __init__(self):
+        self.digest = ArxivDailyDigest()
+        from scheduler import Scheduler
+        self.scheduler = Scheduler()
+        self._reload_requested = False
+        self._config_mtimes = self._mtimes()
+
+    @staticmethod
+    def _mtimes():
+        mtimes = {}
+        for path in ('.env', Config.SUBSCRIBERS_FILE):
+            if path:
+                try:
+                    mtimes[path] = os.stat(path).st_mtime
+                except OSError:
+                    mtimes[path] = None
+        return mtimes
 
+    @staticmethod
+    def _schedules():
+        from scheduler import DailySchedule, IntervalSchedule
+        return {
+            'arxiv': DailySchedule(Config.SERVE_ARXIV_TIMES),
+            'journals': IntervalSchedule(Config.SERVE_JOURNAL_INTERVAL_HOURS * 3600),
+        }
 
-def main():
+    def request_reload(self, *_):
+        self._reload_requested = True
+        self.scheduler.wake()
+
+    def _maybe_reload(self):
+        mtimes = self._mtimes()
+        if not self._reload_requested and mtimes == self._config_mtimes:
+            return
+        self._reload_requested = False
+        self._config_mtimes = mtimes
+        # 各存储的路径按当前配置解析: 先在原路径下保存并关闭，重新加载后下次使用时按新路径打开
+        _close_stores()
+        try:
+            Config.reload()
+            Config.validate()
+            digest = ArxivDailyDigest()
+            schedules = self._schedules()
+        except Exception as e:
+            logger.error(f"重新加载配置失败，继续使用原配置: {e}")
+            return
+        self.digest = digest
+        now = time.time()
+        for job in self.scheduler.jobs:
+            schedule = schedules[job.name]
+            if str(schedule) != str(job.schedule):
+                job.schedule = schedule
+                job.next_run = schedule.next_after(now)
+                logger.info(f"调度任务 {job.name}: {schedule}")
+        metrics.inc('config_reloads')
+        logger.info(f"配置已重新加载: {len(digest.subscribers.subscribers)} 位订阅者")
+
+    def _poll(self, source):
+        try:
+            self.digest.poll(source)
+        finally:
+            from http_client import http_client
+            http_client.close()   # 保存订阅源健康记录
+            _save_schedule()
+            try:
+                metrics.write_report(name='serve')
+            except OSError as e:
+                logger.warning(f"写入运行报告失败: {e}")
+
+    def run(self):
+        import signal
+        signal.signal(signal.SIGTERM, lambda *_: self.scheduler.stop())
+        signal.signal(signal.SIGINT, lambda *_: self.scheduler.stop())
+        if hasattr(signal, 'SIGHUP'):
+            signal.signal(signal.SIGHUP, self.request_reload)
+
+        for name, schedule in self._schedules().items():
+            self.scheduler.add(name, schedule, lambda source=name: self._poll(source))
+        logger.info("守护模式已启动（SIGTERM 退出，SIGHUP 重新加载配置）")
+        try:
+            self.scheduler.run(on_wake=self._maybe_reload)
+        finally:
+            _close_stores()
+            logger.info("守护模式已退出")
+
+
+def _parse_date(value: str) -> date:
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"日期格式应为 YYYY-MM-DD: {value}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="arXiv + 期刊论文每日摘要")
+    profile_help = '对整次运行做 cProfile + tracemalloc 分析，结果写入运行报告（REPORT_DIR）'
+    parser.add_argument('--profile', action='store_true', help=profile_help)
+    sub = parser.add_subparsers(dest='command')
+    run = sub.add_parser('run', help='抓取最近 24 小时的论文并发送摘要（默认）')
+    # 子命令中的 --profile 不设默认值，以免覆盖写在子命令之前的 --profile
+    run.add_argument('--profile', action='store_true', default=argparse.SUPPRESS, help=profile_help)
+
+    serve = sub.add_parser('serve', help='守护模式: 常驻运行，arXiv 与期刊按各自的周期抓取并推送')
+    serve.add_argument('--profile', action='store_true', default=argparse.SUPPRESS, help=profile_help)
+
+    backfill = sub.add_parser('backfill', help='通过 arXiv OAI-PMH 回填一段日期内的论文')
+    backfill.add_argument('--from', dest='start', type=_parse_date, help='起始日期 YYYY-MM-DD')
+    backfill.add_argument('--until', dest='end', type=_parse_date, help='结束日期 YYYY-MM-DD（默认今天）')
+    backfill.add_argument('--days', type=int, help='回填最近 N 天（代替 --from）')
+    backfill.add_argument('--categories', help='逗号分隔的 arXiv 分类，默认为配置的 ARXIV_CATEGORIES')
+    backfill.add_argument('--restart', action='store_true', help='忽略检查点，从头收割')
+    backfill.add_argument('--dry-run', action='store_true', help='只列出论文，不发送邮件、不记录投递')
+    backfill.add_argument('--profile', action='store_true', default=argparse.SUPPRESS, help=profile_help)
+
+    shard = sub.add_parser('shard', help='分片抓取: 只抓取第 INDEX 片数据源，结果写入 SHARD_DIR，不发送')
+    shard.add_argument('--index', type=int, required=True, help='分片编号，从 0 开始')
+    shard.add_argument('--count', type=int, required=True, help='分片总数')
+    shard.add_argument('--profile', action='store_true', default=argparse.SUPPRESS, help=profile_help)
+
+    merge = sub.add_parser('merge', help='合并各分片的结果，去重、排序后发送摘要')
+    merge.add_argument('paths', nargs='*', help='分片结果文件，默认为 SHARD_DIR 下的全部分片')
+    merge.add_argument('--profile', action='store_true', default=argparse.SUPPRESS, help=profile_help)
+
+    sub.add_parser('validate', help='检查配置（邮箱、订阅者文件、守护模式调度）后退出，出错时返回非零状态')
+
+    search = sub.add_parser('search', help='在本地论文档案中全文检索（BM25 排序）')
+    search.add_argument('query', help='检索词，如 "Rydberg blockade"；支持 AND / OR / NOT、"短语" 和前缀 rydb*')
+    search.add_argument('--from', dest='start', type=_parse_date, help='发布日期起 YYYY-MM-DD')
+    search.add_argument('--until', dest='end', type=_parse_date, help='发布日期止 YYYY-MM-DD')
+    search.add_argument('--days', type=int, help='最近 N 天（代替 --from）')
+    search.add_argument('--category', action='append', default=[],
+                        help='arXiv 分类，可重复；physics 匹配 physics.* 所有子类')
+    search.add_argument('--source', action='append', default=[], help='来源: arXiv 或期刊名（如 PRL），可重复')
+    search.add_argument('--limit', type=int, default=20)
+    return parser
+
+
+def search(args):
+    """检索本地档案并打印结果"""
+    from paper_archive import paper_archive
+    if not paper_archive.enabled:
+        logger.error("未启用论文档案（ARCHIVE_DB_PATH 为空）")
+        return
+    since = args.start
+    if args.days:
+        since = (args.end or date.today()) - timedelta(days=args.days - 1)
+    started = time.perf_counter()
+    hits = paper_archive.search(args.query, limit=args.limit, since=since, until=args.end,
+                                categories=args.category, sources=args.source)
+    elapsed = (time.perf_counter() - started) * 1000
+    for rank, hit in enumerate(hits, 1):
+        paper = hit.paper
+        print(f"{rank:>3}. [{hit.score:5.1f}] {paper.published[:10]}  "
+              f"{paper.source or paper.primary_category}  {paper.title}")
+        print(f"     {paper.arxiv_url}")
+    print(f"共 {len(hits)} 条结果（档案 {paper_archive.count()} 篇，检索耗时 {elapsed:.1f} ms）")
+    paper_archive.close()
+
+
+def validate() -> bool:
+    """检查配置并打印摘要，不导入抓取 / 发信模块"""
+    from scheduler import DailySchedule
+    from subscribers import load_subscribers
     try:
         Config.validate()
-    except ValueError as e:
+        subscribers = load_subscribers()
+        schedule = DailySchedule(Config.SERVE_ARXIV_TIMES)
+        if Config.SERVE_JOURNAL_INTERVAL_HOURS <= 0:
+            raise ValueError("SERVE_JOURNAL_INTERVAL_HOURS 必须大于 0")
+    except (OSError, ValueError) as e:
         logger.error(f"配置错误: {e}")
+        return False
+    keywords = {kw for sub in subscribers for kw in sub.keywords}
+    print(f"发件人: {Config.EMAIL_SENDER}")
+    print(f"订阅者: {len(subscribers)} 位，关键词 {len(keywords)} 个，每份摘要最多 {Config.MAX_RESULTS} 篇")
+    print(f"缓存目录: {Config.CACHE_DIR}，运行报告: {Config.REPORT_DIR or '（不写入）'}")
+    print(f"守护模式: arXiv {schedule}，期刊每 {Config.SERVE_JOURNAL_INTERVAL_HOURS:g} 小时")
+    return True
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    command = args.command or 'run'
+
+    if command == 'search':
+        search(args)
         return
 
-    digest = ArxivDailyDigest()
+    if command == 'validate':
+        if not validate():
+            raise SystemExit(1)
+        return
+
+    if command == 'backfill':
+        end = args.end or date.today()
+        if args.days:
+            start = end - timedelta(days=args.days - 1)
+        elif args.start:
+            start = args.start
+        else:
+            logger.error("backfill 需要 --from 或 --days")
+            return
+        if start > end:
+            logger.error(f"起始日期 {start} 晚于结束日期 {end}")
+            return
+
+    if command == 'shard' and not 0 <= args.index < args.count:
+        logger.error(f"分片编号应满足 0 ≤ INDEX < COUNT，实际为 {args.index}/{args.count}")
+        raise SystemExit(2)
 
-    if os.getenv('GITHUB_ACTIONS') == 'true' or os.getenv('RUN_MODE') == 'ci':
-        logger.info("CI/CD 环境，单次运行模式")
-    else:
-        logger.info("本地环境，单次运行模式")
+    # 分片抓取不发送邮件，无需邮箱配置
+    if not (command == 'backfill' and args.dry_run) and command != 'shard':
+        try:
+            Config.validate()
+        except ValueError as e:
+            logger.error(f"配置错误: {e}")
+            return
+
+    if args.profile:
+        from profiler import Profiler
+        metrics.profiler = Profiler()
+        metrics.profiler.start()
+    try:
+        with metrics.stage('total'):
+            if command == 'serve':
+                DigestDaemon().run()
+                return
+
+            digest = ArxivDailyDigest()
+
+            if command == 'shard':
+                digest.fetch_shard(args.index, args.count)
+                return
 
-    digest.run()
-    logger.info("任务执行完毕")
+            if command == 'merge':
+                digest.merge(args.paths)
+                return
+
+            if command == 'backfill':
+                categories = [c.strip() for c in args.categories.split(',')] if args.categories else None
+                digest.backfill(start, end, categories, resume=not args.restart, dry_run=args.dry_run)
+                logger.info("回填执行完毕")
+                return
+
+            if os.getenv('GITHUB_ACTIONS') == 'true' or os.getenv('RUN_MODE') == 'ci':
+                logger.info("CI/CD 环境，单次运行模式")
+            else:
+                logger.info("本地环境，单次运行模式")
+
+            digest.run()
+            logger.info("任务执行完毕")
+    finally:
+        if metrics.profiler is not None:
+            metrics.profiler.stop()
+        # 各环节耗时 / 计数写入 REPORT_DIR（工作流将其作为 artifact 上传）
+        try:
+            metrics.write_report(name=command)
+        except OSError as e:
+            logger.warning(f"写入运行报告失败: {e}")
 
 
 if __name__ == "__main__":
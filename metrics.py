@@ -0,0 +1,211 @@
+"""
+运行指标 — 计数器、计时器（直方图），运行结束时导出 JSON 报告与 Prometheus textfile
+
+用法:
+    with metrics.timer('feed_fetch', feed='PRL'):
+        ...
+    metrics.inc('feed_bytes', len(content), feed='PRL')
+
+- 所有抓取线程共享一个 metrics 实例，记录只需一次加锁
+- 计时器为直方图（秒），报告中给出次数、总和、最大值与各分桶计数
+- --profile 时由 profiler.Profiler 做 cProfile / tracemalloc 分析（见 profiler.py），结果并入报告
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+import logging
+
+from config import Config
+
+logger = logging.getLogger(__name__)
+
+METRIC_PREFIX = 'arxiv_digest_'
+
+# 计时器直方图分桶上界（秒）
+TIME_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+_LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, object]) -> _LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _format_labels(key: _LabelKey, extra: str = '') -> str:
+    parts = [f'{k}="{_escape(v)}"' for k, v in key]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+class _Histogram:
+    __slots__ = ('count', 'sum', 'max', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(TIME_BUCKETS)
+
+    def observe(self, value: float):
+        self.count += 1
+        self.sum += value
+        if value > self.max:
+            self.max = value
+        for i, bound in enumerate(TIME_BUCKETS):
+            if value <= bound:
+                self.buckets[i] += 1
+                break
+
+
+class CallTimer:
+    """包装逐条调用的热路径函数（如关键词预过滤），累计耗时与调用次数，由调用方结束时一次性记录"""
+    __slots__ = ('fn', 'elapsed', 'calls')
+
+    def __init__(self, fn):
+        self.fn = fn
+        self.elapsed = 0.0
+        self.calls = 0
+
+    def __call__(self, *args):
+        start = time.perf_counter()
+        try:
+            return self.fn(*args)
+        finally:
+            self.elapsed += time.perf_counter() - start
+            self.calls += 1
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.counters: Dict[str, Dict[_LabelKey, float]] = {}
+            self.gauges: Dict[str, Dict[_LabelKey, float]] = {}
+            self.timers: Dict[str, Dict[_LabelKey, _Histogram]] = {}
+            self.started_at = time.time()
+        self.profiler = None      # profiler.Profiler，--profile 时设置
+
+    def inc(self, name: str, value: float = 1, **labels):
+        """计数器加 value"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels):
+        """设置仪表值（如论文数、最后成功时间）"""
+        with self._lock:
+            self.gauges.setdefault(name, {})[_label_key(labels)] = value
+
+    def observe(self, name: str, seconds: float, **labels):
+        """记录一次耗时"""
+        key = _label_key(labels)
+        with self._lock:
+            series = self.timers.setdefault(name, {})
+            hist = series.get(key)
+            if hist is None:
+                hist = series[key] = _Histogram()
+            hist.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels) -> Iterator[None]:
+        """计时一段代码，异常时也记录"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """运行中的主要环节: 计时，--profile 时另记录内存快照"""
+        with self.timer('stage', stage=name):
+            yield
+        if self.profiler is not None:
+            self.profiler.snapshot(name)
+
+    # ========================
+    # 导出
+    # ========================
+    def to_dict(self) -> dict:
+        import platform
+        with self._lock:
+            report = {
+                'started_at': self.started_at,
+                'duration_s': time.time() - self.started_at,
+                'python': platform.python_version(),
+                'counters': {name: [{'labels': dict(k), 'value': v} for k, v in series.items()]
+                             for name, series in self.counters.items()},
+                'gauges': {name: [{'labels': dict(k), 'value': v} for k, v in series.items()]
+                           for name, series in self.gauges.items()},
+                'timers': {name: [{'labels': dict(k), 'count': h.count, 'sum_s': h.sum, 'max_s': h.max,
+                                   'buckets': dict(zip(map(str, TIME_BUCKETS), h.buckets))}
+                                  for k, h in series.items()]
+                           for name, series in self.timers.items()},
+            }
+        if self.profiler is not None:
+            report['profile'] = self.profiler.to_dict()
+        return report
+
+    def to_prometheus(self) -> str:
+        """Prometheus 文本格式（node_exporter textfile collector 可直接读取）"""
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                metric = f"{METRIC_PREFIX}{name}_total"
+                lines.append(f"# TYPE {metric} counter")
+                lines.extend(f"{metric}{_format_labels(k)} {_number(v)}" for k, v in series.items())
+            for name, series in sorted(self.gauges.items()):
+                metric = METRIC_PREFIX + name
+                lines.append(f"# TYPE {metric} gauge")
+                lines.extend(f"{metric}{_format_labels(k)} {_number(v)}" for k, v in series.items())
+            for name, series in sorted(self.timers.items()):
+                metric = f"{METRIC_PREFIX}{name}_seconds"
+                lines.append(f"# TYPE {metric} histogram")
+                for k, h in series.items():
+                    cumulative = 0
+                    for bound, n in zip(TIME_BUCKETS, h.buckets):
+                        cumulative += n
+                        le = 'le="%g"' % bound
+                        lines.append(f"{metric}_bucket{_format_labels(k, le)} {cumulative}")
+                    le = 'le="+Inf"'
+                    lines.append(f"{metric}_bucket{_format_labels(k, le)} {h.count}")
+                    lines.append(f"{metric}_sum{_format_labels(k)} {h.sum:.6f}")
+                    lines.append(f"{metric}_count{_format_labels(k)} {h.count}")
+        return '\n'.join(lines) + '\n'
+
+    def write_report(self, directory: Optional[str] = None, name: str = 'run'):
+        """写入 <name>-report.json 与 <name>.prom（先写临时文件再替换，textfile collector 不会读到半个文件）"""
+        directory = Config.REPORT_DIR if directory is None else directory
+        if not directory:
+            return
+        import json
+        os.makedirs(directory, exist_ok=True)
+        outputs = [(f"{name}-report.json", json.dumps(self.to_dict(), ensure_ascii=False, indent=2)),
+                   (f"{name}.prom", self.to_prometheus())]
+        for filename, content in outputs:
+            path = os.path.join(directory, filename)
+            with open(path + '.tmp', 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.replace(path + '.tmp', path)
+        if self.profiler is not None:
+            self.profiler.dump(os.path.join(directory, f"{name}.pstats"))
+        logger.info(f"运行报告已写入 {directory}/")
+
+
+# 全局共享的指标实例
+metrics = Metrics()
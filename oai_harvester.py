@@ -0,0 +1,296 @@
+"""
+arXiv OAI-PMH 历史回填 — ListRecords 分页收割指定日期范围的论文元数据
+
+RSS 只包含最近一次公告，回溯多天需要使用 OAI-PMH:
+- 按分类所属的 OAI set 收割（同一 set 下的多个分类只收割一次），记录在本地按分类过滤
+- 每页响应流式解析，逐条产出 Paper；resumptionToken 翻页
+- 每完成一页先把该页保留的论文追加到检查点的暂存文件，再写入 resumptionToken；中断后先重新产出暂存的论文，
+  再从上次的位置继续。收割完成后检查点保留（再次运行直接产出暂存的论文），由调用方在投递成功后 clear()
+- 请求经共享的 http_client 发出（限速、503 + Retry-After 流控等待、重试与熔断同其他订阅源）
+- OAI datestamp 是记录的最近修改日期：只指定 from、不指定 until，否则期间内提交、之后又更新版本的论文
+  会被漏掉；按提交日期的过滤由调用方完成
+"""
+import hashlib
+import io
+import json
+import os
+import re
+import threading
+import time
+from datetime import date, datetime, timezone
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from urllib.parse import urlencode
+from xml.etree.ElementTree import ParseError, iterparse
+import logging
+
+from config import Config
+from http_client import http_client
+from metrics import metrics
+from paper import Paper
+
+logger = logging.getLogger(__name__)
+
+NS_OAI = '{http://www.openarchives.org/OAI/2.0/}'
+NS_ARXIV = '{http://arxiv.org/OAI/arXiv/}'
+
+# 以 set 划分子类的 arXiv 大类；其余（physics 下的 quant-ph、cond-mat 等）均属 physics:<archive>
+_TOP_LEVEL_SETS = {'cs', 'math', 'q-bio', 'q-fin', 'stat', 'eess', 'econ'}
+
+_WS_RE = re.compile(r'\s+')
+
+OAI_FEED = 'arxiv-oai'  # 熔断与健康记录的键
+
+
+class OAIError(Exception):
+    """OAI-PMH 协议错误（badArgument、badResumptionToken 等）"""
+
+
+def oai_set(category: str) -> str:
+    """arXiv 分类 → OAI set，如 physics.atom-ph → physics:physics，quant-ph → physics:quant-ph"""
+    archive = category.split('.', 1)[0]
+    if archive in _TOP_LEVEL_SETS:
+        return archive
+    return f"physics:{archive}"
+
+
+def _squash(text: Optional[str]) -> str:
+    return _WS_RE.sub(' ', text or '').strip()
+
+
+def _parse_day(value: str) -> Optional[datetime]:
+    try:
+        return datetime.strptime(value.strip(), '%Y-%m-%d').replace(tzinfo=timezone.utc)
+    except ValueError:
+        return None
+
+
+def _record_to_paper(meta) -> Optional[Paper]:
+    """arXiv 元数据格式 (metadataPrefix=arXiv) 的 <arXiv> 元素 → Paper"""
+    arxiv_id = (meta.findtext(f'{NS_ARXIV}id') or '').strip()
+    if not arxiv_id:
+        return None
+    # created 为首个版本的提交日期
+    published = _parse_day(meta.findtext(f'{NS_ARXIV}created') or '')
+    if published is None:
+        return None
+    categories = (meta.findtext(f'{NS_ARXIV}categories') or '').split()
+    authors = []
+    for author in meta.iter(f'{NS_ARXIV}author'):
+        name = ' '.join(filter(None, (_squash(author.findtext(f'{NS_ARXIV}forenames')),
+                                      _squash(author.findtext(f'{NS_ARXIV}keyname')),
+                                      _squash(author.findtext(f'{NS_ARXIV}suffix')))))
+        if name:
+            authors.append(name)
+    return Paper.create(
+        id=arxiv_id,
+        title=_squash(meta.findtext(f'{NS_ARXIV}title')),
+        authors=authors,
+        abstract=_squash(meta.findtext(f'{NS_ARXIV}abstract')),
+        pdf_url=f"https://arxiv.org/pdf/{arxiv_id}",
+        published=published,
+        primary_category=categories[0] if categories else '',
+        categories=categories,
+        arxiv_url=f"https://arxiv.org/abs/{arxiv_id}",
+        doi=_squash(meta.findtext(f'{NS_ARXIV}doi')).lower(),
+    )
+
+
+def parse_list_records(content: bytes) -> Tuple[List[Paper], Optional[str], int]:
+    """
+    流式解析一页 ListRecords 响应
+
+    Returns:
+        (论文列表, 下一页的 resumptionToken（最后一页为 None）, 本页记录总数（含已删除记录）)
+    """
+    papers: List[Paper] = []
+    token: Optional[str] = None
+    records = 0
+    try:
+        for _, elem in iterparse(io.BytesIO(content), events=('end',)):
+            tag = elem.tag
+            if tag == f'{NS_OAI}record':
+                records += 1
+                header = elem.find(f'{NS_OAI}header')
+                meta = elem.find(f'{NS_OAI}metadata/{NS_ARXIV}arXiv')
+                if meta is not None and (header is None or header.get('status') != 'deleted'):
+                    paper = _record_to_paper(meta)
+                    if paper is not None:
+                        papers.append(paper)
+                elem.clear()
+            elif tag == f'{NS_OAI}resumptionToken':
+                token = (elem.text or '').strip() or None
+            elif tag == f'{NS_OAI}error':
+                code = elem.get('code', '')
+                if code == 'noRecordsMatch':
+                    return [], None, 0
+                raise OAIError(f"{code}: {_squash(elem.text)}")
+    except ParseError as e:
+        raise OAIError(f"响应不是有效的 XML: {e}") from e
+    return papers, token, records
+
+
+class HarvestCheckpoint:
+    """
+    单个 (set, 日期范围, 过滤条件) 收割任务的进度，保存为 JSON 文件；已收割页中保留的论文暂存在同名的 JSONL 文件中
+
+    done 表示收割已完成（暂存文件即全部结果），不代表已投递；投递成功后由调用方 reset()
+    """
+
+    def __init__(self, directory: str, set_spec: str, start: date, end: date, variant: str = ''):
+        key = f"{set_spec}|{start.isoformat()}|{end.isoformat()}|{variant}"
+        name = hashlib.sha1(key.encode('utf-8')).hexdigest()[:16]
+        self.path = os.path.join(directory, f"{name}.json") if directory else ''
+        self.papers_path = os.path.join(directory, f"{name}.papers.jsonl") if directory else ''
+        self.key = key
+        self.token: Optional[str] = None
+        self.pages = 0
+        self.records = 0
+        self.done = False
+        self._load()
+
+    def _load(self):
+        if not self.path:
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('key') == self.key:
+            self.token = data.get('token')
+            self.pages = data.get('pages', 0)
+            self.records = data.get('records', 0)
+            self.done = data.get('done', False)
+
+    def staged(self) -> Iterator[Paper]:
+        """已收割的页中保留的论文（中断时写了一半的最后一行跳过，该页会重新收割）"""
+        if not self.papers_path or not self.pages:
+            return
+        try:
+            f = open(self.papers_path, 'r', encoding='utf-8')
+        except OSError:
+            return
+        with f:
+            for line in f:
+                try:
+                    yield Paper.from_dict(json.loads(line))
+                except (ValueError, TypeError, KeyError):
+                    continue
+
+    def stage(self, papers: List[Paper]):
+        """追加一页保留的论文，须在 save() 推进 resumptionToken 之前调用"""
+        if not self.papers_path or not papers:
+            return
+        os.makedirs(os.path.dirname(self.papers_path), exist_ok=True)
+        with open(self.papers_path, 'a', encoding='utf-8') as f:
+            f.writelines(json.dumps(p.to_dict(), ensure_ascii=False) + '\n' for p in papers)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def save(self):
+        if not self.path:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        data = {'key': self.key, 'token': self.token, 'pages': self.pages,
+                'records': self.records, 'done': self.done, 'updated_at': time.time()}
+        tmp = f"{self.path}.{threading.get_ident()}.tmp"
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp, self.path)
+
+    def reset(self):
+        self.token, self.pages, self.records, self.done = None, 0, 0, False
+        for path in (self.path, self.papers_path):
+            if path:
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+
+class OAIHarvester:
+    def __init__(self, base_url: Optional[str] = None, checkpoint_dir: Optional[str] = None,
+                 metadata_prefix: str = 'arXiv'):
+        self.base_url = Config.OAI_BASE_URL if base_url is None else base_url
+        self.checkpoint_dir = Config.OAI_CHECKPOINT_DIR if checkpoint_dir is None else checkpoint_dir
+        self.metadata_prefix = metadata_prefix
+        self.headers = {'User-Agent': 'Mozilla/5.0 (compatible; ArxivDigest/1.0; '
+                                      '+https://github.com/balabalabalalaba/arxiv-paper-monitor)'}
+
+    def _request(self, params: Dict[str, str]) -> bytes:
+        """发送一次 OAI-PMH 请求（503 / 429 的 Retry-After 等待与重试由 http_client 处理）"""
+        with metrics.timer('feed_fetch', feed='oai'):
+            resp = http_client.get(f"{self.base_url}?{urlencode(params)}", headers=self.headers, feed=OAI_FEED)
+        metrics.inc('feed_requests', feed='oai', status=resp.status_code)
+        metrics.inc('feed_bytes', len(resp.content), feed='oai')
+        resp.raise_for_status()
+        return resp.content
+
+    def harvest_set(self, set_spec: str, start: date, end: date, resume: bool = True,
+                    select: Optional[Callable[[Paper], Optional[Paper]]] = None,
+                    variant: str = '') -> Iterator[Paper]:
+        """
+        收割一个 set 自 start 起（OAI datestamp，按天）修改过的全部记录，逐条产出
+
+        不传 until: datestamp 是最近修改日期，[start, end] 内提交的论文若在 end 之后更新过版本，
+        其 datestamp 晚于 end。因此 end 只用于标识检查点，提交日期在 [start, end] 之外的记录由调用方剔除。
+        select 对每条记录返回要保留的论文（可修改）或 None，只有保留的论文写入检查点并产出；
+        variant 标识 select 的过滤条件，条件不同的收割使用不同的检查点。
+        每页保留的论文先写入检查点再产出，中断或投递失败后重新运行时先产出已暂存的论文，不会丢失。
+        """
+        checkpoint = HarvestCheckpoint(self.checkpoint_dir, set_spec, start, end, variant)
+        if not resume or not checkpoint.pages:
+            checkpoint.reset()   # 也清除上次在第一页保存之前中断时残留的暂存文件
+        if checkpoint.pages:
+            state = '已收割完成' if checkpoint.done else f'已完成 {checkpoint.pages} 页'
+            logger.info(f"OAI {set_spec} {start}~{end}: 从检查点继续（{state}，先产出暂存的论文）")
+            yield from checkpoint.staged()
+        if checkpoint.done:
+            return
+
+        while True:
+            if checkpoint.token:
+                # resumptionToken 是唯一参数，其余参数编码在令牌中
+                params = {'verb': 'ListRecords', 'resumptionToken': checkpoint.token}
+            else:
+                params = {'verb': 'ListRecords', 'metadataPrefix': self.metadata_prefix,
+                          'set': set_spec, 'from': start.isoformat()}
+            papers, token, records = parse_list_records(self._request(params))
+            if select is not None:
+                papers = [kept for kept in map(select, papers) if kept is not None]
+            checkpoint.stage(papers)
+
+            checkpoint.pages += 1
+            checkpoint.records += records
+            checkpoint.token = token
+            checkpoint.done = token is None
+            checkpoint.save()
+            logger.info(f"OAI {set_spec}: 第 {checkpoint.pages} 页, 累计 {checkpoint.records} 条记录")
+            yield from papers
+            if token is None:
+                return
+
+    @staticmethod
+    def _sets(categories: Iterable[str]) -> Dict[str, List[str]]:
+        sets: Dict[str, List[str]] = {}
+        for category in categories:
+            sets.setdefault(oai_set(category), []).append(category)
+        return sets
+
+    def harvest(self, categories: Iterable[str], start: date, end: date, resume: bool = True,
+                select: Optional[Callable[[Paper], Optional[Paper]]] = None,
+                variant: str = '') -> Iterator[Paper]:
+        """收割多个分类；同一 set 只请求一次，只产出属于这些分类的论文（按 ID 去重）"""
+        seen = set()
+        for set_spec, wanted in self._sets(categories).items():
+            wanted = set(wanted)
+            for paper in self.harvest_set(set_spec, start, end, resume, select, variant):
+                if paper.id in seen or wanted.isdisjoint(paper.categories):
+                    continue
+                seen.add(paper.id)
+                yield paper
+
+    def clear(self, categories: Iterable[str], start: date, end: date, variant: str = ''):
+        """删除这次收割的检查点与暂存的论文（投递成功后调用）"""
+        for set_spec in self._sets(categories):
+            HarvestCheckpoint(self.checkpoint_dir, set_spec, start, end, variant).reset()
@@ -0,0 +1,105 @@
+"""
+论文记录类型 — 所有抓取器、去重、摘要和邮件模块共用
+
+使用 __slots__ 的不可变 dataclass 取代字典:
+- 发布时间保存为 UTC 时间戳（整数秒），过滤和排序无需字符串格式化 / 解析
+- 分类、来源等高度重复的字符串做 intern，多篇论文共享同一对象
+- 小写检索文本等派生字段在首次访问时才计算
+"""
+import sys
+from dataclasses import asdict, dataclass, field, replace
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+
+def _intern_all(values) -> Tuple[str, ...]:
+    return tuple(sys.intern(v) for v in values)
+
+
+@dataclass(frozen=True, slots=True)
+class Paper:
+    id: str
+    title: str
+    authors: Tuple[str, ...]
+    abstract: str
+    pdf_url: str
+    published_ts: int                      # UTC 时间戳（秒）
+    primary_category: str
+    categories: Tuple[str, ...]
+    arxiv_url: str                         # 原文链接（期刊论文为期刊页面）
+    source: Optional[str] = None           # 期刊名；arXiv 论文为 None
+    doi: str = ''
+    arxiv_id: str = ''                     # 期刊条目中提取到的 arXiv ID
+    journal: str = ''                      # 跨源合并后对应的期刊名
+    matched_keywords: Tuple[str, ...] = ()
+    links: Tuple[Tuple[str, str], ...] = ()  # 跨源合并后的 (来源, 链接)
+    field_lengths: Tuple[int, int] = (0, 0)  # (标题词数, 摘要词数)，关键词预过滤时统计
+    keyword_tf: Tuple[Tuple[str, int, int], ...] = ()  # ((命中关键词, 标题词频, 摘要词频), ...)
+    fulltext_snippets: Tuple[Tuple[str, str], ...] = ()  # PDF 全文匹配: ((关键词, 上下文片段), ...)
+    body_length: int = 0                   # PDF 全文匹配: 正文词数
+    body_tf: Tuple[Tuple[str, int], ...] = ()  # PDF 全文匹配: ((命中关键词, 正文词频), ...)
+    score: float = 0.0                     # 相关度（BM25F），排序后填入
+    _search_text: Optional[str] = field(default=None, init=False, repr=False, compare=False)
+
+    @classmethod
+    def create(cls, *, published: datetime, primary_category: str, categories,
+               authors=(), source: Optional[str] = None, matched_keywords=(), **kwargs) -> 'Paper':
+        """由解析结果构造，负责时间戳转换和字符串 intern"""
+        return cls(
+            published_ts=int(published.timestamp()),
+            primary_category=sys.intern(primary_category),
+            categories=_intern_all(categories),
+            authors=tuple(authors),
+            source=sys.intern(source) if source else None,
+            matched_keywords=_intern_all(matched_keywords),
+            **kwargs,
+        )
+
+    @property
+    def is_arxiv(self) -> bool:
+        return self.source is None
+
+    @property
+    def published_dt(self) -> datetime:
+        return datetime.fromtimestamp(self.published_ts, tz=timezone.utc)
+
+    @property
+    def published(self) -> str:
+        """展示用的发布时间字符串"""
+        return self.published_dt.strftime('%Y-%m-%d %H:%M')
+
+    @property
+    def search_text(self) -> str:
+        """标题 + 摘要的小写文本，首次访问时计算并缓存"""
+        text = self._search_text
+        if text is None:
+            text = f"{self.title}\n{self.abstract}".lower()
+            object.__setattr__(self, '_search_text', text)
+        return text
+
+    def evolve(self, **changes) -> 'Paper':
+        """返回修改了部分字段的新记录"""
+        return replace(self, **changes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为可 JSON 序列化的字典（缓存、分片中间结果使用）"""
+        data = asdict(self)
+        del data['_search_text']
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Paper':
+        data = dict(data)
+        data.pop('_search_text', None)
+        data['authors'] = tuple(data.get('authors', ()))
+        data['categories'] = _intern_all(data.get('categories', ()))
+        data['primary_category'] = sys.intern(data['primary_category'])
+        data['matched_keywords'] = _intern_all(data.get('matched_keywords', ()))
+        data['links'] = tuple(tuple(link) for link in data.get('links', ()))
+        data['field_lengths'] = tuple(data.get('field_lengths', (0, 0)))
+        data['keyword_tf'] = tuple((sys.intern(kw), t, a) for kw, t, a in data.get('keyword_tf', ()))
+        data['fulltext_snippets'] = tuple(tuple(s) for s in data.get('fulltext_snippets', ()))
+        data['body_tf'] = tuple((sys.intern(kw), n) for kw, n in data.get('body_tf', ()))
+        if data.get('source'):
+            data['source'] = sys.intern(data['source'])
+        return cls(**data)
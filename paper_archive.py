@@ -0,0 +1,319 @@
+"""
+论文全文检索档案 — SQLite FTS5，保存抓取器解析出的每一篇论文（不论是否命中关键词）
+
+- papers 表保存论文记录，papers_fts 为外部内容 FTS5 索引（标题 / 摘要 / 作者），由触发器同步
+- 每个订阅源解析完后整批写入，一个事务完成；同一论文（arXiv ID / DOI / 标题）重复出现时只更新内容
+- search() 以 BM25 排序（标题权重高于摘要和作者），可按日期、分类、来源过滤
+- 档案默认不启用（ARCHIVE_DB_PATH 为空）；论文数超过 ARCHIVE_MAX_PAPERS 时，close() 按发布时间删除最旧的，
+  数据库文件随缓存目录跨运行保存，大小保持有界
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date, datetime, timezone
+from typing import Iterable, List, Optional, Sequence
+import logging
+
+from config import Config
+from metrics import metrics
+from paper import Paper
+from seen_store import paper_keys
+
+logger = logging.getLogger(__name__)
+
+# bm25() 的列权重，顺序与 papers_fts 的列一致: title, abstract, authors
+BM25_WEIGHTS = (10.0, 1.0, 2.0)
+
+ARXIV_SOURCE = 'arXiv'
+ARCHIVE_BATCH = 1000      # 解析 / 回填时每批写入的论文数
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    rowid INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    paper_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    authors TEXT NOT NULL,
+    abstract TEXT NOT NULL,
+    published_ts INTEGER NOT NULL,
+    primary_category TEXT NOT NULL,
+    categories TEXT NOT NULL,
+    source TEXT NOT NULL,
+    doi TEXT NOT NULL,
+    arxiv_id TEXT NOT NULL,
+    url TEXT NOT NULL,
+    pdf_url TEXT NOT NULL,
+    archived_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS papers_published ON papers (published_ts);
+CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5(
+    title, abstract, authors,
+    content='papers', content_rowid='rowid',
+    tokenize='porter unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS papers_ai AFTER INSERT ON papers BEGIN
+    INSERT INTO papers_fts (rowid, title, abstract, authors)
+    VALUES (new.rowid, new.title, new.abstract, new.authors);
+END;
+CREATE TRIGGER IF NOT EXISTS papers_ad AFTER DELETE ON papers BEGIN
+    INSERT INTO papers_fts (papers_fts, rowid, title, abstract, authors)
+    VALUES ('delete', old.rowid, old.title, old.abstract, old.authors);
+END;
+CREATE TRIGGER IF NOT EXISTS papers_au AFTER UPDATE OF title, abstract, authors ON papers BEGIN
+    INSERT INTO papers_fts (papers_fts, rowid, title, abstract, authors)
+    VALUES ('delete', old.rowid, old.title, old.abstract, old.authors);
+    INSERT INTO papers_fts (rowid, title, abstract, authors)
+    VALUES (new.rowid, new.title, new.abstract, new.authors);
+END;
+"""
+
+_AUTHOR_SEP = '; '
+_TERM_RE = re.compile(r'"([^"]*)"|(\S+)')
+_WORD_RE = re.compile(r'\w+')
+_OPERATORS = {'AND', 'OR', 'NOT'}
+
+
+def fts_query(text: str) -> str:
+    """
+    将用户输入转换为 FTS5 查询，避免连字符、冒号等被当作语法
+
+    每个词 / 双引号短语转为短语查询（Rydberg-blockade → "rydberg blockade"），
+    大写的 AND / OR / NOT 保留为运算符，词尾 * 保留为前缀查询。
+    """
+    parts = []
+    for quoted, bare in _TERM_RE.findall(text):
+        if bare in _OPERATORS:
+            parts.append(bare)
+            continue
+        words = _WORD_RE.findall(quoted or bare)
+        if not words:
+            continue
+        phrase = '"' + ' '.join(words) + '"'
+        if bare.endswith('*'):
+            phrase += '*'
+        parts.append(phrase)
+    # 运算符不能出现在开头 / 结尾或相邻
+    cleaned = []
+    for part in parts:
+        if part in _OPERATORS and (not cleaned or cleaned[-1] in _OPERATORS):
+            continue
+        cleaned.append(part)
+    while cleaned and cleaned[-1] in _OPERATORS:
+        cleaned.pop()
+    return ' '.join(cleaned)
+
+
+def _day_ts(day: date) -> int:
+    return int(datetime(day.year, day.month, day.day, tzinfo=timezone.utc).timestamp())
+
+
+@dataclass(frozen=True, slots=True)
+class SearchHit:
+    paper: Paper
+    score: float           # BM25 分数，越大越相关
+
+
+class ArchiveBuffer:
+    """
+    解析订阅源 / 回填时逐篇 append，每满 size 篇写入一个事务
+
+    内存中最多保留 size 篇，占用不随订阅源条目数或回填天数增长
+    """
+
+    def __init__(self, archive: 'PaperArchive', size: int = ARCHIVE_BATCH):
+        self.archive = archive
+        self.size = size
+        self._papers: List[Paper] = []
+
+    def append(self, paper: Paper):
+        self._papers.append(paper)
+        if len(self._papers) >= self.size:
+            self.flush()
+
+    def flush(self):
+        """写入缓冲区中剩余的论文（调用方在最后调用一次）"""
+        if self._papers:
+            self.archive.add(self._papers)
+            self._papers = []
+
+
+class PaperArchive:
+    def __init__(self, path: Optional[str] = None, max_papers: Optional[int] = None):
+        # 未指定时按当前 Config 解析，打开连接时才确定
+        self._path = path
+        self._max_papers = max_papers
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def path(self) -> str:
+        return Config.ARCHIVE_DB_PATH if self._path is None else self._path
+
+    @path.setter
+    def path(self, value: Optional[str]):
+        self._path = value
+
+    @property
+    def max_papers(self) -> int:
+        return Config.ARCHIVE_MAX_PAPERS if self._max_papers is None else self._max_papers
+
+    @max_papers.setter
+    def max_papers(self, value: Optional[int]):
+        self._max_papers = value
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.executescript(_SCHEMA)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    @staticmethod
+    def _row(paper: Paper, now: float):
+        keys = paper_keys(paper)
+        key = keys[0] if keys else 'url:' + paper.arxiv_url
+        return (key, paper.id, paper.title, _AUTHOR_SEP.join(paper.authors), paper.abstract,
+                paper.published_ts, paper.primary_category, ' '.join(paper.categories),
+                paper.source or ARXIV_SOURCE, paper.doi, paper.arxiv_id,
+                paper.arxiv_url, paper.pdf_url, now)
+
+    def add(self, papers: Iterable[Paper]) -> int:
+        """整批写入（一个事务）；已存档的论文仅在标题 / 摘要 / 作者变化时更新。返回写入的条数"""
+        if not self.enabled:
+            return 0
+        now = time.time()
+        rows = [self._row(p, now) for p in papers]
+        if not rows:
+            return 0
+        with self._lock, metrics.timer('archive_write'):
+            conn = self._connect()
+            with conn:
+                conn.executemany(
+                    "INSERT INTO papers (key, paper_id, title, authors, abstract, published_ts, "
+                    "primary_category, categories, source, doi, arxiv_id, url, pdf_url, archived_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(key) DO UPDATE SET title = excluded.title, abstract = excluded.abstract, "
+                    "authors = excluded.authors, doi = excluded.doi, arxiv_id = excluded.arxiv_id "
+                    "WHERE title != excluded.title OR abstract != excluded.abstract "
+                    "OR authors != excluded.authors OR doi != excluded.doi OR arxiv_id != excluded.arxiv_id",
+                    rows,
+                )
+        metrics.inc('archived_papers', len(rows))
+        return len(rows)
+
+    def buffer(self, size: int = ARCHIVE_BATCH) -> 'ArchiveBuffer':
+        """按批写入的缓冲区"""
+        return ArchiveBuffer(self, size)
+
+    def count(self) -> int:
+        if not self.enabled:
+            return 0
+        with self._lock:
+            return self._connect().execute("SELECT count(*) FROM papers").fetchone()[0]
+
+    def search(self, query: str, limit: int = 20, since: Optional[date] = None,
+               until: Optional[date] = None, categories: Sequence[str] = (),
+               sources: Sequence[str] = ()) -> List[SearchHit]:
+        """
+        BM25 排序的全文检索
+
+        Args:
+            query: 检索词，见 fts_query()
+            since / until: 发布日期范围（含两端）
+            categories: arXiv 分类，physics.atom-ph 精确匹配，physics 匹配其下所有子类
+            sources: 来源，arXiv 或期刊名（不区分大小写）
+        """
+        if not self.enabled:
+            return []
+        match = fts_query(query)
+        if not match:
+            return []
+        columns = ("p.paper_id, p.title, p.authors, p.abstract, p.pdf_url, p.published_ts, "
+                   "p.primary_category, p.categories, p.url, p.source, p.doi, p.arxiv_id")
+        bm25 = f"-bm25(papers_fts, {', '.join(map(str, BM25_WEIGHTS))})"
+        filters: List[str] = []
+        params: list = [match]
+        if since is not None:
+            filters.append("p.published_ts >= ?")
+            params.append(_day_ts(since))
+        if until is not None:
+            filters.append("p.published_ts < ?")
+            params.append(_day_ts(until) + 86400)
+        if categories:
+            filters.append("(" + " OR ".join(
+                "instr(' ' || p.categories || ' ', ?) > 0 OR instr(' ' || p.categories, ?) > 0"
+                for _ in categories) + ")")
+            for category in categories:
+                params.extend((f' {category} ', f' {category}.'))
+        if sources:
+            filters.append(f"lower(p.source) IN ({','.join('?' * len(sources))})")
+            params.extend(s.lower() for s in sources)
+        params.append(limit)
+
+        if filters:
+            sql = (f"SELECT {columns}, {bm25} AS score FROM papers_fts "
+                   f"JOIN papers p ON p.rowid = papers_fts.rowid "
+                   f"WHERE papers_fts MATCH ? AND {' AND '.join(filters)} ORDER BY score DESC LIMIT ?")
+        else:
+            # 无过滤条件时先在索引内取前 limit 条，只回表读取这些行
+            sql = (f"SELECT {columns}, f.score FROM (SELECT rowid, {bm25} AS score FROM papers_fts "
+                   f"WHERE papers_fts MATCH ? ORDER BY score DESC LIMIT ?) f "
+                   f"JOIN papers p ON p.rowid = f.rowid ORDER BY f.score DESC")
+
+        with self._lock:
+            rows = self._connect().execute(sql, params).fetchall()
+        return [SearchHit(self._paper(row), row[-1]) for row in rows]
+
+    @staticmethod
+    def _paper(row) -> Paper:
+        (paper_id, title, authors, abstract, pdf_url, published_ts, primary_category,
+         categories, url, source, doi, arxiv_id, _) = row
+        return Paper(
+            id=paper_id, title=title, authors=tuple(authors.split(_AUTHOR_SEP)) if authors else (),
+            abstract=abstract, pdf_url=pdf_url, published_ts=published_ts,
+            primary_category=primary_category, categories=tuple(categories.split()),
+            arxiv_url=url, source=None if source == ARXIV_SOURCE else source,
+            doi=doi, arxiv_id=arxiv_id,
+        )
+
+    def prune(self) -> int:
+        """论文数超过 max_papers 时按发布时间删除最旧的（FTS 索引由触发器同步），返回删除的条数"""
+        if not self.enabled or self.max_papers <= 0:
+            return 0
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                deleted = conn.execute(
+                    "DELETE FROM papers WHERE rowid IN (SELECT rowid FROM papers "
+                    "ORDER BY published_ts DESC, rowid DESC LIMIT -1 OFFSET ?)", (self.max_papers,)).rowcount
+        if deleted:
+            metrics.inc('archive_pruned', deleted)
+            logger.info(f"论文档案超过 {self.max_papers} 篇，删除最旧的 {deleted} 篇")
+        return deleted
+
+    def close(self):
+        """删除超出上限的旧论文，合并 WAL 后关闭，保证缓存目录中只留下一个完整的数据库文件"""
+        if self._conn is not None:
+            self.prune()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+                self._conn.close()
+                self._conn = None
+
+
+# 所有抓取器共享同一个档案实例
+paper_archive = PaperArchive()
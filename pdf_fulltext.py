@@ -0,0 +1,239 @@
+"""
+PDF 全文关键词匹配 — 标题 / 摘要之外的第二级过滤（PDF_FULLTEXT=1 启用，需要 pip install pypdf）
+
+- 候选: 标题 / 摘要未命中、但与某个多词关键词接近的 arXiv 论文（关键词的各个词都出现了、只是不相邻，
+  见 KeywordMatcher.near_misses），按接近的关键词数取前 PDF_MAX_PAPERS 篇
+- 下载: PDF_WORKERS 个线程经共享 HTTP 客户端下载（按主机限速），按 arXiv ID 保存在 PDF_CACHE_DIR
+- 提取: pypdf 为纯 Python 解析、CPU 密集，在 ProcessPoolExecutor 中并行以用满所有核心；
+  提取出的文本同样按 arXiv ID 缓存（PDF 随即删除），再次运行时不再下载、提取
+- 匹配: 对正文（参考文献之前的部分）重新做关键词匹配，命中的论文附带关键词所在的上下文片段，
+  并记录正文词数与各关键词的正文词频（相关度排序中的正文字段，见 relevance.py）
+"""
+import multiprocessing
+import os
+import re
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+
+from config import Config
+from fetch_engine import fetch_concurrently, mirror_url
+from keyword_matcher import get_matcher, tokenize
+from metrics import metrics
+from paper import Paper
+
+logger = logging.getLogger(__name__)
+
+SNIPPET_CHARS = 90       # 命中位置前后各取的字符数
+MAX_SNIPPETS = 2         # 每篇论文最多展示的片段数
+
+# 参考文献标题，之后的内容不参与匹配（被引论文的标题常含关键词）
+_REFERENCES_RE = re.compile(r'\n\s*(?:references|bibliography)\s*\n', re.IGNORECASE)
+# 行尾连字符断词，如 "Ryd-\nberg"
+_HYPHEN_BREAK_RE = re.compile(r'(\w)-[ \t]*\n\s*(\w)')
+_SPACE_RE = re.compile(r'\s+')
+
+
+def pypdf_available() -> bool:
+    try:
+        import pypdf  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def extract_text(path: str) -> str:
+    """提取 PDF 文本（在子进程中运行，须为模块级函数）；无法解析时返回空字符串"""
+    from pypdf import PdfReader
+    try:
+        reader = PdfReader(path)
+        return '\n'.join(page.extract_text() or '' for page in reader.pages)
+    except Exception:
+        return ''
+
+
+def body_text(text: str) -> str:
+    """合并行尾断词，去掉后半部分的参考文献"""
+    text = _HYPHEN_BREAK_RE.sub(r'\1\2', text)
+    refs = None
+    for refs in _REFERENCES_RE.finditer(text):
+        pass
+    if refs is not None and refs.start() > len(text) // 2:
+        text = text[:refs.start()]
+    return text
+
+
+def _keyword_pattern(keyword: str) -> re.Pattern:
+    words = [re.escape(w) + r'(?:e?s)?' for w in tokenize(keyword)]
+    return re.compile(r'\b' + r'\W+'.join(words) + r'\b', re.IGNORECASE)
+
+
+def snippets(text: str, keywords: Sequence[str], limit: int = MAX_SNIPPETS) -> Tuple[Tuple[str, str], ...]:
+    """每个关键词第一次出现位置的上下文片段: ((关键词, 片段), ...)"""
+    found = []
+    for kw in keywords:
+        m = _keyword_pattern(kw).search(text)
+        if not m:
+            continue
+        start, end = max(0, m.start() - SNIPPET_CHARS), m.end() + SNIPPET_CHARS
+        snippet = _SPACE_RE.sub(' ', text[start:end]).strip()
+        found.append((kw, ('…' if start else '') + snippet + ('…' if end < len(text) else '')))
+        if len(found) >= limit:
+            break
+    return tuple(found)
+
+
+class FullTextMatcher:
+    def __init__(self, keywords: Sequence[str], cache_dir: Optional[str] = None):
+        self.keywords = list(keywords)
+        self.matcher = get_matcher(self.keywords)
+        self.cache_dir = Config.PDF_CACHE_DIR if cache_dir is None else cache_dir
+        self.ratio = Config.PDF_NEAR_MISS_RATIO
+
+    def is_candidate(self, title: str, abstract: str) -> bool:
+        """标题 / 摘要未命中的条目是否值得下载全文"""
+        return bool(self.matcher.near_misses(f"{title}\n{abstract}", self.ratio))
+
+    @staticmethod
+    def _path(directory: str, paper: Paper, ext: str) -> str:
+        # 旧式 arXiv ID 含斜杠，如 quant-ph/0101001
+        return os.path.join(directory, paper.id.replace('/', '_') + ext)
+
+    def _download(self, paper: Paper, directory: str) -> Optional[str]:
+        """下载 PDF，返回文件路径；失败或不是 PDF 时返回 None"""
+        import requests
+        from http_client import http_client
+
+        path = self._path(directory, paper, '.pdf')
+        if os.path.exists(path):   # 上次运行下载后未及提取
+            return path
+        try:
+            with metrics.timer('pdf_download'):
+                resp = http_client.get(mirror_url(paper.pdf_url), headers={'User-Agent': 'ArxivDailyDigest/1.0'},
+                                       track=False)
+            resp.raise_for_status()
+        except requests.RequestException as e:
+            logger.warning(f"  下载 PDF {paper.id} 失败: {e}")
+            return None
+        data = resp.content
+        if not data.startswith(b'%PDF') or len(data) > Config.PDF_MAX_MB * 1024 * 1024:
+            logger.warning(f"  {paper.id}: 响应不是 PDF 或超过 {Config.PDF_MAX_MB} MB，跳过")
+            return None
+        metrics.inc('pdf_downloads')
+        metrics.inc('pdf_bytes', len(data))
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, 'wb') as f:
+            f.write(data)
+        os.replace(tmp, path)
+        return path
+
+    def _texts(self, papers: Sequence[Paper], directory: str) -> Dict[str, str]:
+        """arXiv ID → 全文；先查文本缓存，其余并发下载后在进程池中提取"""
+        texts = {}
+        missing = []
+        for paper in papers:
+            path = self._path(directory, paper, '.txt')
+            try:
+                with open(path, 'r', encoding='utf-8') as f:
+                    texts[paper.id] = f.read()
+                os.utime(path)   # 按最近使用时间淘汰
+                metrics.inc('pdf_cache_hits')
+            except OSError:
+                missing.append(paper)
+
+        paths = fetch_concurrently(missing, lambda p: self._download(p, directory), max_workers=Config.PDF_WORKERS)
+        pending = [(paper, path) for paper, path in zip(missing, paths) if path]
+        if not pending:
+            return texts
+
+        # 抓取在多个线程中进行，fork 可能复制其他线程持有的锁，子进程改用 spawn 启动
+        workers = min(len(pending), os.cpu_count() or 1)
+        with metrics.timer('pdf_extract'), ProcessPoolExecutor(
+                max_workers=workers, mp_context=multiprocessing.get_context('spawn')) as pool:
+            extracted = list(pool.map(extract_text, [path for _, path in pending]))
+
+        for (paper, path), text in zip(pending, extracted):
+            texts[paper.id] = text
+            if not text:
+                logger.warning(f"  {paper.id}: 无法从 PDF 提取文本")
+            # 文本为空也写入，无法解析的 PDF 不再重复下载
+            target = self._path(directory, paper, '.txt')
+            tmp = f"{target}.{threading.get_ident()}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(tmp, target)
+            os.remove(path)
+        return texts
+
+    def evict(self):
+        """缓存总大小超过 PDF_CACHE_MAX_MB 时，按最近使用时间删除最旧的文件"""
+        try:
+            names = os.listdir(self.cache_dir)
+        except OSError:
+            return
+        files = []
+        total = 0
+        for name in names:
+            path = os.path.join(self.cache_dir, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            files.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+
+        max_bytes = Config.PDF_CACHE_MAX_MB * 1024 * 1024
+        for _, size, path in sorted(files):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+
+    def match(self, papers: Sequence[Paper]) -> List[Paper]:
+        """
+        对候选论文做全文匹配
+
+        Returns:
+            全文命中的论文，matched_keywords 为全文中命中的关键词，fulltext_snippets 为上下文片段，
+            body_length / body_tf 为正文词数与各关键词的正文词频
+        """
+        papers = [p for p in papers if p.pdf_url]
+        if not papers:
+            return []
+        if not pypdf_available():
+            logger.warning("未安装 pypdf，跳过 PDF 全文匹配（pip install pypdf）")
+            return []
+
+        closeness = {p.id: len(self.matcher.near_misses(p.search_text, self.ratio)) for p in papers}
+        selected = sorted(papers, key=lambda p: (closeness[p.id], p.published_ts),
+                          reverse=True)[:Config.PDF_MAX_PAPERS]
+        logger.info(f"PDF 全文匹配: {len(papers)} 篇候选，检查其中 {len(selected)} 篇")
+
+        with metrics.timer('fulltext'):
+            if self.cache_dir:
+                os.makedirs(self.cache_dir, exist_ok=True)
+                texts = self._texts(selected, self.cache_dir)
+                self.evict()
+            else:
+                with tempfile.TemporaryDirectory() as tmp:
+                    texts = self._texts(selected, tmp)
+
+        rescued = []
+        for paper in selected:
+            text = body_text(texts.get(paper.id, ''))
+            tokens = tokenize(text)
+            counts = self.matcher.count_tokens(tokens)
+            if not counts:
+                continue
+            body_tf = tuple((self.matcher.keywords[kid], n) for kid, n in sorted(counts.items()))
+            hits = [kw for kw, _ in body_tf]
+            rescued.append(paper.evolve(matched_keywords=tuple(hits), fulltext_snippets=snippets(text, hits),
+                                        body_length=len(tokens), body_tf=body_tf))
+            logger.info(f"📄 全文命中: {paper.title[:80]}... ({', '.join(hits)})")
+        metrics.inc('pdf_fulltext_hits', len(rescued))
+        return rescued
@@ -0,0 +1,96 @@
+"""
+性能分析（main.py --profile）— cProfile 覆盖主线程与之后启动的抓取线程，
+各主要环节（metrics.stage）结束时记录 tracemalloc 快照: 内存占用、峰值与新增内存最多的代码位置
+
+只在 --profile 时导入，平时不加载 cProfile / tracemalloc。
+"""
+import cProfile
+import io
+import pstats
+import re
+import sys
+import threading
+import tracemalloc
+from typing import List, Optional
+
+
+class Profiler:
+    """cProfile（主线程 + 之后启动的线程）+ 各环节结束时的 tracemalloc 快照"""
+
+    def __init__(self, top: int = 10):
+        self.top = top
+        self._profiles: List[cProfile.Profile] = []
+        self._lock = threading.Lock()
+        self._snapshot: Optional[tracemalloc.Snapshot] = None
+        self.stages: List[dict] = []
+
+    def _start_thread_profile(self, *_):
+        # threading.setprofile 的钩子在每个新线程开始时调用一次，随即由该线程自己的 cProfile 取代
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError:   # Python 3.12+ 同一时间只允许一个 cProfile
+            sys.setprofile(None)
+            return
+        with self._lock:
+            self._profiles.append(profile)
+
+    def start(self):
+        tracemalloc.start(10)
+        self._snapshot = tracemalloc.take_snapshot()
+        main = cProfile.Profile()
+        self._profiles.append(main)
+        threading.setprofile(self._start_thread_profile)
+        main.enable()
+
+    def stop(self):
+        self._profiles[0].disable()
+        threading.setprofile(None)
+
+    def snapshot(self, stage: str):
+        """记录环节结束时的内存占用与峰值，以及相对上一快照新增最多的代码位置"""
+        if not tracemalloc.is_tracing():
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        snapshot = tracemalloc.take_snapshot().filter_traces(
+            (tracemalloc.Filter(False, tracemalloc.__file__),))
+        top = snapshot.compare_to(self._snapshot, 'lineno')[:self.top] if self._snapshot else []
+        self._snapshot = snapshot
+        self.stages.append({
+            'stage': stage,
+            'current_kb': current // 1024,
+            'peak_kb': peak // 1024,
+            'top_allocations': [{'where': str(stat.traceback[0]), 'size_diff_kb': stat.size_diff // 1024,
+                                 'count_diff': stat.count_diff} for stat in top],
+        })
+
+    def _stats(self) -> Optional[pstats.Stats]:
+        stats = None
+        with self._lock:
+            profiles = list(self._profiles)
+        for profile in profiles:
+            profile.create_stats()
+            if not profile.stats:
+                continue
+            if stats is None:
+                stats = pstats.Stats(profile)
+            else:
+                stats.add(profile)
+        return stats
+
+    def to_dict(self) -> dict:
+        report = {'memory': self.stages}
+        stats = self._stats()
+        if stats is not None:
+            out = io.StringIO()
+            stats.stream = out
+            stats.sort_stats('cumulative').print_stats(30)
+            # 去掉 pstats 输出中冗长的绝对路径前缀
+            report['cumulative_top'] = re.sub(r'\S*[/\\](?=[^/\\\s]+\.py:)', '', out.getvalue())
+        return report
+
+    def dump(self, path: str):
+        stats = self._stats()
+        if stats is not None:
+            stats.dump_stats(path)
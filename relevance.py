@@ -0,0 +1,92 @@
+"""
+相关度排序 — 以命中的订阅关键词为查询，对候选论文做 BM25F 打分
+
+- 每个关键词（含多词短语）视为一个查询项，标题与摘要的词频分别按字段长度归一化后加权求和，
+  标题命中的权重高于摘要（BM25F）
+- PDF 全文匹配找回的论文另有正文字段（Paper.body_tf / body_length），权重最低；
+  这类论文的关键词只出现在正文中，没有正文字段时分数为 0，会在按订阅者截取前 N 篇时被挤掉
+- 词频与字段长度在解析时的关键词预过滤中已随分词一并统计（Paper.keyword_tf / field_lengths），
+  打分只做算术运算；缺少统计的论文（旧缓存等）在此补算
+- 打分按列进行: 先得到每个关键词的稀疏列 (论文序号, 标题词频, 摘要词频)，
+  再逐列把贡献累加到分数数组中；IDF 取自本批候选
+- 每篇论文只按自己的 matched_keywords 计分，按订阅者分发后的论文即按该订阅者的关键词计分
+- 分数相同时较新的论文在前
+"""
+import math
+from array import array
+from typing import Dict, List, Sequence, Tuple
+
+from keyword_matcher import get_matcher
+from paper import Paper
+
+TITLE_WEIGHT = 3.0
+ABSTRACT_WEIGHT = 1.0
+BODY_WEIGHT = 0.3  # 正文很长，命中的信息量低于摘要
+K1 = 1.2
+B_TITLE = 0.5      # 标题长度差异小，长度归一化弱一些
+B_ABSTRACT = 0.75
+B_BODY = 0.75
+
+
+def _field_stats(papers: Sequence[Paper]):
+    """每篇论文的 (field_lengths, keyword_tf)，缺少统计的论文用本批关键词的并集补算"""
+    stats = []
+    missing = [p for p in papers if p.matched_keywords and not p.keyword_tf and not p.body_tf]
+    matcher = get_matcher(sorted({kw for p in missing for kw in p.matched_keywords})) if missing else None
+    for paper in papers:
+        if paper.keyword_tf or paper.body_tf or not paper.matched_keywords:
+            stats.append((paper.field_lengths, paper.keyword_tf))
+        else:
+            stats.append(matcher.count_fields(paper.title, paper.abstract))
+    return stats
+
+
+def score_papers(papers: Sequence[Paper]) -> array:
+    """返回与 papers 一一对应的 BM25F 分数"""
+    n = len(papers)
+    scores = array('d', bytes(8 * n))
+    if not n:
+        return scores
+
+    stats = _field_stats(papers)
+    title_len = array('d', (lengths[0] for lengths, _ in stats))
+    abstract_len = array('d', (lengths[1] for lengths, _ in stats))
+    avg_title = (sum(title_len) / n) or 1.0
+    avg_abstract = (sum(abstract_len) / n) or 1.0
+    # 只有全文匹配找回的论文有正文字段，平均长度只在这些论文中计算
+    body_len = array('d', (p.body_length for p in papers))
+    with_body = sum(1 for length in body_len if length)
+    avg_body = (sum(body_len) / with_body) if with_body else 1.0
+
+    # 稀疏列: 关键词 → [(论文序号, 标题词频, 摘要词频, 正文词频)]，只计入论文自己的 matched_keywords
+    postings: Dict[str, List[Tuple[int, int, int, int]]] = {}
+    for i, (paper, (_, keyword_tf)) in enumerate(zip(papers, stats)):
+        wanted = paper.matched_keywords
+        body = dict(paper.body_tf) if paper.body_tf else None
+        for kw, tf_title, tf_abstract in keyword_tf:
+            if kw in wanted:
+                postings.setdefault(kw, []).append((i, tf_title, tf_abstract, body.pop(kw, 0) if body else 0))
+        if body:
+            for kw, tf_body in body.items():
+                if kw in wanted:
+                    postings.setdefault(kw, []).append((i, 0, 0, tf_body))
+
+    for column in postings.values():
+        df = len(column)
+        idf = math.log(1 + (n - df + 0.5) / (df + 0.5))
+        for i, tf_title, tf_abstract, tf_body in column:
+            tf = (TITLE_WEIGHT * tf_title / (1 - B_TITLE + B_TITLE * title_len[i] / avg_title)
+                  + ABSTRACT_WEIGHT * tf_abstract / (1 - B_ABSTRACT + B_ABSTRACT * abstract_len[i] / avg_abstract))
+            if tf_body:
+                tf += BODY_WEIGHT * tf_body / (1 - B_BODY + B_BODY * body_len[i] / avg_body)
+            scores[i] += idf * tf * (K1 + 1) / (tf + K1)
+    return scores
+
+
+def rank_papers(papers: Sequence[Paper], limit: int = 0) -> List[Paper]:
+    """按相关度从高到低排序并填入 score，limit > 0 时只保留前 limit 篇"""
+    scores = score_papers(papers)
+    order = sorted(range(len(papers)), key=lambda i: (scores[i], papers[i].published_ts), reverse=True)
+    if limit > 0:
+        order = order[:limit]
+    return [papers[i].evolve(score=round(scores[i], 2)) for i in order]
@@ -0,0 +1,115 @@
+"""
+进程内调度器 — 守护模式（main.py serve）下按各数据源自己的周期运行抓取任务
+
+- DailySchedule: 每天固定的 UTC 时刻（如 arXiv 公告发布之后）
+- IntervalSchedule: 固定间隔（如期刊 RSS 每隔几小时）
+- 任务在主线程中依次执行；stop() 后等待当前任务结束再退出，不会中断正在发送的邮件
+- wake() 提前唤醒调度循环（如收到 SIGHUP 需要重新加载配置）
+"""
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Callable, List, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class DailySchedule:
+    """每天在给定的 UTC 时刻运行，times 为 "HH:MM" 列表"""
+
+    def __init__(self, times: Sequence[str]):
+        self.times: List[Tuple[int, int]] = sorted(
+            (int(h), int(m)) for h, m in (t.strip().split(':') for t in times if t.strip()))
+        if not self.times:
+            raise ValueError("DailySchedule 至少需要一个时刻")
+
+    def next_after(self, ts: float) -> float:
+        now = datetime.fromtimestamp(ts, timezone.utc)
+        for days in (0, 1):
+            day = now.date() + timedelta(days=days)
+            for hour, minute in self.times:
+                at = datetime(day.year, day.month, day.day, hour, minute, tzinfo=timezone.utc)
+                if at > now:
+                    return at.timestamp()
+        raise AssertionError("unreachable")
+
+    def __str__(self):
+        return '每天 ' + ', '.join(f"{h:02d}:{m:02d}" for h, m in self.times) + ' UTC'
+
+
+class IntervalSchedule:
+    """每隔 seconds 秒运行一次"""
+
+    def __init__(self, seconds: float):
+        if seconds <= 0:
+            raise ValueError("间隔必须大于 0")
+        self.seconds = seconds
+
+    def next_after(self, ts: float) -> float:
+        return ts + self.seconds
+
+    def __str__(self):
+        return f"每 {self.seconds / 3600:g} 小时"
+
+
+@dataclass
+class Job:
+    name: str
+    schedule: object          # DailySchedule / IntervalSchedule
+    func: Callable[[], None]
+    next_run: float = 0.0     # 0 表示启动后立即运行一次
+    runs: int = field(default=0)
+
+
+class Scheduler:
+    def __init__(self, poll_interval: float = 60.0):
+        self.jobs: List[Job] = []
+        self.poll_interval = poll_interval   # 无任务到期时的最长等待，期间检查 on_wake 回调
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+
+    def add(self, name: str, schedule, func: Callable[[], None], run_now: bool = True):
+        next_run = 0.0 if run_now else schedule.next_after(time.time())
+        self.jobs.append(Job(name, schedule, func, next_run))
+        logger.info(f"调度任务 {name}: {schedule}")
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def wake(self):
+        self._wake.set()
+
+    @property
+    def stopping(self) -> bool:
+        return self._stop.is_set()
+
+    def run(self, on_wake: Optional[Callable[[], None]] = None):
+        """运行直到 stop()；每次唤醒（到期、轮询或 wake()）时先调用 on_wake，再依次执行到期的任务"""
+        while not self._stop.is_set():
+            if on_wake is not None:
+                on_wake()
+            now = time.time()
+            for job in self.jobs:
+                if self._stop.is_set():
+                    break
+                if job.next_run > now:
+                    continue
+                logger.info(f"▶ 运行任务 {job.name}")
+                started = time.perf_counter()
+                try:
+                    job.func()
+                except Exception as e:
+                    logger.exception(f"任务 {job.name} 失败: {e}")
+                job.runs += 1
+                job.next_run = job.schedule.next_after(time.time())
+                logger.info(f"任务 {job.name} 完成，用时 {time.perf_counter() - started:.1f}s，下次运行 "
+                            f"{datetime.fromtimestamp(job.next_run, timezone.utc):%Y-%m-%d %H:%M} UTC")
+            if self._stop.is_set() or not self.jobs:
+                break
+            wait = min(job.next_run for job in self.jobs) - time.time()
+            if wait > 0:
+                self._wake.wait(min(wait, self.poll_interval))
+                self._wake.clear()
@@ -0,0 +1,181 @@
+"""
+已见论文存储 — SQLite (WAL)，以 arXiv ID / DOI / 归一化标题为键
+记录每篇论文首次出现和投递的时间，保证每篇论文只推送一次
+
+投递按订阅者记录（deliveries 表）: 论文被某位订阅者的 limit 截掉、或该订阅者的邮件发送失败时，
+不影响其他订阅者，下次运行只补发给尚未收到的订阅者。分发到的每位订阅者都已收到的论文在 seen_papers
+中记为已投递，抓取阶段即可跳过。
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Iterable, List, Optional
+import logging
+
+from config import Config
+from dedup import normalize_title
+from paper import Paper
+
+logger = logging.getLogger(__name__)
+
+_ARXIV_VERSION_RE = re.compile(r'v\d+$')
+
+
+def arxiv_key(arxiv_id: str) -> str:
+    return 'arxiv:' + _ARXIV_VERSION_RE.sub('', arxiv_id.strip())
+
+
+def paper_keys(paper: Paper) -> List[str]:
+    """一篇论文的所有身份键，任一键已投递即视为已推送"""
+    keys = []
+    # 期刊论文的 id 为链接；arXiv 论文的 id 为 arXiv 编号
+    if paper.is_arxiv and paper.id:
+        keys.append(arxiv_key(paper.id))
+    elif paper.arxiv_id:
+        keys.append(arxiv_key(paper.arxiv_id))
+    if paper.doi:
+        keys.append('doi:' + paper.doi.lower())
+    title = normalize_title(paper.title)
+    if title:
+        keys.append('title:' + title)
+    return keys
+
+
+class SeenStore:
+    def __init__(self, path: Optional[str] = None):
+        self._path = path   # None: 按当前 Config.SEEN_DB_PATH 解析，打开连接时才确定
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def path(self) -> str:
+        return Config.SEEN_DB_PATH if self._path is None else self._path
+
+    @path.setter
+    def path(self, value: Optional[str]):
+        self._path = value
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS seen_papers (
+                    key TEXT PRIMARY KEY,
+                    first_seen REAL NOT NULL,
+                    delivered_at REAL
+                ) WITHOUT ROWID
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS deliveries (
+                    subscriber TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    delivered_at REAL NOT NULL,
+                    PRIMARY KEY (subscriber, key)
+                ) WITHOUT ROWID
+            """)
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def is_delivered(self, keys: Iterable[str]) -> bool:
+        """任一键已投递则返回 True（主键索引查询）"""
+        if not self.enabled:
+            return False
+        keys = list(keys)
+        if not keys:
+            return False
+        placeholders = ','.join('?' * len(keys))
+        with self._lock:
+            row = self._connect().execute(
+                f"SELECT 1 FROM seen_papers WHERE delivered_at IS NOT NULL AND key IN ({placeholders}) LIMIT 1",
+                keys,
+            ).fetchone()
+        return row is not None
+
+    def filter_new(self, papers: List[Paper]) -> List[Paper]:
+        """过滤掉已投递的论文，并记录其余论文的首次出现时间"""
+        if not self.enabled:
+            return papers
+        fresh = [p for p in papers if not self.is_delivered(paper_keys(p))]
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR IGNORE INTO seen_papers (key, first_seen) VALUES (?, ?)",
+                [(k, now) for p in fresh for k in paper_keys(p)],
+            )
+            conn.commit()
+        skipped = len(papers) - len(fresh)
+        if skipped:
+            logger.info(f"已投递过的论文: {skipped} 篇，已跳过")
+        return fresh
+
+    def filter_unsent(self, subscriber: str, papers: List[Paper]) -> List[Paper]:
+        """过滤掉该订阅者已收到的论文（任一键已发给该订阅者即视为已收到）"""
+        if not self.enabled or not papers:
+            return papers
+        unsent = []
+        with self._lock:
+            conn = self._connect()
+            for paper in papers:
+                keys = paper_keys(paper)
+                placeholders = ','.join('?' * len(keys))
+                row = conn.execute(
+                    f"SELECT 1 FROM deliveries WHERE subscriber = ? AND key IN ({placeholders}) LIMIT 1",
+                    [subscriber, *keys],
+                ).fetchone() if keys else None
+                if row is None:
+                    unsent.append(paper)
+        return unsent
+
+    def mark_sent(self, subscriber: str, papers: List[Paper]):
+        """某位订阅者的邮件发送成功后调用，记录该订阅者收到的论文"""
+        if not self.enabled or not papers:
+            return
+        now = time.time()
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT OR REPLACE INTO deliveries (subscriber, key, delivered_at) VALUES (?, ?, ?)",
+                [(subscriber, k, now) for p in papers for k in paper_keys(p)],
+            )
+            conn.commit()
+
+    def mark_delivered(self, papers: List[Paper]):
+        """分发到的每位订阅者都已收到后调用，记录投递时间（此后抓取阶段直接跳过）"""
+        if not self.enabled or not papers:
+            return
+        now = time.time()
+        rows = [(k, now, now) for p in papers for k in paper_keys(p)]
+        with self._lock:
+            conn = self._connect()
+            conn.executemany(
+                "INSERT INTO seen_papers (key, first_seen, delivered_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET delivered_at = excluded.delivered_at",
+                rows,
+            )
+            conn.commit()
+        logger.info(f"已记录 {len(papers)} 篇论文为已投递")
+
+    def close(self):
+        """合并 WAL 后关闭，保证缓存目录中只留下一个完整的数据库文件"""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+                self._conn.close()
+                self._conn = None
+
+
+# 所有抓取器共享同一个存储实例
+seen_store = SeenStore()
@@ -0,0 +1,136 @@
+"""
+分片运行 — 数据源分成 N 片，由多个进程 / 工作流 matrix 任务分别抓取，再合并为一份摘要
+
+- 数据源以键表示: arxiv:<分类>（ARXIV_MODE=api 时为 arxiv:api）、journal:<期刊名>；all_sources() 的顺序即合并时的遍历顺序
+- 第 i 片（从 0 开始）取 all_sources()[i::N]，各片数据源个数相差不超过 1
+- 每个分片只做与其他源无关的步骤（下载、解析、日期 / 关键词过滤），按数据源写入
+  SHARD_DIR/shard-<i>-of-<N>.json.gz（gzip JSON，省略取默认值的字段）
+- 合并阶段读回全部分片，按 all_sources() 的顺序重新组装各源的结果，再做跨源的去重、排序与渲染，
+  与不分片运行（fetch_all）走同一段代码，因此输出与分片方式无关
+"""
+import glob
+import gzip
+import json
+import os
+import threading
+import time
+from dataclasses import MISSING, fields
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+
+from arxiv_fetcher import arxiv_sources
+from journal_rss import JOURNAL_RSS_FEEDS
+from paper import Paper
+
+logger = logging.getLogger(__name__)
+
+SHARD_FORMAT = 1
+
+# 取默认值的字段不写入分片文件
+_DEFAULTS = {f.name: f.default for f in fields(Paper) if f.default is not MISSING}
+
+
+def all_sources() -> List[str]:
+    """全部数据源的键，顺序即合并顺序"""
+    return [f"arxiv:{c}" for c in arxiv_sources()] + [f"journal:{name}" for name, _ in JOURNAL_RSS_FEEDS]
+
+
+def shard_sources(index: int, count: int) -> List[str]:
+    """第 index 片（0 ≤ index < count）负责的数据源"""
+    if count < 1 or not 0 <= index < count:
+        raise ValueError(f"分片编号应满足 0 ≤ index < count，实际为 {index}/{count}")
+    return all_sources()[index::count]
+
+
+def shard_path(directory: str, index: int, count: int) -> str:
+    return os.path.join(directory, f"shard-{index}-of-{count}.json.gz")
+
+
+def find_shards(directory: str) -> List[str]:
+    return sorted(glob.glob(os.path.join(directory, 'shard-*-of-*.json.gz')))
+
+
+def _compact(paper: Paper) -> dict:
+    data = paper.to_dict()
+    for name, default in _DEFAULTS.items():
+        if name in data and data[name] == default:
+            del data[name]
+    return data
+
+
+def write_shard(directory: str, index: int, count: int, results: Dict[str, Optional[List[Paper]]],
+                keywords: Sequence[str], days_back: int) -> str:
+    """
+    写入一个分片的结果，返回文件路径
+
+    Args:
+        results: 数据源键 → 过滤后的论文，获取失败的源为 None
+        keywords: 抓取使用的关键词，合并时检查与当前配置一致
+    """
+    data = {
+        'format': SHARD_FORMAT,
+        'index': index,
+        'count': count,
+        'fetched_at': time.time(),
+        'days_back': days_back,
+        'keywords': list(keywords),
+        'sources': {key: None if papers is None else [_compact(p) for p in papers]
+                    for key, papers in results.items()},
+    }
+    os.makedirs(directory, exist_ok=True)
+    path = shard_path(directory, index, count)
+    tmp = f"{path}.{threading.get_ident()}.tmp"
+    with gzip.open(tmp, 'wt', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+    os.replace(tmp, path)
+    return path
+
+
+def load_shards(paths: Sequence[str], keywords: Sequence[str]) -> Tuple[Dict[str, Optional[List[Paper]]], int]:
+    """
+    读取并校验全部分片的结果
+
+    Returns:
+        (数据源键 → 论文，按 all_sources() 的顺序；获取失败的源为 None, 回溯天数)
+
+    Raises:
+        ValueError: 没有分片、分片数不一致、同一分片重复或关键词与当前配置不一致
+    """
+    if not paths:
+        raise ValueError("没有找到分片结果")
+    shards = {}
+    count = None
+    days_back = None
+    for path in paths:
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        if data.get('format') != SHARD_FORMAT:
+            raise ValueError(f"{path}: 不支持的分片格式 {data.get('format')}")
+        if count is None:
+            count, days_back = data['count'], data['days_back']
+        elif data['count'] != count:
+            raise ValueError(f"{path}: 分片总数 {data['count']} 与其他分片的 {count} 不一致")
+        if data['index'] in shards:
+            raise ValueError(f"{path}: 分片 {data['index']} 重复")
+        if data['keywords'] != list(keywords):
+            raise ValueError(f"{path}: 分片使用的关键词与当前配置不一致，需重新抓取")
+        if data['days_back'] != days_back:
+            logger.warning(f"{path}: 回溯天数 {data['days_back']} 与其他分片的 {days_back} 不同")
+        shards[data['index']] = data['sources']
+
+    missing = sorted(set(range(count)) - set(shards))
+    if missing:
+        lost = [key for i in missing for key in shard_sources(i, count)]
+        logger.warning(f"缺少 {len(missing)}/{count} 个分片 {missing}，以下数据源本次没有结果: {', '.join(lost)}")
+
+    merged = {}
+    for sources in shards.values():
+        merged.update(sources)
+    results = {}
+    for key in all_sources():
+        if key in merged:
+            papers = merged[key]
+            results[key] = None if papers is None else [Paper.from_dict(p) for p in papers]
+    logger.info(f"读取 {len(shards)} 个分片: {len(results)} 个数据源，"
+                f"{sum(len(p) for p in results.values() if p)} 篇论文")
+    return results, days_back
@@ -0,0 +1,177 @@
+"""
+SMTP 发送客户端 — 复用已登录的连接批量发信，断线自动重连，临时错误指数退避重试
+
+服务器、端口和加密方式由 SMTP_HOST / SMTP_PORT / SMTP_TLS 指定；
+未指定时按发件人邮箱域名从 SMTP_PROVIDERS 中选择。指定 SMTP_HOST 而未指定 SMTP_TLS 时，
+端口 465 使用 ssl，其余使用 starttls；明文连接（会以明文发送密码）须显式设置 SMTP_TLS=none。
+每个 SMTP 服务器的发信速率由令牌桶限制（SMTP_RATE_LIMITS），避免触发服务商的频率限制。
+"""
+import random
+import smtplib
+import time
+from typing import Dict, Optional, Tuple
+import logging
+
+from config import Config
+from fetch_engine import HostRateLimiter
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# 发件人域名 → (服务器, 端口, 加密方式)；加密方式为 ssl / starttls / none
+SMTP_PROVIDERS: Dict[str, Tuple[str, int, str]] = {
+    'qq.com': ('smtp.qq.com', 587, 'starttls'),
+    '163.com': ('smtp.163.com', 587, 'starttls'),
+    'gmail.com': ('smtp.gmail.com', 587, 'starttls'),
+}
+DEFAULT_PROVIDER: Tuple[str, int, str] = ('smtp.qq.com', 465, 'ssl')
+DEFAULT_PORTS = {'ssl': 465, 'starttls': 587, 'none': 25}
+
+# 每个 SMTP 服务器的发信速率: (每秒补充令牌数, 桶容量)
+SMTP_RATE_LIMITS: Dict[str, Tuple[float, int]] = {
+    'smtp.qq.com': (1.0, 5),
+    'smtp.163.com': (1.0, 5),
+    'smtp.gmail.com': (2.0, 10),
+}
+
+# 所有发送客户端共享，保证同一服务器的总发信速率受控
+smtp_rate_limiter = HostRateLimiter(SMTP_RATE_LIMITS)
+
+
+def resolve_server(sender: str) -> Tuple[str, int, str]:
+    """返回 (服务器, 端口, 加密方式)，显式配置优先，否则按发件人域名选择"""
+    tls = Config.SMTP_TLS.lower()
+    if Config.SMTP_HOST:
+        tls = tls or ('ssl' if Config.SMTP_PORT == DEFAULT_PORTS['ssl'] else 'starttls')
+        return Config.SMTP_HOST, Config.SMTP_PORT or DEFAULT_PORTS.get(tls, 25), tls
+    domain = (sender or '').rsplit('@', 1)[-1].lower()
+    host, port, default_tls = SMTP_PROVIDERS.get(domain, DEFAULT_PROVIDER)
+    tls = tls or default_tls
+    return host, Config.SMTP_PORT or (port if tls == default_tls else DEFAULT_PORTS.get(tls, port)), tls
+
+
+def _is_transient(error: Exception) -> bool:
+    """断线、网络错误和 4xx 响应可重试；5xx、认证失败等永久错误不重试"""
+    if isinstance(error, smtplib.SMTPResponseException):
+        return 400 <= error.smtp_code < 500
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in error.recipients.values())
+    if isinstance(error, smtplib.SMTPServerDisconnected):
+        return True
+    # SMTPException 继承自 OSError，其余 SMTP 异常视为永久错误；真正的网络错误 / 超时可重试
+    return isinstance(error, OSError) and not isinstance(error, smtplib.SMTPException)
+
+
+class SmtpClient:
+    """
+    持有一个已登录的 SMTP 连接，send() 失败时按错误类型重连 / 退避重试
+
+    用法:
+        with SmtpClient(sender, password) as client:
+            for msg in msgs:
+                client.send(msg)
+    """
+
+    def __init__(self, sender: str, password: str, host: Optional[str] = None,
+                 port: Optional[int] = None, tls: Optional[str] = None,
+                 max_retries: Optional[int] = None, backoff: Optional[float] = None,
+                 timeout: float = 30):
+        default_host, default_port, default_tls = resolve_server(sender)
+        self.sender = sender
+        self.password = password
+        self.host = host or default_host
+        self.port = port or default_port
+        self.tls = tls or default_tls
+        self.max_retries = Config.SMTP_MAX_RETRIES if max_retries is None else max_retries
+        self.backoff = Config.SMTP_BACKOFF if backoff is None else backoff
+        self.timeout = timeout
+        self._server: Optional[smtplib.SMTP] = None
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.connects = 0
+        self._started = time.perf_counter()
+
+    def _connect(self) -> smtplib.SMTP:
+        if self.tls == 'ssl':
+            server = smtplib.SMTP_SSL(self.host, self.port, timeout=self.timeout)
+        else:
+            server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.tls == 'starttls':
+                server.starttls()
+            if self.password:
+                server.login(self.sender, self.password)
+        except Exception:
+            server.close()
+            raise
+        self.connects += 1
+        return server
+
+    def _ensure_connected(self) -> smtplib.SMTP:
+        if self._server is None:
+            self._server = self._connect()
+        return self._server
+
+    def _drop(self):
+        """丢弃当前连接（不再尝试 QUIT），下次发送时重新建立"""
+        if self._server is not None:
+            try:
+                self._server.close()
+            except Exception:
+                pass
+            self._server = None
+
+    def _sleep_before_retry(self, attempt: int):
+        # 指数退避 + 全抖动，避免多个客户端同时重试
+        delay = random.uniform(0, self.backoff * (2 ** attempt))
+        if delay:
+            time.sleep(delay)
+
+    def send(self, msg) -> bool:
+        """发送一封邮件，临时错误重试至多 max_retries 次；返回是否成功"""
+        with metrics.timer('smtp_send', host=self.host):
+            for attempt in range(self.max_retries + 1):
+                smtp_rate_limiter.acquire(f"smtp://{self.host}")
+                try:
+                    self._ensure_connected().send_message(msg)
+                    self.sent += 1
+                    return True
+                except Exception as e:
+                    transient = _is_transient(e)
+                    if transient:
+                        self._drop()  # 连接状态不确定，重试时重新连接并登录
+                    if not transient or attempt == self.max_retries:
+                        logger.error(f"❌ 发送到 {msg['To']} 失败: {e}")
+                        self.failed += 1
+                        return False
+                    self.retries += 1
+                    logger.warning(f"发送到 {msg['To']} 暂时失败（第 {attempt + 1} 次）: {e}，稍后重试")
+                    self._sleep_before_retry(attempt)
+            return False
+
+    def close(self):
+        """关闭连接；邮件已发出，QUIT 阶段的错误（如 QQ 邮箱关闭 SSL 时的异常）忽略"""
+        if self._server is not None:
+            try:
+                self._server.quit()
+            except Exception:
+                pass
+            self._server = None
+
+    @property
+    def throughput(self) -> float:
+        """自创建以来的发送速率（封/秒）"""
+        elapsed = time.perf_counter() - self._started
+        return self.sent / elapsed if elapsed > 0 else 0.0
+
+    def __enter__(self) -> 'SmtpClient':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        for name, value in (('smtp_sent', self.sent), ('smtp_failed', self.failed),
+                            ('smtp_retries', self.retries), ('smtp_connects', self.connects)):
+            metrics.inc(name, value, host=self.host)
+        logger.info(f"SMTP {self.host}:{self.port}: 成功 {self.sent} 封, 失败 {self.failed} 封, "
+                    f"重试 {self.retries} 次, 连接 {self.connects} 次, {self.throughput:.1f} 封/秒")
@@ -0,0 +1,106 @@
+"""
+订阅者配置 — 多位研究者共用一次抓取，按各自关键词分发个性化摘要
+
+订阅者文件（SUBSCRIBERS_FILE）为 JSON 列表:
+    [{"name": "张三", "email": "a@example.com", "keywords": ["Rydberg atom", "quantum gas"]}, ...]
+未配置时退化为单个订阅者（RECIPIENT_EMAIL + SEARCH_KEYWORDS），行为与原先一致。
+
+所有订阅者关键词的并集只编译一次、抓取一次；论文命中的关键词经倒排索引
+（关键词 → 订阅者）直接找到对应的订阅者，无需为每个订阅者重新扫描全部论文。
+"""
+import json
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+import logging
+
+from config import Config
+from keyword_matcher import tokenize
+from paper import Paper
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class Subscriber:
+    name: str
+    email: str
+    keywords: Tuple[str, ...]
+
+
+def load_subscribers(path: Optional[str] = None) -> List[Subscriber]:
+    """读取订阅者文件；未配置时返回由 RECIPIENT_EMAIL / SEARCH_KEYWORDS 构成的单个订阅者"""
+    path = Config.SUBSCRIBERS_FILE if path is None else path
+    if not path:
+        return [Subscriber('default', Config.RECIPIENT_EMAIL or '', tuple(Config.SEARCH_KEYWORDS))]
+
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = json.load(f)
+
+    subscribers = []
+    for i, entry in enumerate(entries):
+        email = (entry.get('email') or '').strip()
+        keywords = entry.get('keywords') or []
+        if isinstance(keywords, str):
+            keywords = keywords.split(',')
+        keywords = tuple(kw.strip() for kw in keywords if kw.strip())
+        if not email or not keywords:
+            raise ValueError(f"订阅者配置第 {i + 1} 项缺少 email 或 keywords: {path}")
+        subscribers.append(Subscriber(entry.get('name') or email, email, keywords))
+    logger.info(f"已加载 {len(subscribers)} 位订阅者: {path}")
+    return subscribers
+
+
+def keyword_key(keyword: str) -> Tuple[str, ...]:
+    """关键词的归一化形式（小写分词），大小写 / 连字符写法不同的关键词视为同一个"""
+    return tuple(tokenize(keyword))
+
+
+class SubscriberIndex:
+    """关键词 → 订阅者倒排索引"""
+
+    def __init__(self, subscribers: Sequence[Subscriber]):
+        self.subscribers = list(subscribers)
+        self.keywords: List[str] = []  # 全部订阅者关键词的并集（按首次出现顺序），用于抓取
+        self._index: Dict[Tuple[str, ...], List[int]] = {}
+        for sid, sub in enumerate(self.subscribers):
+            for kw in sub.keywords:
+                key = keyword_key(kw)
+                if not key:
+                    continue
+                ids = self._index.get(key)
+                if ids is None:
+                    ids = self._index[key] = []
+                    self.keywords.append(kw)
+                if sid not in ids:
+                    ids.append(sid)
+
+    def route(self, papers: Sequence[Paper]) -> List[List[Paper]]:
+        """
+        将论文分发给订阅者，返回与 subscribers 一一对应的论文列表
+
+        每篇论文的 matched_keywords 只保留该订阅者订阅的关键词；
+        命中关键词完全相同的订阅者共享同一个 Paper 对象（渲染缓存可复用）。
+        """
+        routed: List[List[Paper]] = [[] for _ in self.subscribers]
+        keys: Dict[str, Tuple[str, ...]] = {}
+        for paper in papers:
+            hits: Dict[int, List[str]] = {}
+            for kw in paper.matched_keywords:
+                key = keys.get(kw)
+                if key is None:
+                    key = keys[kw] = keyword_key(kw)
+                for sid in self._index.get(key, ()):
+                    hits.setdefault(sid, []).append(kw)
+
+            variants: Dict[Tuple[str, ...], Paper] = {}
+            for sid, kws in hits.items():
+                kws = tuple(kws)
+                variant = variants.get(kws)
+                if variant is None:
+                    variant = paper if kws == paper.matched_keywords else paper.evolve(matched_keywords=kws)
+                    variants[kws] = variant
+                routed[sid].append(variant)
+
+        for sub, sub_papers in zip(self.subscribers, routed):
+            logger.info(f"  {sub.name} <{sub.email}>: {len(sub_papers)} 篇")
+        return routed